@@ -0,0 +1,150 @@
+# backend/admin_bulk.py
+# 관리자 일괄 처리 (게시글 일괄 정지/해제 · 일괄 삭제, 사용자 역할 일괄 변경)
+#
+# 대상 ID 목록을 받아 건마다 요청/쿼리를 반복하지 않고 집합 단위 SQL 로 처리합니다.
+#   - 정지/해제 : UPDATE posts ... WHERE id IN (...)
+#   - 삭제      : 댓글 좋아요 / 댓글 / 게시글 좋아요 / 게시글을 DELETE ... WHERE ... IN (...) 으로 한 트랜잭션에서 삭제하고,
+#                 커밋 후 MongoDB 본문을 delete_many 한 번으로 정리합니다.
+#   - 역할 변경 : 역할 이름을 IN 쿼리 한 번으로 찾고 user_roles 를 일괄 DELETE / INSERT 합니다.
+# 반환값은 요청한 ID 순서대로의 결과 목록 [{'id': ..., 'status': ...}] 입니다.
+import datetime
+from bson.objectid import ObjectId
+from flask import current_app
+from sqlalchemy import func
+from backend.extensions import db
+from backend.maria_models import User, Post, Comment, Role, UserRole, PostLike, CommentLike
+from backend.mongo_models import get_mongo_db
+from backend import user_stats, counters, expiry_scheduler
+
+MAX_IDS = 500
+STATUS_UPDATED = 'updated'
+STATUS_DELETED = 'deleted'
+STATUS_NOT_FOUND = 'not_found'
+STATUS_SKIPPED = 'skipped'
+ROLE_MODES = ('set', 'add', 'remove')
+
+
+def normalize_ids(ids):
+    """요청 본문의 ID 목록을 중복 없는 정수 목록(요청 순서 유지)으로 바꿉니다. 형식이 잘못되면 ValueError."""
+    if not isinstance(ids, list) or not ids:
+        raise ValueError("ids must be a non-empty list")
+    normalized = []
+    for value in ids:
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(f"invalid id: {value!r}")
+        normalized.append(int(value))
+    normalized = list(dict.fromkeys(normalized))
+    if len(normalized) > MAX_IDS:
+        raise ValueError(f"too many ids: {len(normalized)}")
+    return normalized
+
+
+def summarize(results):
+    """결과 목록 -> {상태: 건수}"""
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    return counts
+
+
+def _report(ids, done, status, skipped=()):
+    return [{'id': item_id,
+             'status': status if item_id in done else STATUS_SKIPPED if item_id in skipped else STATUS_NOT_FOUND}
+            for item_id in ids]
+
+
+def _existing_ids(column, ids):
+    return {row[0] for row in db.session.query(column).filter(column.in_(ids))}
+
+
+def suspend_posts(post_ids, suspend, duration_hours=None):
+    """게시글들을 duration_hours 시간 동안 정지하거나(suspend=True) 정지를 해제합니다."""
+    found = _existing_ids(Post.id, post_ids)
+    if found:
+        if suspend:
+            values = {'is_suspended': True,
+                      'suspended_until': datetime.datetime.utcnow() + datetime.timedelta(hours=duration_hours)}
+        else:
+            values = {'is_suspended': False, 'suspended_until': None}
+        db.session.execute(db.update(Post).where(Post.id.in_(found)).values(**values)
+                           .execution_options(synchronize_session=False))
+        db.session.commit()
+        if suspend:
+            for post_id in found:
+                expiry_scheduler.schedule(expiry_scheduler.POST_SUSPENSION, post_id, values['suspended_until'])
+    return _report(post_ids, found, STATUS_UPDATED)
+
+
+def _post_deletion_deltas(rows, post_ids):
+    """user_stats.post_deletion_deltas 의 일괄 버전. 댓글 수는 GROUP BY 쿼리 한 번으로 집계합니다."""
+    deltas = {}
+    for row in rows:
+        deltas.setdefault(row.user_id, {'post_count': 0})['post_count'] -= 1
+    comment_counts = db.session.query(Comment.user_id, func.count(Comment.id))\
+        .filter(Comment.post_id.in_(post_ids)).group_by(Comment.user_id)
+    for user_id, count in comment_counts:
+        deltas.setdefault(user_id, {})['comment_count'] = -count
+    return deltas
+
+
+def delete_posts(post_ids):
+    """게시글과 딸린 댓글/좋아요를 한 트랜잭션에서 삭제하고 MongoDB 본문을 정리합니다."""
+    rows = db.session.query(Post.id, Post.user_id, Post.mongo_content_id).filter(Post.id.in_(post_ids)).all()
+    found = [row.id for row in rows]
+    if not found:
+        return _report(post_ids, set(), STATUS_DELETED)
+
+    stats_deltas = _post_deletion_deltas(rows, found)
+    comment_ids = db.select(Comment.id).where(Comment.post_id.in_(found))
+    for statement in (db.delete(CommentLike).where(CommentLike.comment_id.in_(comment_ids)),
+                      db.delete(Comment).where(Comment.post_id.in_(found)),
+                      db.delete(PostLike).where(PostLike.post_id.in_(found)),
+                      db.delete(Post).where(Post.id.in_(found))):
+        db.session.execute(statement.execution_options(synchronize_session=False))
+    db.session.commit()
+
+    # 본문 정리는 SQL 커밋 이후에 합니다. 실패해도 게시글은 이미 지워졌으므로 로그만 남깁니다.
+    content_ids = [ObjectId(row.mongo_content_id) for row in rows
+                   if row.mongo_content_id and ObjectId.is_valid(row.mongo_content_id)]
+    if content_ids:
+        try:
+            get_mongo_db().post_contents.delete_many({'_id': {'$in': content_ids}})
+        except Exception as e:
+            current_app.logger.error(f"Error deleting post contents for posts {found}: {e}", exc_info=True)
+    user_stats.apply_deltas(stats_deltas)
+    counters.increment(counters.COUNTER_POSTS, -len(found))
+    return _report(post_ids, set(found), STATUS_DELETED)
+
+
+def resolve_roles(role_names):
+    """역할 이름 목록 -> {이름: 역할 ID}. IN 쿼리 한 번으로 조회하며 없는 이름은 결과에서 빠집니다."""
+    if not role_names:
+        return {}
+    return {name: role_id for role_id, name in db.session.query(Role.id, Role.name).filter(Role.name.in_(role_names))}
+
+
+def update_user_roles(user_ids, role_ids, mode='set', skip_ids=()):
+    """여러 사용자의 역할을 한 번에 바꿉니다.
+
+    mode: 'set' (role_ids 로 교체) / 'add' (추가) / 'remove' (제거). skip_ids 의 사용자는 건드리지 않습니다.
+    """
+    skipped = set(skip_ids)
+    found = _existing_ids(User.id, [user_id for user_id in user_ids if user_id not in skipped])
+    if found:
+        if mode == 'set':
+            db.session.execute(db.delete(UserRole).where(UserRole.user_id.in_(found))
+                               .execution_options(synchronize_session=False))
+            pairs = {(user_id, role_id) for user_id in found for role_id in role_ids}
+        elif mode == 'add':
+            existing = set(db.session.query(UserRole.user_id, UserRole.role_id)
+                           .filter(UserRole.user_id.in_(found), UserRole.role_id.in_(role_ids)))
+            pairs = {(user_id, role_id) for user_id in found for role_id in role_ids} - existing
+        else:
+            db.session.execute(db.delete(UserRole).where(UserRole.user_id.in_(found), UserRole.role_id.in_(role_ids))
+                               .execution_options(synchronize_session=False))
+            pairs = set()
+        if pairs:
+            db.session.execute(db.insert(UserRole), [{'user_id': user_id, 'role_id': role_id}
+                                                     for user_id, role_id in sorted(pairs)])
+        db.session.commit()
+    return _report(user_ids, found, STATUS_UPDATED, skipped)
@@ -0,0 +1,117 @@
+# backend/admin_records.py
+# 관리자 DB 관리 페이지의 기록 피드 (GET /api/admin/db_records)
+# 일기 / 감정 기록 / 챗봇 상담 세션 / 문의를 전체 사용자 대상으로 최신순으로 합쳐 한 페이지씩 보여줍니다.
+#
+# 활동 타임라인(timeline)과 같은 방식으로 소스마다 (시각, _id) 내림차순 커서를 하나씩 열어
+# heapq.merge 로 병합하고, 다음 페이지 커서는 마지막 항목의 (시각, 소스, _id) 입니다.
+# 필터:
+#   - types: 포함할 소스 (기본값: 전체)
+#   - user_id: 특정 사용자의 기록만
+#   - start / end: 날짜 범위 (YYYY-MM-DD, end 포함)
+#   - status: 문의 처리 상태 (문의 소스에만 적용)
+# 한 페이지의 작성자 정보는 user_profiles.resolve() 로 한 번에 가져옵니다.
+import datetime
+from backend.mongo_models import get_mongo_db
+from backend import timeline, user_profiles
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _diary_record(doc):
+    return {
+        'type': '일기',
+        'summary': doc.get('title') or '제목 없음',
+        'conversation': [{'role': '일기 내용', 'text': doc.get('content', '내용 없음')}],
+    }
+
+
+def _mood_record(doc):
+    mood_label = doc.get('mood') or (f"{doc['mood_score']}점" if doc.get('mood_score') is not None else '알 수 없음')
+    return {
+        'type': '감정 기록',
+        'summary': f"감정: {mood_label}",
+        'conversation': [{'role': '감정', 'text': mood_label}],
+    }
+
+
+def _chat_record(doc):
+    return {
+        'type': '챗봇 상담',
+        'summary': doc.get('summary') or '요약 없음',
+        'chat_session_id': doc.get('chat_session_id'),
+        'conversation': [{'role': '상담 스타일', 'text': doc.get('chat_style') or '-'},
+                         {'role': '요약', 'text': doc.get('summary') or '요약 없음'}],
+    }
+
+
+def _inquiry_record(doc):
+    conversation = [{'role': '문의 내용', 'text': doc.get('content', '내용 없음')}]
+    if doc.get('reply_content'):
+        conversation.append({'role': '답변', 'text': doc['reply_content']})
+    return {
+        'type': '문의',
+        'summary': doc.get('title') or '제목 없음',
+        'status': doc.get('status'),
+        'conversation': conversation,
+    }
+
+
+# 소스 이름 -> (컬렉션, 시각 필드, projection, 응답 변환 함수). 감정 기록은 MoodEntry 집계로 읽습니다.
+SOURCES = {
+    'diary': ('diary_entries', 'created_at', {'user_id': 1, 'title': 1, 'content': 1, 'created_at': 1}, _diary_record),
+    'mood': (None, 'timestamp', None, _mood_record),
+    'chat': ('chat_sessions', 'created_at',
+             {'user_id': 1, 'chat_session_id': 1, 'chat_style': 1, 'summary': 1, 'created_at': 1}, _chat_record),
+    'inquiry': ('inquiries', 'created_at',
+                {'user_id': 1, 'title': 1, 'content': 1, 'status': 1, 'reply_content': 1, 'created_at': 1}, _inquiry_record),
+}
+
+
+def _query(time_field, user_id, start, end):
+    query = {}
+    if user_id is not None:
+        query['user_id'] = user_id
+    if start is not None or end is not None:
+        query[time_field] = {**({'$gte': start} if start is not None else {}), **({'$lt': end} if end is not None else {})}
+    return query
+
+
+def get_page(cursor=None, limit=DEFAULT_PAGE_SIZE, sources=None, user_id=None, start=None, end=None, status=None):
+    """기록 한 페이지와 다음 페이지 커서(없으면 None)를 반환합니다.
+
+    start / end 는 datetime.date (end 포함) 입니다. cursor 가 잘못된 경우 ValueError 를 발생시킵니다.
+    """
+    position = timeline.decode_cursor(cursor, SOURCES) if cursor else None
+    start_at = datetime.datetime.combine(start, datetime.time()) if start else None
+    end_at = datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time()) if end else None
+    db = get_mongo_db()
+
+    streams = []
+    for source in (sources or SOURCES):
+        collection_name, time_field, projection, _ = SOURCES[source]
+        if collection_name is None:
+            streams.append(timeline.read_moods(source, position, limit + 1, user_id, start_at, end_at))
+            continue
+        query = _query(time_field, user_id, start_at, end_at)
+        if source == 'inquiry' and status:
+            query['status'] = status
+        streams.append(timeline.read_collection(db, source, collection_name, time_field, query, projection,
+                                                position, limit + 1))
+
+    items, next_cursor = timeline.merge_page(streams, limit)
+    profiles = user_profiles.resolve(doc.get('user_id') for _, doc in items)
+
+    records = []
+    for (timestamp, source, doc_id), doc in items:
+        user = profiles.get(doc.get('user_id'))
+        records.append({
+            'id': str(doc_id),
+            'source': source,
+            'user_id': doc.get('user_id'),
+            'user_username': user['username'] if user else 'Unknown',
+            'user_email': user['email'] if user else 'Unknown',
+            'timestamp': timestamp.isoformat(),
+            **SOURCES[source][3](doc),
+        })
+    return records, next_cursor
@@ -0,0 +1,118 @@
+# backend/admin_users.py
+# 관리자 사용자 관리 목록 (GET /api/admin/users) 과 사용자 자동완성 (GET /api/admin/users/typeahead)
+#
+# 전체 사용자를 한 번에 내려보내지 않고 keyset 페이지네이션으로 한 페이지씩 반환합니다.
+#   - sort=created_at : (created_at, id) 내림차순, ix_users_created_at_id 인덱스
+#   - sort=username   : username 오름차순, username UNIQUE 인덱스
+#   - role=<역할 이름> : user_roles (user_id, role_id) PK 로 역할 보유 여부 확인
+#   - q=<접두어>       : username / email / nickname / user_uid 접두어 검색 (LIKE 'q%', 각 컬럼의 UNIQUE 인덱스)
+# 다음 페이지 커서는 마지막 사용자의 정렬 키를 base64 로 감싼 불투명 문자열입니다.
+import json
+import base64
+import datetime
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import selectinload
+from backend.extensions import db
+from backend.maria_models import User, Role, UserRole
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+TYPEAHEAD_LIMIT = 10
+SORT_CREATED_AT = 'created_at'
+SORT_USERNAME = 'username'
+SORTS = (SORT_CREATED_AT, SORT_USERNAME)
+SEARCH_FIELDS = ('username', 'email', 'nickname', 'user_uid')
+
+
+def prefix_pattern(prefix):
+    """LIKE 접두어 패턴. 인덱스를 탈 수 있도록 와일드카드는 끝에만 두고 입력의 %, _ 는 이스케이프합니다."""
+    return prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _prefix_condition(prefix, fields):
+    pattern = prefix_pattern(prefix)
+    return or_(*(getattr(User, field).like(pattern, escape='\\') for field in fields))
+
+
+def encode_cursor(sort, user):
+    key = user.created_at.isoformat() if sort == SORT_CREATED_AT else user.username
+    return base64.urlsafe_b64encode(json.dumps([sort, key, user.id]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, sort):
+    """커서를 (정렬 값, id) 로 되돌립니다. 형식이 잘못되었거나 정렬 기준이 다르면 ValueError."""
+    try:
+        cursor_sort, key, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if cursor_sort != sort:
+            raise ValueError(cursor_sort)
+        return (datetime.datetime.fromisoformat(key) if sort == SORT_CREATED_AT else str(key)), int(user_id)
+    except Exception:
+        raise ValueError("invalid cursor")
+
+
+def serialize_user(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'user_uid': user.user_uid,
+        'nickname': user.nickname,
+        'gender': user.gender,
+        'age': user.age,
+        'major': user.major,
+        'created_at': user.created_at.isoformat() if user.created_at else None,
+        'updated_at': user.updated_at.isoformat() if user.updated_at else None,
+        'roles': [role.name for role in user.roles]
+    }
+
+
+def get_page(cursor=None, limit=DEFAULT_PAGE_SIZE, sort=SORT_CREATED_AT, role=None, q=None, fields=SEARCH_FIELDS):
+    """사용자 한 페이지와 다음 페이지 커서(없으면 None)를 반환합니다. cursor 가 잘못된 경우 ValueError."""
+    # 역할은 페이지의 사용자에 대해서만 IN 쿼리 한 번으로 가져옵니다.
+    query = User.query.options(selectinload(User.roles))
+    if role:
+        # 역할 ID 를 먼저 찾고 user_roles PK (user_id, role_id) 로 존재 여부만 확인합니다.
+        # (조인 결과를 정렬하지 않고 정렬 인덱스 순서대로 사용자를 읽을 수 있음)
+        role_id = db.session.query(Role.id).filter(Role.name == role).scalar()
+        if role_id is None:
+            return [], None
+        query = query.filter(db.session.query(UserRole.user_id)
+                             .filter(UserRole.user_id == User.id, UserRole.role_id == role_id).exists())
+    if q:
+        query = query.filter(_prefix_condition(q, fields))
+
+    if sort == SORT_USERNAME:
+        if cursor:
+            last_username, _ = decode_cursor(cursor, sort)
+            query = query.filter(User.username > last_username)
+        query = query.order_by(User.username.asc())
+    else:
+        if cursor:
+            last_created_at, last_id = decode_cursor(cursor, sort)
+            query = query.filter(or_(
+                User.created_at < last_created_at,
+                and_(User.created_at == last_created_at, User.id < last_id),
+            ))
+        query = query.order_by(User.created_at.desc(), User.id.desc())
+
+    users = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(sort, users[limit - 1]) if len(users) > limit else None
+    return [serialize_user(user) for user in users[:limit]], next_cursor
+
+
+def typeahead(prefix, limit=TYPEAHEAD_LIMIT):
+    """username / email / nickname / user_uid 가 prefix 로 시작하는 사용자 (username 순, 최대 limit 명).
+
+    컬럼마다 자기 인덱스를 따라 limit 개까지만 읽는 작은 쿼리를 실행해 합칩니다.
+    """
+    pattern = prefix_pattern(prefix)
+    columns = (User.id, User.username, User.nickname, User.email, User.user_uid)
+    found = {}
+    for field in SEARCH_FIELDS:
+        column = getattr(User, field)
+        rows = db.session.query(*columns).filter(column.like(pattern, escape='\\'))\
+            .order_by(column.asc()).limit(limit).all()
+        for row in rows:
+            found[row.id] = {'id': row.id, 'username': row.username, 'nickname': row.nickname,
+                             'email': row.email, 'user_uid': row.user_uid}
+    return sorted(found.values(), key=lambda user: user['username'])[:limit]
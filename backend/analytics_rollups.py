@@ -0,0 +1,143 @@
+# backend/analytics_rollups.py
+# 관리자 데이터 분석용 일별 집계(analytics_rollups) 컬렉션을 관리합니다.
+# 문서 하나 = (지표, 날짜) 하나이며, 쓰기 시점에 $inc 로 갱신되고
+# 누락/불일치가 생기면 backfill_rollups() 로 원본 컬렉션에서 다시 계산합니다.
+#
+#   {'_id': 'mood_entries:2025-08-01', 'metric': 'mood_entries', 'day': '2025-08-01',
+#    'total': 12, 'counts': {'행복': 7, '불안': 5}}
+import datetime
+from pymongo import ReplaceOne
+from flask import current_app
+from backend.mongo_models import get_mongo_db, MoodEntry
+
+ROLLUP_COLLECTION = 'analytics_rollups'
+
+METRIC_DIARY_ENTRIES = 'diary_entries'
+METRIC_MOOD_ENTRIES = 'mood_entries'
+
+
+def _day_of(value):
+    """datetime 또는 'YYYY-MM-DD' 문자열을 'YYYY-MM-DD' 로 변환합니다."""
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%d')
+    if value:
+        return str(value)[:10]
+    return datetime.datetime.utcnow().strftime('%Y-%m-%d')
+
+
+def counter_key(key):
+    # MongoDB 필드 이름에는 '.' 과 선행 '$' 를 쓸 수 없습니다.
+    return str(key).replace('.', '_').lstrip('$') or '_'
+
+
+def increment(metric, day=None, key=None, amount=1):
+    """(metric, day) 집계 문서에 amount 만큼 더합니다. key 가 있으면 counts.<key> 도 함께 증가합니다.
+
+    집계 실패가 원래 쓰기 요청을 실패시키지 않도록 예외는 로그만 남깁니다. (backfill 로 복구 가능)
+    """
+    day = _day_of(day)
+    inc = {'total': amount}
+    if key is not None:
+        inc[f'counts.{counter_key(key)}'] = amount
+    try:
+        get_mongo_db()[ROLLUP_COLLECTION].update_one(
+            {'_id': f'{metric}:{day}'},
+            {'$inc': inc, '$setOnInsert': {'metric': metric, 'day': day}},
+            upsert=True
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error updating analytics rollup ({metric}, {day}): {e}", exc_info=True)
+
+
+def mood_key(entry):
+    """감정 기록의 집계 키: 감정 라벨(mood)이 있으면 라벨, 없으면 점수(mood_score)."""
+    if entry.get('mood') is not None:
+        return entry['mood']
+    score = entry.get('mood_score')
+    if score is not None:
+        return str(int(score)) if float(score).is_integer() else str(score)
+    return None
+
+
+def mood_day(entry):
+    """감정 기록의 집계 날짜: 기록 대상 날짜(date) > recorded_at > timestamp 순으로 사용합니다."""
+    return _day_of(entry.get('date') or entry.get('recorded_at') or entry.get('timestamp'))
+
+
+def get_rollups(metric, start_day=None, end_day=None):
+    """기간 내 일별 집계 문서를 날짜순으로 반환합니다."""
+    query = {'metric': metric}
+    if start_day or end_day:
+        query['day'] = {}
+        if start_day:
+            query['day']['$gte'] = start_day
+        if end_day:
+            query['day']['$lte'] = end_day
+    return list(get_mongo_db()[ROLLUP_COLLECTION].find(query).sort('day', 1))
+
+
+def sum_counts(metric, start_day=None, end_day=None):
+    """기간 내 counts 를 합산해 [(키, 합계), ...] 를 합계 내림차순으로 반환합니다."""
+    totals = {}
+    for rollup in get_rollups(metric, start_day, end_day):
+        for key, count in rollup.get('counts', {}).items():
+            totals[key] = totals.get(key, 0) + count
+    return sorted(((key, count) for key, count in totals.items() if count > 0), key=lambda item: (-item[1], item[0]))
+
+
+def monthly_totals(metric, start_day=None, end_day=None):
+    """일별 total 을 월('YYYY-MM') 단위로 합산해 [(월, 합계), ...] 를 월 순으로 반환합니다."""
+    totals = {}
+    for rollup in get_rollups(metric, start_day, end_day):
+        month = rollup['day'][:7]
+        totals[month] = totals.get(month, 0) + rollup.get('total', 0)
+    return sorted(totals.items())
+
+
+def _diary_rollups(db):
+    pipeline = [
+        {'$match': {'created_at': {'$type': 'date'}}},
+        {'$group': {'_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$created_at'}}, 'total': {'$sum': 1}}},
+    ]
+    for doc in db.diary_entries.aggregate(pipeline, allowDiskUse=True):
+        yield doc['_id'], {'total': doc['total'], 'counts': {}}
+
+
+def _mood_rollups(db):
+    rollups = {}
+    projection = {'$project': {'_id': 0, 'mood': 1, 'mood_score': 1, 'date': 1, 'recorded_at': 1, 'timestamp': 1}}
+    for entry in MoodEntry.aggregate([projection]):
+        day = mood_day(entry)
+        rollup = rollups.setdefault(day, {'total': 0, 'counts': {}})
+        rollup['total'] += 1
+        key = mood_key(entry)
+        if key is not None:
+            key = counter_key(key)
+            rollup['counts'][key] = rollup['counts'].get(key, 0) + 1
+    return rollups.items()
+
+
+_BACKFILL_SOURCES = {
+    METRIC_DIARY_ENTRIES: _diary_rollups,
+    METRIC_MOOD_ENTRIES: _mood_rollups,
+}
+
+
+def backfill_rollups(metrics=None):
+    """원본 컬렉션에서 일별 집계를 다시 계산해 덮어씁니다. 반환값: {metric: 갱신된 일 수}"""
+    db = get_mongo_db()
+    collection = db[ROLLUP_COLLECTION]
+    results = {}
+    for metric in (metrics or _BACKFILL_SOURCES.keys()):
+        operations = []
+        seen_ids = []
+        for day, rollup in _BACKFILL_SOURCES[metric](db):
+            rollup_id = f'{metric}:{day}'
+            seen_ids.append(rollup_id)
+            operations.append(ReplaceOne({'_id': rollup_id}, {'metric': metric, 'day': day, **rollup}, upsert=True))
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+        # 원본에 더 이상 존재하지 않는 날짜의 집계 문서는 제거합니다.
+        collection.delete_many({'metric': metric, '_id': {'$nin': seen_ids}})
+        results[metric] = len(operations)
+    return results
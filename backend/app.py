@@ -1,5 +1,7 @@
 import os
 import sys
+import datetime
+import click
 from flask import Flask, render_template, g, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
@@ -35,6 +37,8 @@ def create_app(test_config=None):
     # --- 기본 설정 ---
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev')
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY')
+    # 공지 게시 종료 / 게시글 정지 만료를 처리하는 백그라운드 스케줄러 (backend/expiry_scheduler.py)
+    app.config['EXPIRY_SCHEDULER_ENABLED'] = os.environ.get('EXPIRY_SCHEDULER_ENABLED', 'true').lower() != 'false'
 
     if not app.config['JWT_SECRET_KEY']:
         raise ValueError("JWT_SECRET_KEY 환경 변수가 설정되지 않았습니다. 보안을 위해 반드시 설정해야 합니다.")
@@ -100,6 +104,7 @@ def create_app(test_config=None):
     from backend.routes.graph_routes import graph_bp
     from backend.routes.inquiry_routes import inquiry_bp
     from backend.routes.psych_test_routes import psych_test_bp
+    from backend.routes.me_routes import me_bp
     # ========================================================== #
     # [수정] chat_routes.py에서 chat_bp를 가져옵니다.
     from backend.routes.chat_routes import chat_bp
@@ -113,11 +118,16 @@ def create_app(test_config=None):
     app.register_blueprint(graph_bp, url_prefix='/api/graph')
     app.register_blueprint(inquiry_bp, url_prefix='/api/inquiry')
     app.register_blueprint(psych_test_bp, url_prefix='/api/psych-test')
+    app.register_blueprint(me_bp, url_prefix='/api/me')
     # ========================================================== #
     # [수정] chat_bp를 '/api/chat' 접두사와 함께 등록합니다.
     app.register_blueprint(chat_bp, url_prefix='/api/chat')
     # ========================================================== #
 
+    # --- 백그라운드 스케줄러 ---
+    from backend import expiry_scheduler
+    expiry_scheduler.init_app(app)
+
     # --- CLI 명령어 등록 ---
     @app.cli.command("init-db")
     def init_db_command():
@@ -128,6 +138,183 @@ def create_app(test_config=None):
         initialize_menus()
         print("--- [CLI] 데이터베이스 초기화 완료 ---")
 
+    @app.cli.command("ensure-indexes")
+    def ensure_indexes_command():
+        print("--- [CLI] MongoDB 인덱스 생성 시작 ---")
+        from backend.mongo_indexes import ensure_indexes
+        for collection_name, result in ensure_indexes().items():
+            print(f"{collection_name}: {result}")
+        print("--- [CLI] MongoDB 인덱스 생성 완료 ---")
+
+    @app.cli.command("index-report")
+    @click.option('--strict', is_flag=True, help='COLLSCAN 쿼리가 있으면 종료 코드 1을 반환합니다.')
+    def index_report_command(strict):
+        print("--- [CLI] MongoDB 인덱스 사용 현황 리포트 ---")
+        from backend.mongo_indexes import find_unused_indexes, find_collscan_queries
+        unused = find_unused_indexes()
+        print(f"[사용되지 않은 인덱스] {len(unused)}개")
+        for item in unused:
+            print(f"  - {item['collection']}.{item['index']} (집계 시작: {item['since']})")
+        collscans = find_collscan_queries()
+        print(f"[COLLSCAN 쿼리] {len(collscans)}개")
+        for query in collscans:
+            print(f"  - {query['collection']}: filter={query['filter']} sort={query.get('sort')}")
+        if strict and collscans:
+            sys.exit(1)
+
+    @app.cli.command("backfill-rollups")
+    @click.option('--metric', multiple=True, help='다시 계산할 지표 (기본값: 전체). 여러 번 지정할 수 있습니다.')
+    def backfill_rollups_command(metric):
+        print("--- [CLI] 분석용 일별 집계 재계산 시작 ---")
+        from backend.analytics_rollups import backfill_rollups
+        for metric_name, day_count in backfill_rollups(list(metric) or None).items():
+            print(f"{metric_name}: {day_count}일 갱신")
+        print("--- [CLI] 분석용 일별 집계 재계산 완료 ---")
+
+    @app.cli.command("rebuild-keywords")
+    @click.option('--batch-size', default=500, show_default=True, help='한 번에 갱신할 일기 수')
+    def rebuild_keywords_command(batch_size):
+        print("--- [CLI] 일기 키워드 재추출 및 사용자별 키워드 카운터 재계산 시작 ---")
+        from backend.keywords import rebuild_keywords
+        processed, users = rebuild_keywords(batch_size=batch_size)
+        print(f"일기 {processed}건 처리, 사용자 {users}명 카운터 갱신")
+        print("--- [CLI] 키워드 재계산 완료 ---")
+
+    @app.cli.command("build-keyword-rollups")
+    @click.option('--source', multiple=True, help='집계할 소스 (diary, chat, community). 기본값: 전체')
+    @click.option('--since', default=None, help='YYYY-MM: 이 달부터만 다시 계산합니다.')
+    @click.option('--workers', default=None, type=int, help='토큰화 프로세스 수 (기본값: CPU 수)')
+    @click.option('--chunk-size', default=2000, show_default=True, help='프로세스에 한 번에 넘길 문서 수')
+    def build_keyword_rollups_command(source, since, workers, chunk_size):
+        print("--- [CLI] 전체 키워드 집계 시작 ---")
+        from backend.keyword_analytics import build_keyword_rollups
+        since_dt = datetime.datetime.strptime(since, '%Y-%m') if since else None
+        for source_name, period_count in build_keyword_rollups(list(source) or None, since_dt, workers, chunk_size).items():
+            print(f"{source_name}: {period_count}개월 갱신")
+        print("--- [CLI] 전체 키워드 집계 완료 ---")
+
+    @app.cli.command("rebuild-calendars")
+    def rebuild_calendars_command():
+        print("--- [CLI] 월간 캘린더 요약 재계산 시작 ---")
+        from backend.calendar_summaries import rebuild_calendars
+        print(f"{rebuild_calendars()}개 (사용자, 월) 문서 갱신")
+        print("--- [CLI] 월간 캘린더 요약 재계산 완료 ---")
+
+    @app.cli.command("rebuild-user-stats")
+    def rebuild_user_stats_command():
+        print("--- [CLI] 사용자별 대시보드 통계 재계산 시작 ---")
+        from backend.user_stats import rebuild_user_stats
+        print(f"사용자 {rebuild_user_stats()}명 통계 갱신")
+        print("--- [CLI] 사용자별 대시보드 통계 재계산 완료 ---")
+
+    @app.cli.command("rebuild-global-counters")
+    def rebuild_global_counters_command():
+        print("--- [CLI] 전체 카운터 재계산 시작 ---")
+        from backend.counters import rebuild_global_counters
+        for name, value in rebuild_global_counters().items():
+            print(f"{name}: {value}")
+        print("--- [CLI] 전체 카운터 재계산 완료 ---")
+
+    @app.cli.command("bump-psych-catalog")
+    def bump_psych_catalog_command():
+        print("--- [CLI] 심리 테스트 카탈로그 버전 갱신 ---")
+        from backend.psych_catalog import bump_version
+        print(f"새 버전: {bump_version()} (각 워커가 다음 확인 시 카탈로그를 다시 읽습니다)")
+
+    @app.cli.command("rescore-psych-results")
+    @click.option('--test-id', required=True, help='다시 채점할 심리 테스트 ID')
+    @click.option('--rules-file', type=click.File('r', encoding='utf-8'), default=None,
+                  help='테스트에 저장할 새 채점 규칙(JSON). 생략하면 현재 규칙으로 다시 채점합니다.')
+    @click.option('--batch-size', default=1000, show_default=True, help='한 번에 채점/저장할 결과 수')
+    def rescore_psych_results_command(test_id, rules_file, batch_size):
+        print("--- [CLI] 심리 테스트 결과 재채점 시작 ---")
+        import json
+        from bson.objectid import ObjectId
+        from backend import psych_catalog, psych_scoring
+        from backend.mongo_models import get_mongo_db
+        test = psych_catalog.get_test(test_id)
+        if not test:
+            print(f"테스트를 찾을 수 없습니다: {test_id}")
+            return
+        if rules_file:
+            rules = json.load(rules_file)
+            try:
+                # 저장하기 전에 현재 문항으로 컴파일해 규칙을 검증합니다.
+                psych_scoring.compile_rules({'scoring': rules}, test['questions'])
+            except ValueError as e:
+                print(f"채점 규칙 오류: {e}")
+                return
+            get_mongo_db().psych_tests.update_one({'_id': ObjectId(test_id)}, {'$set': {'scoring': rules}})
+            print(f"채점 규칙 저장, 카탈로그 버전: {psych_catalog.bump_version()}")
+            test = psych_catalog.get_test(test_id)
+        updated = psych_scoring.rescore_results(get_mongo_db(), test_id, test['scoring'], batch_size=batch_size)
+        print(f"결과 {updated}건 갱신")
+        # 점수가 바뀌었으므로 점수 분포도 다시 만듭니다.
+        from backend.psych_norms import rebuild
+        print(f"점수 분포 재계산: 표본 {rebuild(test)}건")
+        print("--- [CLI] 심리 테스트 결과 재채점 완료 ---")
+
+    @app.cli.command("rebuild-psych-norms")
+    @click.option('--test-id', default=None, help='특정 테스트만 다시 계산합니다. (생략 시 전체)')
+    def rebuild_psych_norms_command(test_id):
+        print("--- [CLI] 심리 테스트 점수 분포 재계산 시작 ---")
+        from backend import psych_catalog
+        from backend.psych_norms import rebuild_psych_norms
+        tests = [psych_catalog.get_test(test_id)] if test_id else psych_catalog.get_catalog()['tests']
+        if not all(tests):
+            print(f"테스트를 찾을 수 없습니다: {test_id}")
+            return
+        for tid, count in rebuild_psych_norms(tests).items():
+            print(f"{tid}: 표본 {count}건")
+        print("--- [CLI] 심리 테스트 점수 분포 재계산 완료 ---")
+
+    @app.cli.command("rebuild-diary-search")
+    @click.option('--batch-size', default=500, show_default=True, help='한 번에 색인할 일기 수')
+    def rebuild_diary_search_command(batch_size):
+        print("--- [CLI] 일기 검색 색인 재생성 시작 ---")
+        from backend.diary_search import rebuild_search_index
+        print(f"일기 {rebuild_search_index(batch_size=batch_size)}건 색인")
+        print("--- [CLI] 일기 검색 색인 재생성 완료 ---")
+
+    @app.cli.command("migrate-moods")
+    @click.option('--batch-size', default=1000, show_default=True, help='한 번에 옮길 문서 수')
+    @click.option('--force', is_flag=True, help='완료된 마이그레이션도 남은 문서를 다시 확인')
+    def migrate_moods_command(batch_size, force):
+        print("--- [CLI] 감정 기록(mood_entries -> mood_series) 마이그레이션 시작 ---")
+        from backend.mongo_models import MoodEntry
+        # 배포 때마다 실행되므로 이미 끝난 마이그레이션은 mood_entries 를 읽지 않고 종료합니다.
+        if not force and MoodEntry.legacy_migration_completed():
+            print("이미 완료된 마이그레이션입니다. (다시 확인하려면 --force)")
+            return
+        print(f"저장 방식: {MoodEntry.ensure_collection()}")
+        migrated = MoodEntry.migrate_legacy(batch_size=batch_size)
+        print(f"{migrated}건 이동 (중단된 경우 다시 실행하면 이어서 진행합니다)")
+        print("--- [CLI] 감정 기록 마이그레이션 완료 ---")
+
+    @app.cli.command("apply-expiries")
+    def apply_expiries_command():
+        print("--- [CLI] 공지 게시 종료 / 게시글 정지 만료 반영 시작 ---")
+        from backend.expiry_scheduler import apply_due
+        result = apply_due()
+        print(f"공지 {result['notices_ended']}건 비공개 전환, 게시글 {result['posts_unsuspended']}건 정지 해제")
+        print("--- [CLI] 공지 게시 종료 / 게시글 정지 만료 반영 완료 ---")
+
+    @app.cli.command("explain-hot-queries")
+    @click.option('--standin', is_flag=True, help='실제 DB 대신 모델 스키마로 만든 인메모리 SQLite에서 검사합니다.')
+    def explain_hot_queries_command(standin):
+        print("--- [CLI] MariaDB 핫 쿼리 실행 계획 검사 ---")
+        from backend.maria_query_plans import check_hot_queries, create_standin_engine
+        results = check_hot_queries(create_standin_engine() if standin else None)
+        failed = False
+        for result in results:
+            status = "FAIL" if result['problems'] else "OK"
+            print(f"[{status}] {result['name']}")
+            for problem in result['problems']:
+                print(f"    - {problem}")
+            failed = failed or bool(result['problems'])
+        if failed:
+            sys.exit(1)
+
     # --- HTML 페이지 렌더링 라우트 ---
     @app.route('/', endpoint='index')
     def index(): return render_template('index.html')
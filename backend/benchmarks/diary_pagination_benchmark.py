@@ -0,0 +1,93 @@
+# backend/benchmarks/diary_pagination_benchmark.py
+# 일기 목록 벤치마크: 기존 방식(전체 일기 + 본문 전체) vs (date, _id) keyset 페이지 + fields 프로젝션
+#
+# 사용법 (프로젝트 루트에서):
+#   python backend/benchmarks/diary_pagination_benchmark.py --entries 5000 --content-size 2000
+# 실제 diary_entries 에 존재하지 않는 사용자 ID(BENCH_USER_ID)로 일기를 만들어 측정하고, 끝나면 삭제합니다.
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.app import create_app
+from backend.mongo_models import get_mongo_db, DiaryEntry
+from backend.mongo_indexes import ensure_indexes
+
+BENCH_USER_ID = -424242
+LIST_FIELDS = ['title', 'date', 'mood_emoji_key']
+
+
+def seed(collection, entries, content_size, batch_size=5000):
+    start = datetime.date(2000, 1, 1)
+    content = ('오늘은 ' * content_size)[:content_size]
+    for offset in range(0, entries, batch_size):
+        batch = [DiaryEntry(
+            user_id=BENCH_USER_ID,
+            title=f'일기 {offset + i}',
+            content=content,
+            date=(start + datetime.timedelta(days=offset + i)).strftime('%Y-%m-%d'),
+            mood_emoji_key='happy',
+        ).to_dict() for i in range(min(batch_size, entries - offset))]
+        collection.insert_many(batch, ordered=False)
+
+
+def response_size(entries):
+    return len(json.dumps(entries, default=str).encode('utf-8'))
+
+
+def timed(label, fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<45} {best * 1000:>10.1f} ms {response_size(result) / 1024:>10.1f} KiB")
+    return result
+
+
+def run(entries, content_size, page_size, repeat, keep):
+    collection = get_mongo_db()[DiaryEntry.COLLECTION_NAME]
+    ensure_indexes()
+    collection.delete_many({'user_id': BENCH_USER_ID})
+    print(f"{entries:,}개 일기 생성 중...")
+    seed(collection, entries, content_size)
+
+    print(f"\n[일기 목록] entries={entries:,} content_size={content_size} page_size={page_size}")
+    timed("전체 조회 (기존)", lambda: list(collection.find({'user_id': BENCH_USER_ID}).sort('created_at', -1)), repeat)
+    timed("첫 페이지 (전체 필드)", lambda: DiaryEntry.find_page(BENCH_USER_ID, limit=page_size)[0], repeat)
+    timed("첫 페이지 (fields=title,date,mood_emoji_key)",
+          lambda: DiaryEntry.find_page(BENCH_USER_ID, limit=page_size, fields=LIST_FIELDS)[0], repeat)
+
+    # 마지막 페이지 근처도 첫 페이지와 같은 비용인지 확인 (skip/offset 방식과의 차이)
+    cursor = None
+    for _ in range(max(entries // page_size - 1, 0)):
+        _, cursor = DiaryEntry.find_page(BENCH_USER_ID, cursor, page_size, LIST_FIELDS)
+    timed("마지막 페이지 (keyset, fields)",
+          lambda: DiaryEntry.find_page(BENCH_USER_ID, cursor, page_size, LIST_FIELDS)[0], repeat)
+    timed("마지막 페이지 (skip/limit, fields)",
+          lambda: list(collection.find({'user_id': BENCH_USER_ID}, DiaryEntry.projection(LIST_FIELDS))
+                       .sort([('date', -1), ('_id', -1)]).skip(max(entries - page_size, 0)).limit(page_size)), repeat)
+
+    if not keep:
+        collection.delete_many({'user_id': BENCH_USER_ID})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='일기 목록 페이지네이션 벤치마크')
+    parser.add_argument('--entries', type=int, default=5000)
+    parser.add_argument('--content-size', type=int, default=2000, help='일기 본문 길이(글자 수)')
+    parser.add_argument('--page-size', type=int, default=DiaryEntry.DEFAULT_PAGE_SIZE)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--keep', action='store_true', help='측정 후 벤치마크용 일기를 삭제하지 않습니다.')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        run(args.entries, args.content_size, args.page_size, args.repeat, args.keep)
@@ -0,0 +1,89 @@
+# backend/benchmarks/mood_aggregation_benchmark.py
+# 감정 분포 집계 벤치마크: 기존 방식(전체 문서를 읽어 Python Counter) vs MongoDB $group 집계
+#
+# 사용법 (프로젝트 루트에서):
+#   python backend/benchmarks/mood_aggregation_benchmark.py --docs 1000000 --users 1000
+# 실제 mood_series 대신 임시 컬렉션(bench_mood_entries, 기록 1건 = 문서 1개)을 만들어 측정하고, 끝나면 삭제합니다.
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+from collections import Counter
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from pymongo import ASCENDING, DESCENDING
+from backend.app import create_app
+from backend.mongo_models import get_mongo_db
+from backend.mongo_aggregations import mood_distribution_pipeline, recent_most_frequent_mood_pipeline
+
+BENCH_COLLECTION = 'bench_mood_entries'
+MOODS = ['행복', '평온', '슬픔', '불안', '분노', '피곤', '설렘']
+
+
+def seed(collection, docs, users, batch_size=10000):
+    start = datetime.datetime(2023, 1, 1)
+    for offset in range(0, docs, batch_size):
+        batch = [{
+            'user_id': random.randint(1, users),
+            'mood': random.choice(MOODS),
+            'timestamp': start + datetime.timedelta(minutes=offset + i),
+        } for i in range(min(batch_size, docs - offset))]
+        collection.insert_many(batch, ordered=False)
+    collection.create_index([('user_id', ASCENDING), ('mood', ASCENDING)])
+    collection.create_index([('mood', ASCENDING)])
+    collection.create_index([('user_id', ASCENDING), ('timestamp', DESCENDING)])
+
+
+def timed(label, fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<45} {best * 1000:>10.1f} ms")
+    return result
+
+
+def run(docs, users, repeat, keep):
+    collection = get_mongo_db()[BENCH_COLLECTION]
+    if collection.estimated_document_count() != docs:
+        collection.drop()
+        print(f"{docs:,}개 문서 생성 중...")
+        seed(collection, docs, users)
+
+    user_id = random.randint(1, users)
+    print(f"\n[전체 감정 분포] docs={docs:,}")
+    python_global = timed("Python Counter (find all)", lambda: Counter(d['mood'] for d in collection.find({})), repeat)
+    mongo_global = timed("MongoDB $group", lambda: list(collection.aggregate(mood_distribution_pipeline())), repeat)
+    assert dict(python_global) == {d['_id']: d['count'] for d in mongo_global}
+
+    print(f"\n[사용자별 감정 분포] user_id={user_id}")
+    timed("Python Counter (find user)", lambda: Counter(d['mood'] for d in collection.find({'user_id': user_id})), repeat)
+    timed("MongoDB $group", lambda: list(collection.aggregate(mood_distribution_pipeline(user_id))), repeat)
+
+    print(f"\n[최근 30개 중 최빈 감정] user_id={user_id}")
+    timed("Python Counter (find/sort/limit)", lambda: Counter(
+        d['mood'] for d in collection.find({'user_id': user_id}).sort('timestamp', -1).limit(30)).most_common(1), repeat)
+    timed("MongoDB $group", lambda: list(collection.aggregate(recent_most_frequent_mood_pipeline(user_id))), repeat)
+
+    if not keep:
+        collection.drop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='감정 분포 집계 벤치마크')
+    parser.add_argument('--docs', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--keep', action='store_true', help='측정 후 임시 컬렉션을 삭제하지 않습니다.')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        run(args.docs, args.users, args.repeat, args.keep)
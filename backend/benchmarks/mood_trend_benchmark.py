@@ -0,0 +1,58 @@
+# backend/benchmarks/mood_trend_benchmark.py
+# 감정 추세 분석(mood_trends.compute_trends) 벤치마크
+# 여러 해 분량의 감정 기록(하루 여러 건, 기록 없는 날 포함)을 만들어 계산 시간만 측정합니다.
+# DB 가 필요 없으므로 바로 실행할 수 있습니다.
+#
+# 사용법 (프로젝트 루트에서):
+#   python backend/benchmarks/mood_trend_benchmark.py --years 1 3 10 --per-day 3
+import os
+import sys
+import time
+import argparse
+import datetime
+import numpy as np
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.mood_trends import compute_trends
+
+
+def synthetic_history(years, per_day, skip_ratio, seed=42):
+    """years 년치 (일 번호, 점수) 배열. skip_ratio 비율의 날은 기록이 없습니다."""
+    rng = np.random.default_rng(seed)
+    first = (np.datetime64('2015-01-01') - np.datetime64('1970-01-01')).astype(np.int64)
+    all_days = np.arange(first, first + years * 365)
+    recorded = all_days[rng.random(all_days.size) >= skip_ratio]
+    days = np.repeat(recorded, rng.integers(1, per_day + 1, size=recorded.size))
+    # 완만한 계절 변화 + 잡음, 1~5 범위
+    base = 3 + np.sin((days - first) / 60.0)
+    scores = np.clip(np.rint(base + rng.normal(0, 0.8, size=days.size)), 1, 5)
+    return days, scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 3, 10])
+    parser.add_argument('--per-day', type=int, default=3)
+    parser.add_argument('--skip-ratio', type=float, default=0.2)
+    parser.add_argument('--window', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    today = datetime.date(2015 + max(args.years), 1, 1)
+    print(f"{'years':>5} {'readings':>10} {'best ms':>10} {'change points':>14}")
+    for years in args.years:
+        days, scores = synthetic_history(years, args.per_day, args.skip_ratio)
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = compute_trends(days, scores, window=args.window, today=today)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"{years:>5} {days.size:>10} {best * 1000:>10.2f} {len(result['change_points']):>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# backend/cache_versions.py
+# 프로세스 내 캐시의 무효화를 위한 버전 스탬프(cache_versions 컬렉션)입니다.
+# 원본 데이터를 수정하는 쪽에서 bump() 를 호출하면 버전이 올라가고,
+# 캐시를 가진 쪽은 current() 로 버전을 확인해 달라졌을 때만 다시 읽습니다.
+# 여러 gunicorn 워커가 같은 버전 문서를 보므로 어느 워커에서 수정해도 모든 워커의 캐시가 갱신됩니다.
+#
+#   {'_id': 'psych_catalog', 'version': 7, 'updated_at': ...}
+#
+# 요청마다 버전 문서를 읽지 않도록 CHECK_INTERVAL_SECONDS 동안은 마지막으로 확인한 버전을 재사용합니다.
+# (다른 워커의 수정은 최대 그만큼 늦게 반영되고, 같은 워커의 수정은 즉시 반영됩니다.)
+import time
+import datetime
+import threading
+from pymongo import ReturnDocument
+from backend.mongo_models import get_mongo_db
+
+VERSION_COLLECTION = 'cache_versions'
+CHECK_INTERVAL_SECONDS = 5
+
+_checked = {}
+_lock = threading.Lock()
+
+
+def bump(name):
+    """버전을 1 올리고 새 버전을 반환합니다."""
+    doc = get_mongo_db()[VERSION_COLLECTION].find_one_and_update(
+        {'_id': name},
+        {'$inc': {'version': 1}, '$set': {'updated_at': datetime.datetime.utcnow()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    with _lock:
+        _checked[name] = (time.monotonic() + CHECK_INTERVAL_SECONDS, doc['version'])
+    return doc['version']
+
+
+def current(name):
+    """현재 버전 (문서가 없으면 0). CHECK_INTERVAL_SECONDS 이내에 확인한 값은 다시 조회하지 않습니다."""
+    now = time.monotonic()
+    with _lock:
+        checked = _checked.get(name)
+    if checked and checked[0] > now:
+        return checked[1]
+    doc = get_mongo_db()[VERSION_COLLECTION].find_one({'_id': name}, {'version': 1})
+    version = doc['version'] if doc else 0
+    with _lock:
+        _checked[name] = (now + CHECK_INTERVAL_SECONDS, version)
+    return version
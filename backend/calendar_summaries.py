@@ -0,0 +1,151 @@
+# backend/calendar_summaries.py
+# 사용자별 월간 캘린더 요약(calendar_months) 문서를 관리합니다.
+# 문서 하나 = (사용자, 월) 하나이며, 일기/감정 기록 쓰기 시점에 해당 날짜 항목만 갱신합니다.
+# 캘린더 API 는 원본 컬렉션을 조회하지 않고 이 문서만 읽습니다.
+#
+#   {'_id': '3:2025-08', 'user_id': 3, 'month': '2025-08',
+#    'days': {'01': {'diary_count': 1, 'mood_emoji_key': 'happy', 'mood_score': 4, 'mood': '행복'}, ...}}
+import datetime
+from pymongo import ReplaceOne
+from flask import current_app
+from backend.mongo_models import get_mongo_db, MoodEntry
+
+CALENDAR_COLLECTION = 'calendar_months'
+
+
+def _month_id(user_id, month):
+    return f'{user_id}:{month}'
+
+
+def _split(date):
+    """'YYYY-MM-DD' -> ('YYYY-MM', 'DD')"""
+    return date[:7], date[8:10]
+
+
+def _update_day(user_id, date, update):
+    month, day = _split(date)
+    get_mongo_db()[CALENDAR_COLLECTION].update_one(
+        {'_id': _month_id(user_id, month)},
+        {**update, '$setOnInsert': {'user_id': user_id, 'month': month}},
+        upsert=True
+    )
+
+
+def refresh_diary_day(user_id, date):
+    """해당 날짜의 일기 수와 대표 기분 이모지(가장 최근 일기)를 원본에서 다시 읽어 반영합니다.
+
+    작성/수정/삭제 모두 같은 함수로 처리하므로 중간에 실패해도 다음 쓰기에서 바로잡힙니다.
+    집계 실패가 원래 쓰기 요청을 실패시키지 않도록 예외는 로그만 남깁니다. (rebuild 로 복구 가능)
+    """
+    if not date:
+        return
+    try:
+        db = get_mongo_db()
+        query = {'user_id': user_id, 'date': date}
+        diary_count = db.diary_entries.count_documents(query)
+        _, day = _split(date)
+        if diary_count:
+            latest = db.diary_entries.find_one(query, {'mood_emoji_key': 1}, sort=[('created_at', -1)]) or {}
+            update = {'$set': {
+                f'days.{day}.diary_count': diary_count,
+                f'days.{day}.mood_emoji_key': latest.get('mood_emoji_key'),
+                'updated_at': datetime.datetime.utcnow(),
+            }}
+        else:
+            update = {
+                '$unset': {f'days.{day}.diary_count': '', f'days.{day}.mood_emoji_key': ''},
+                '$set': {'updated_at': datetime.datetime.utcnow()},
+            }
+        _update_day(user_id, date, update)
+    except Exception as e:
+        current_app.logger.error(f"Error refreshing calendar summary ({user_id}, {date}): {e}", exc_info=True)
+
+
+def record_mood(user_id, date, mood_score=None, mood=None):
+    """해당 날짜의 감정(점수/라벨)을 마지막 기록 값으로 덮어씁니다."""
+    fields = {}
+    _, day = _split(date)
+    if mood_score is not None:
+        fields[f'days.{day}.mood_score'] = mood_score
+    if mood is not None:
+        fields[f'days.{day}.mood'] = mood
+    if not fields:
+        return
+    try:
+        _update_day(user_id, date, {'$set': {**fields, 'updated_at': datetime.datetime.utcnow()}})
+    except Exception as e:
+        current_app.logger.error(f"Error updating calendar mood ({user_id}, {date}): {e}", exc_info=True)
+
+
+def _summarize_days(doc):
+    """캘린더 문서를 {'YYYY-MM-DD': {'has_entry', 'mood_emoji_key', 'mood_score', 'mood'}} 로 변환합니다."""
+    summary = {}
+    for day, info in sorted((doc or {}).get('days', {}).items()):
+        if not info:
+            continue
+        summary[f"{doc['month']}-{day}"] = {
+            'has_entry': info.get('diary_count', 0) > 0,
+            'mood_emoji_key': info.get('mood_emoji_key'),
+            'mood_score': info.get('mood_score'),
+            'mood': info.get('mood'),
+        }
+    return summary
+
+
+def get_month(user_id, year, month):
+    doc = get_mongo_db()[CALENDAR_COLLECTION].find_one({'_id': _month_id(user_id, f'{year:04d}-{month:02d}')})
+    return _summarize_days(doc) if doc else {}
+
+
+def get_year(user_id, year):
+    """{'YYYY-MM': 월 요약} 을 반환합니다. 12개 문서를 한 번의 쿼리로 읽습니다."""
+    ids = [_month_id(user_id, f'{year:04d}-{month:02d}') for month in range(1, 13)]
+    return {doc['month']: _summarize_days(doc) for doc in get_mongo_db()[CALENDAR_COLLECTION].find({'_id': {'$in': ids}})}
+
+
+def delete_for_user(user_id):
+    get_mongo_db()[CALENDAR_COLLECTION].delete_many({'user_id': user_id})
+
+
+def rebuild_calendars():
+    """일기/감정 기록 원본에서 모든 캘린더 문서를 다시 계산해 덮어씁니다. 반환값: 갱신된 문서 수"""
+    db = get_mongo_db()
+    months = {}
+
+    def day_info(user_id, date):
+        month, day = _split(date)
+        doc = months.setdefault((user_id, month), {'user_id': user_id, 'month': month, 'days': {}})
+        return doc['days'].setdefault(day, {})
+
+    diary_pipeline = [
+        {'$match': {'date': {'$type': 'string'}}},
+        {'$sort': {'created_at': 1}},
+        {'$group': {
+            '_id': {'user_id': '$user_id', 'date': '$date'},
+            'diary_count': {'$sum': 1},
+            'mood_emoji_key': {'$last': '$mood_emoji_key'},
+        }},
+    ]
+    for row in db.diary_entries.aggregate(diary_pipeline, allowDiskUse=True):
+        info = day_info(row['_id']['user_id'], row['_id']['date'])
+        info['diary_count'] = row['diary_count']
+        info['mood_emoji_key'] = row['mood_emoji_key']
+
+    # 시간순으로 덮어쓰므로 날짜별 마지막 감정 기록이 남습니다.
+    for entry in MoodEntry.aggregate([{'$sort': {'recorded_at': 1}}]):
+        info = day_info(entry.get('user_id'), entry['date'])
+        if entry.get('mood_score') is not None:
+            info['mood_score'] = entry['mood_score']
+        if entry.get('mood') is not None:
+            info['mood'] = entry['mood']
+
+    now = datetime.datetime.utcnow()
+    collection = db[CALENDAR_COLLECTION]
+    operations = [
+        ReplaceOne({'_id': _month_id(user_id, month)}, {**doc, 'updated_at': now}, upsert=True)
+        for (user_id, month), doc in months.items()
+    ]
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    collection.delete_many({'_id': {'$nin': [_month_id(user_id, month) for user_id, month in months]}})
+    return len(operations)
@@ -0,0 +1,99 @@
+# backend/counters.py
+# 관리자/사용자 대시보드에 표시하는 전체 카운트(총 사용자 수, 게시글 수 등)를 제공합니다.
+# 요청마다 테이블/컬렉션 전체를 세지 않도록 세 가지 방법을 조합합니다.
+#   1) global_counters 컬렉션: 쓰기 경로에서 $inc 로 유지하는 카운터 (MariaDB 테이블의 행 수)
+#   2) estimated_document_count(): 컬렉션 메타데이터로 바로 읽는 추정치 (정확하지 않아도 되는 MongoDB 카운트)
+#   3) 프로세스 내 TTL 캐시: 위 값들을 CACHE_TTL_SECONDS 동안 재사용합니다. (최대 그만큼 늦게 반영됨)
+#
+#   {'_id': 'users', 'value': 1234, 'updated_at': ...}
+#
+# 카운터 문서가 없으면 처음 읽을 때 원본에서 정확히 세어 만들고,
+# 어긋난 경우 flask rebuild-global-counters 로 다시 맞출 수 있습니다.
+import time
+import datetime
+import threading
+from flask import current_app
+from backend.maria_models import User, Post
+from backend.mongo_models import get_mongo_db
+
+COUNTER_COLLECTION = 'global_counters'
+CACHE_TTL_SECONDS = 10
+
+COUNTER_USERS = 'users'
+COUNTER_POSTS = 'posts'
+COUNTER_CHAT_MESSAGES = 'chat_messages'
+COUNTER_DIARY_ENTRIES = 'diary_entries'
+
+# 쓰기 경로에서 유지하는 카운터 -> 정확한 값을 세는 함수 (최초 생성 / 재계산용)
+STORED_COUNTERS = {
+    COUNTER_USERS: lambda: User.query.count(),
+    COUNTER_POSTS: lambda: Post.query.count(),
+}
+# 추정치로 충분한 카운터 -> MongoDB 컬렉션 이름
+ESTIMATED_COUNTERS = {
+    COUNTER_CHAT_MESSAGES: 'chat_history',
+    COUNTER_DIARY_ENTRIES: 'diary_entries',
+}
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def increment(name, amount=1):
+    """카운터에 amount 만큼 더합니다. 원래 쓰기 요청을 실패시키지 않도록 예외는 로그만 남깁니다.
+
+    카운터 문서가 아직 없으면 아무것도 하지 않습니다. (처음 읽을 때 원본에서 정확히 세어 만들어집니다.)
+    """
+    try:
+        get_mongo_db()[COUNTER_COLLECTION].update_one(
+            {'_id': name},
+            {'$inc': {'value': amount}, '$set': {'updated_at': datetime.datetime.utcnow()}}
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error updating global counter '{name}': {e}", exc_info=True)
+    with _cache_lock:
+        _cache.pop(name, None)
+
+
+def _seed(name):
+    value = STORED_COUNTERS[name]()
+    get_mongo_db()[COUNTER_COLLECTION].update_one(
+        {'_id': name},
+        {'$set': {'value': value, 'updated_at': datetime.datetime.utcnow()}},
+        upsert=True
+    )
+    return value
+
+
+def _load(name):
+    if name in ESTIMATED_COUNTERS:
+        return get_mongo_db()[ESTIMATED_COUNTERS[name]].estimated_document_count()
+    if name not in STORED_COUNTERS:
+        raise KeyError(name)
+    doc = get_mongo_db()[COUNTER_COLLECTION].find_one({'_id': name})
+    return doc['value'] if doc else _seed(name)
+
+
+def get(name):
+    """카운터 값을 반환합니다. CACHE_TTL_SECONDS 이내에 읽은 값이 있으면 그대로 사용합니다."""
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(name)
+    if cached and cached[0] > now:
+        return cached[1]
+    value = _load(name)
+    with _cache_lock:
+        _cache[name] = (now + CACHE_TTL_SECONDS, value)
+    return value
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def rebuild_global_counters():
+    """쓰기 경로에서 유지하는 카운터를 원본에서 정확히 다시 셉니다. 반환값: {카운터 이름: 값}"""
+    values = {name: _seed(name) for name in STORED_COUNTERS}
+    clear_cache()
+    return values
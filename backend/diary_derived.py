@@ -0,0 +1,69 @@
+# backend/diary_derived.py
+# 일기가 작성/수정/삭제된 뒤 갱신해야 하는 파생 데이터를 한 곳에서 처리합니다.
+#   - 관리자 일별 집계 (analytics_rollups)
+#   - 사용자별 키워드 카운터 (keywords)
+#   - 월간 캘린더 요약 (calendar_summaries)
+#   - 전문 검색 색인 (diary_search)
+#   - 사용자별 대시보드 통계 (user_stats)
+#   - 오프라인 동기화용 삭제 기록 (sync_tombstones)
+# 개별 라우트와 일괄 동기화 API 가 같은 함수를 사용하므로 쓰기 경로가 늘어나도 파생 데이터가 어긋나지 않습니다.
+# 각 갱신은 자체적으로 예외를 로그만 남기므로 원래 쓰기 요청을 실패시키지 않습니다.
+import datetime
+from flask import current_app
+from backend.mongo_models import get_mongo_db
+from backend.analytics_rollups import increment as increment_rollup, METRIC_DIARY_ENTRIES
+from backend.keywords import apply_keyword_changes
+from backend import calendar_summaries, diary_search, user_stats
+
+TOMBSTONE_COLLECTION = 'sync_tombstones'
+# 이 기간보다 오래된 커서로 동기화하는 클라이언트는 전체 동기화를 다시 해야 합니다.
+TOMBSTONE_RETENTION_DAYS = 90
+
+
+def on_diary_created(entry):
+    user_id = entry['user_id']
+    increment_rollup(METRIC_DIARY_ENTRIES, entry.get('created_at'))
+    user_stats.increment(user_id, diary_count=1)
+    apply_keyword_changes(user_id, new_keywords=entry.get('keywords'))
+    calendar_summaries.refresh_diary_day(user_id, entry.get('date'))
+    diary_search.index_diary(entry['_id'], user_id, entry.get('title'), entry.get('content'), entry.get('date'))
+
+
+def on_diary_updated(before, after):
+    """before: 수정 전 문서(title, content, keywords, date, mood_emoji_key), after: 수정 후 문서."""
+    user_id = before['user_id']
+    if before.get('keywords') != after.get('keywords'):
+        apply_keyword_changes(user_id, before.get('keywords'), after.get('keywords'))
+    if any(before.get(field) != after.get(field) for field in ('title', 'content', 'date')):
+        diary_search.index_diary(before['_id'], user_id, after.get('title'), after.get('content'), after.get('date'))
+    if before.get('date') != after.get('date') or before.get('mood_emoji_key') != after.get('mood_emoji_key'):
+        calendar_summaries.refresh_diary_day(user_id, before.get('date'))
+        if after.get('date') != before.get('date'):
+            calendar_summaries.refresh_diary_day(user_id, after.get('date'))
+
+
+def on_diary_deleted(entry, deleted_at=None):
+    """entry: 삭제된 문서(_id, user_id, created_at, keywords, date, client_id)."""
+    user_id = entry['user_id']
+    increment_rollup(METRIC_DIARY_ENTRIES, entry.get('created_at'), amount=-1)
+    user_stats.increment(user_id, diary_count=-1)
+    apply_keyword_changes(user_id, old_keywords=entry.get('keywords'))
+    calendar_summaries.refresh_diary_day(user_id, entry.get('date'))
+    diary_search.remove_diary(entry['_id'])
+    try:
+        get_mongo_db()[TOMBSTONE_COLLECTION].insert_one({
+            'user_id': user_id,
+            'kind': 'diary',
+            'id': str(entry['_id']),
+            'client_id': entry.get('client_id'),
+            'deleted_at': deleted_at or datetime.datetime.utcnow(),
+        })
+    except Exception as e:
+        current_app.logger.error(f"Error recording tombstone for diary {entry['_id']}: {e}", exc_info=True)
+
+
+# 삭제 시 파생 데이터 갱신에 필요한 필드
+DELETED_PROJECTION = {'user_id': 1, 'created_at': 1, 'keywords': 1, 'date': 1, 'client_id': 1}
+# 수정 전 상태 비교에 필요한 필드
+BEFORE_UPDATE_PROJECTION = {'user_id': 1, 'title': 1, 'content': 1, 'keywords': 1, 'date': 1,
+                            'mood_emoji_key': 1, 'updated_at': 1, 'client_id': 1}
@@ -0,0 +1,167 @@
+# backend/diary_search.py
+# 사용자별 일기 전문 검색을 위한 2-gram 역색인(diary_search_index)을 관리합니다.
+# 한국어는 띄어쓰기/조사 때문에 단어 단위 text 인덱스로는 부분 일치가 잘 되지 않으므로
+# 어절마다 글자 2-gram 을 만들어 (user_id, grams) 멀티키 인덱스로 일치하는 일기를 찾고,
+# 색인 문서 안에서 (제목 일치 여부, 날짜) 순으로 정렬/페이지를 나눈 뒤 그 페이지의 본문만 읽어 스니펫을 만듭니다.
+# 어절의 마지막 글자도 1-gram 으로 넣어 두므로, 본문의 모든 글자 c 는 'c' 또는 'c?' 키에 포함되고
+# 한 글자 검색어는 grams 의 접두어 검색(^c) 하나로 찾을 수 있습니다.
+#
+#   {'_id': <diary ObjectId>, 'user_id': 3, 'date': '2025-08-01',
+#    'grams': ['회사', '사에', '서', ...], 'title_grams': ['출근', '근', ...]}
+# 색인 형식이 바뀌면 flask rebuild-diary-search 로 다시 만들어 주세요.
+import re
+from flask import current_app
+from backend.mongo_models import get_mongo_db
+
+SEARCH_COLLECTION = 'diary_search_index'
+
+SNIPPET_RADIUS = 40
+# 한 글자 검색어만으로는 거의 모든 일기가 일치하므로 두 글자 이상인 검색어가 하나는 있어야 합니다.
+MIN_TERM_LENGTH = 2
+
+_WORD_PATTERN = re.compile(r'[0-9A-Za-z가-힣]+')
+
+
+def _words(text):
+    return _WORD_PATTERN.findall((text or '').lower())
+
+
+def _bigrams(word):
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+
+def grams(text):
+    """색인용 키 집합: 어절별 글자 2-gram 과 어절의 마지막 글자. (한 글자 어절은 그 글자)"""
+    result = set()
+    for word in _words(text):
+        result.add(word[-1])
+        result.update(_bigrams(word))
+    return result
+
+
+def _candidate_query(user_id, terms):
+    """검색어를 모두 포함할 수 있는 색인 문서 조건.
+
+    두 글자 이상인 검색어는 2-gram 이 모두 있어야 하고,
+    한 글자 검색어는 그 글자로 시작하는 키(1-gram 또는 2-gram)가 있어야 합니다.
+    """
+    conditions = []
+    query_grams = sorted(set().union(*(_bigrams(term) for term in terms if len(term) > 1)))
+    if query_grams:
+        conditions.append({'grams': {'$all': query_grams}})
+    for char in sorted({term for term in terms if len(term) == 1}):
+        conditions.append({'grams': {'$regex': '^' + re.escape(char)}})
+    return {'user_id': user_id, '$and': conditions}
+
+
+def _index_doc(user_id, title, content, date):
+    return {
+        'user_id': user_id,
+        'date': date,
+        'grams': sorted(grams(f"{title or ''} {content or ''}")),
+        'title_grams': sorted(grams(title)),
+    }
+
+
+def index_diary(entry_id, user_id, title, content, date):
+    """일기 하나의 색인 문서를 만들거나 교체합니다. 실패해도 원래 요청은 성공시키고 로그만 남깁니다."""
+    try:
+        get_mongo_db()[SEARCH_COLLECTION].replace_one(
+            {'_id': entry_id}, _index_doc(user_id, title, content, date), upsert=True
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error indexing diary {entry_id} for search: {e}", exc_info=True)
+
+
+def remove_diary(entry_id):
+    try:
+        get_mongo_db()[SEARCH_COLLECTION].delete_one({'_id': entry_id})
+    except Exception as e:
+        current_app.logger.error(f"Error removing diary {entry_id} from search index: {e}", exc_info=True)
+
+
+def delete_for_user(user_id):
+    get_mongo_db()[SEARCH_COLLECTION].delete_many({'user_id': user_id})
+
+
+def _snippet(text, terms):
+    """첫 번째로 일치하는 검색어 주변 SNIPPET_RADIUS 글자를 잘라 반환합니다."""
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms if term in lowered]
+    if not positions:
+        return text[:SNIPPET_RADIUS * 2]
+    position = min(positions)
+    start = max(position - SNIPPET_RADIUS, 0)
+    end = min(position + SNIPPET_RADIUS, len(text))
+    return ('…' if start > 0 else '') + text[start:end] + ('…' if end < len(text) else '')
+
+
+def search(user_id, query, page=1, per_page=10):
+    """일기를 검색해 (결과 목록, 전체 일치 수) 를 반환합니다.
+
+    검색어의 2-gram 이 모두 들어 있는 일기가 일치하며, 제목에도 들어 있는 일기를 먼저, 같으면 최신 날짜순으로 보여 줍니다.
+    정렬과 페이지 나누기는 색인 문서에서 하고, 본문은 반환할 페이지의 일기만 읽습니다.
+    두 글자 이상인 검색어가 없으면 ValueError 를 발생시킵니다.
+    """
+    terms = _words(query)
+    if not any(len(term) >= MIN_TERM_LENGTH for term in terms):
+        raise ValueError("query needs a term of at least two characters")
+
+    db = get_mongo_db()
+    index = db[SEARCH_COLLECTION]
+    match = _candidate_query(user_id, terms)
+    query_grams = sorted(set().union(*(_bigrams(term) for term in terms if len(term) > 1)))
+    title_match = {'title_grams': {'$all': query_grams}}
+    total = index.count_documents(match)
+    title_total = index.count_documents({**match, **title_match}) if total else 0
+
+    # 제목 일치 그룹과 나머지 그룹을 각각 (date, _id) 내림차순으로 읽어 이어 붙입니다.
+    start = (page - 1) * per_page
+    groups = ((True, {**match, **title_match}, title_total, start),
+              (False, {**match, '$nor': [title_match]}, total - title_total, max(start - title_total, 0)))
+    page_docs = []
+    for is_title_match, condition, group_total, offset in groups:
+        limit = per_page - len(page_docs)
+        if limit <= 0 or offset >= group_total:
+            continue
+        cursor = index.find(condition, {'_id': 1}).sort([('date', -1), ('_id', -1)]).skip(offset).limit(limit)
+        page_docs += [{'_id': doc['_id'], 'title_match': is_title_match} for doc in cursor]
+
+    projection = {'title': 1, 'content': 1, 'date': 1, 'mood_emoji_key': 1}
+    entries = {entry['_id']: entry for entry in
+               db.diary_entries.find({'_id': {'$in': [doc['_id'] for doc in page_docs]}, 'user_id': user_id}, projection)}
+    results = []
+    for doc in page_docs:
+        entry = entries.get(doc['_id'])
+        if entry is None:
+            continue
+        results.append({
+            '_id': str(entry['_id']),
+            'title': entry.get('title'),
+            'date': entry.get('date'),
+            'mood_emoji_key': entry.get('mood_emoji_key'),
+            'snippet': _snippet(entry.get('content') or '', terms),
+            'title_match': doc['title_match'],
+        })
+    return results, total
+
+
+def rebuild_search_index(batch_size=500):
+    """모든 일기의 검색 색인을 다시 만듭니다. 반환값: 색인한 일기 수"""
+    db = get_mongo_db()
+    collection = db[SEARCH_COLLECTION]
+    collection.delete_many({})
+    batch = []
+    indexed = 0
+    projection = {'user_id': 1, 'title': 1, 'content': 1, 'date': 1}
+    for entry in db.diary_entries.find({}, projection).batch_size(batch_size):
+        batch.append({'_id': entry['_id'],
+                      **_index_doc(entry.get('user_id'), entry.get('title'), entry.get('content'), entry.get('date'))})
+        if len(batch) >= batch_size:
+            collection.insert_many(batch, ordered=False)
+            indexed += len(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        indexed += len(batch)
+    return indexed
@@ -0,0 +1,354 @@
+# backend/diary_sync.py
+# 오프라인 우선 클라이언트를 위한 일기/감정 기록 일괄 동기화입니다. (POST /api/diary/sync)
+#
+# 요청 항목: {'op': 'create'|'update'|'delete', 'client_id': '...', 'id': '<서버 ID, 선택>',
+#            'updated_at': '<클라이언트 수정 시각 ISO8601>', 'data': {...}}
+# - create 는 (user_id, client_id) 로 멱등 처리되므로 재전송해도 중복 생성되지 않습니다.
+# - update/delete 는 updated_at 기준 last-write-wins: 서버 쪽이 더 최신이면 'stale' 로 거절합니다.
+# - 일기 쓰기는 한 번의 bulk_write(ordered=False) 로 반영하고 항목별 결과를 돌려줍니다.
+# - 감정 기록은 시계열 저장소(MoodEntry)에 쌓이는 추가 전용 데이터라 create 만 지원합니다.
+#
+# 변경 커서는 서버 시각(server_updated_at / recorded_at / deleted_at)을 불투명하게 인코딩한 값입니다.
+# 변경 사항은 종류별로 (서버 시각, _id) 순서로 최대 PULL_PAGE_SIZE 개씩 내려주며, 남은 변경이 있으면
+# has_more 와 함께 같은 구간의 다음 위치를 담은 이어받기 커서를 돌려줍니다.
+import base64
+import datetime
+import json
+from bson.objectid import ObjectId
+from pymongo import InsertOne, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
+from backend.mongo_models import get_mongo_db, DiaryEntry, MoodEntry
+from backend.keywords import diary_keywords
+from backend.analytics_rollups import increment as increment_rollup, mood_key, METRIC_MOOD_ENTRIES
+from backend import calendar_summaries, diary_derived, mood_trends, user_stats
+
+MAX_SYNC_OPERATIONS = 500
+# 변경 커서는 현재 시각보다 이만큼 이전까지만 진행합니다. (그 사이의 변경은 다음 동기화에서 다시 전달)
+SETTLE_WINDOW = datetime.timedelta(seconds=5)
+# 한 번의 동기화 응답에 담는 종류별(일기 / 삭제된 일기 / 감정 기록) 최대 변경 수
+PULL_PAGE_SIZE = 200
+
+DIARY_FIELDS = ('title', 'content', 'date', 'mood_emoji_key')
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _fromisoformat(value):
+    return datetime.datetime.fromisoformat(value) if value is not None else None
+
+
+def encode_cursor(until, since=None, positions=None):
+    """until 까지 받았다는 커서. positions({종류: (서버 시각, _id)})가 있으면 (since, until] 을 이어받는 커서입니다."""
+    if positions is None:
+        raw = until.isoformat()
+    else:
+        raw = json.dumps({'since': _isoformat(since), 'until': until.isoformat(),
+                          'after': {kind: [_isoformat(value), str(_id)] for kind, (value, _id) in positions.items()}})
+    return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """커서를 (since, until, positions) 로 되돌립니다. 이어받기 커서가 아니면 until 은 None. 형식이 잘못되면 ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('ascii')
+        if not raw.startswith('{'):
+            return datetime.datetime.fromisoformat(raw), None, {}
+        state = json.loads(raw)
+        positions = {kind: (_fromisoformat(value), ObjectId(_id)) for kind, (value, _id) in state['after'].items()}
+        return _fromisoformat(state['since']), datetime.datetime.fromisoformat(state['until']), positions
+    except Exception:
+        raise ValueError("invalid cursor")
+
+
+def _parse_time(value):
+    """ISO8601 문자열을 UTC naive datetime 으로 변환합니다. (서버의 다른 시각 필드와 같은 형식)"""
+    if not value:
+        return None
+    parsed = datetime.datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    # MongoDB 날짜는 밀리초 정밀도이므로 비교가 어긋나지 않도록 맞춰 둡니다.
+    return parsed.replace(microsecond=parsed.microsecond // 1000 * 1000)
+
+
+def _valid_date(value):
+    try:
+        datetime.datetime.strptime(value, '%Y-%m-%d')
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+def _result(op, status, **extra):
+    return {'client_id': op.get('client_id'), 'op': op.get('op'), 'status': status, **extra}
+
+
+def _load_current(db, user_id, operations):
+    """요청에 등장하는 일기의 현재 상태를 한 번의 쿼리로 읽어 client_id / _id 로 찾을 수 있게 합니다."""
+    client_ids = [op['client_id'] for op in operations if op.get('client_id')]
+    object_ids = [ObjectId(op['id']) for op in operations if op.get('id') and ObjectId.is_valid(op['id'])]
+    conditions = []
+    if client_ids:
+        conditions.append({'client_id': {'$in': client_ids}})
+    if object_ids:
+        conditions.append({'_id': {'$in': object_ids}})
+    by_client_id, by_id = {}, {}
+    if conditions:
+        for doc in db.diary_entries.find({'user_id': user_id, '$or': conditions}):
+            by_id[str(doc['_id'])] = doc
+            if doc.get('client_id'):
+                by_client_id[doc['client_id']] = doc
+    return by_client_id, by_id
+
+
+def _older_than(updated_at):
+    """last-write-wins 조건. updated_at 이 없는 기존 일기는 어떤 변경보다도 오래된 것으로 봅니다."""
+    return {'$or': [{'updated_at': {'$lt': updated_at}}, {'updated_at': None}]}
+
+
+def apply_diary_operations(user_id, operations, now):
+    """일기 동기화 항목을 적용하고 항목별 결과 목록을 반환합니다."""
+    db = get_mongo_db()
+    by_client_id, by_id = _load_current(db, user_id, operations)
+    results = [None] * len(operations)
+    pending = []  # (요청 인덱스, 종류, 쓰기 연산, 적용 후 처리 함수, 서버 ID, 기대 updated_at)
+    seen = set()
+
+    for index, op in enumerate(operations):
+        kind = op.get('op')
+        client_id = op.get('client_id')
+        key = op.get('id') or client_id
+        if kind not in ('create', 'update', 'delete') or not key:
+            results[index] = _result(op, 'invalid', message='op 와 client_id(또는 id)가 필요합니다.')
+            continue
+        if key in seen:
+            results[index] = _result(op, 'invalid', message='같은 일기가 한 요청에 두 번 이상 포함되었습니다.')
+            continue
+        seen.add(key)
+        try:
+            updated_at = _parse_time(op.get('updated_at')) or now
+        except ValueError:
+            results[index] = _result(op, 'invalid', message='updated_at 형식이 올바르지 않습니다.')
+            continue
+        data = op.get('data') or {}
+        current = by_id.get(op['id']) if op.get('id') else by_client_id.get(client_id)
+
+        if kind == 'create':
+            if current:
+                # 이미 반영된 항목의 재전송: 서버 ID 만 알려줍니다.
+                results[index] = _result(op, 'duplicate', id=str(current['_id']))
+                continue
+            if not client_id or not all(data.get(field) for field in DIARY_FIELDS) or not _valid_date(data.get('date')):
+                results[index] = _result(op, 'invalid', message='client_id, 제목, 내용, 날짜(YYYY-MM-DD), 기분 이모지 키가 필요합니다.')
+                continue
+            entry = DiaryEntry(user_id=user_id, title=data['title'], content=data['content'], date=data['date'],
+                               mood_emoji_key=data['mood_emoji_key'], created_at=now, updated_at=updated_at,
+                               keywords=diary_keywords(data['title'], data['content']),
+                               client_id=client_id, server_updated_at=now).to_dict()
+            # (user_id, client_id) 고유 인덱스 덕분에 동시에 재전송돼도 중복 키 오류로 한 번만 생성됩니다.
+            pending.append((index, kind, InsertOne(entry), lambda entry=entry: diary_derived.on_diary_created(entry),
+                            entry['_id'], updated_at))
+            continue
+
+        if not current:
+            results[index] = _result(op, 'not_found')
+            continue
+        if current.get('updated_at') and current['updated_at'] >= updated_at:
+            results[index] = _result(op, 'stale', id=str(current['_id']),
+                                     server_updated_at=current['updated_at'].isoformat())
+            continue
+
+        if kind == 'update':
+            fields = {field: data[field] for field in DIARY_FIELDS if data.get(field)}
+            if 'date' in fields and not _valid_date(fields['date']):
+                results[index] = _result(op, 'invalid', message='날짜 형식이 올바르지 않습니다.')
+                continue
+            if 'title' in fields or 'content' in fields:
+                fields['keywords'] = diary_keywords(fields.get('title', current.get('title')),
+                                                    fields.get('content', current.get('content')))
+            fields.update({'updated_at': updated_at, 'server_updated_at': now})
+            # 읽은 뒤 다른 기기가 먼저 수정했다면 조건이 맞지 않아 덮어쓰지 않습니다.
+            write = UpdateOne({'_id': current['_id'], **_older_than(updated_at)}, {'$set': fields})
+            after = {**current, **fields}
+            pending.append((index, kind, write, lambda before=current, after=after: diary_derived.on_diary_updated(before, after),
+                            current['_id'], updated_at))
+        else:
+            write = DeleteOne({'_id': current['_id'], **_older_than(updated_at)})
+            pending.append((index, kind, write, lambda entry=current: diary_derived.on_diary_deleted(entry, now),
+                            current['_id'], updated_at))
+
+    failed = _bulk_write(db, pending)
+    for position, (index, _, _, after_write, entry_id, _) in enumerate(pending):
+        op = operations[index]
+        if position in failed:
+            status, message = failed[position]
+            extra = {'message': message} if message else {}
+            if status != 'duplicate':
+                extra['id'] = str(entry_id)
+            results[index] = _result(op, status, **extra)
+            continue
+        after_write()
+        results[index] = _result(op, 'applied', id=str(entry_id))
+    return results
+
+
+def _bulk_write(db, pending):
+    """pending 의 쓰기를 한 번에 실행하고 {pending 위치: (상태, 메시지)} 로 반영되지 않은 항목을 반환합니다."""
+    if not pending:
+        return {}
+    failed = {}
+    try:
+        result = db.diary_entries.bulk_write([write for _, _, write, _, _, _ in pending], ordered=False)
+    except BulkWriteError as e:
+        result = None
+        for error in e.details.get('writeErrors', []):
+            duplicate = error.get('code') == 11000
+            failed[error['index']] = ('duplicate', None) if duplicate else ('error', error.get('errmsg'))
+
+    expected = sum(1 for _, kind, _, _, _, _ in pending if kind != 'create')
+    confirmed = (result.modified_count + result.deleted_count) if result is not None else None
+    if expected and confirmed != expected:
+        # 읽은 뒤 다른 기기가 더 최신 값으로 덮어쓴 경우 조건부 쓰기가 일치하지 않습니다. 해당 항목만 다시 확인합니다.
+        targets = {entry_id for _, kind, _, _, entry_id, _ in pending if kind != 'create'}
+        now_state = {doc['_id']: doc for doc in db.diary_entries.find({'_id': {'$in': list(targets)}}, {'updated_at': 1})}
+        for position, (_, kind, _, _, entry_id, updated_at) in enumerate(pending):
+            if kind == 'create' or position in failed:
+                continue
+            doc = now_state.get(entry_id)
+            applied = doc is None if kind == 'delete' else (doc is not None and doc.get('updated_at') == updated_at)
+            if not applied:
+                failed[position] = ('stale', None)
+    return failed
+
+
+def apply_mood_operations(user_id, operations, now):
+    """감정 기록 동기화 항목(create 만 지원)을 적용하고 항목별 결과 목록을 반환합니다."""
+    results = [None] * len(operations)
+    client_ids = [op.get('client_id') for op in operations if op.get('client_id')]
+    existing = set()
+    if client_ids:
+        existing = {doc['client_id'] for doc in MoodEntry.aggregate(
+            [{'$match': {'client_id': {'$in': client_ids}}}, {'$project': {'_id': 0, 'client_id': 1}}], user_id)}
+
+    new_entries = []
+    for index, op in enumerate(operations):
+        client_id = op.get('client_id')
+        data = op.get('data') or {}
+        if op.get('op') != 'create':
+            results[index] = _result(op, 'invalid', message='감정 기록은 create 만 지원합니다.')
+            continue
+        if not client_id:
+            results[index] = _result(op, 'invalid', message='client_id 가 필요합니다.')
+            continue
+        if client_id in existing:
+            results[index] = _result(op, 'duplicate')
+            continue
+        mood_score, mood, date = data.get('mood_score'), data.get('mood'), data.get('date')
+        if mood_score is not None and (not isinstance(mood_score, (int, float)) or not 1 <= mood_score <= 5):
+            results[index] = _result(op, 'invalid', message='기분 점수는 1에서 5 사이의 숫자여야 합니다.')
+            continue
+        if (mood_score is None and not mood) or (date is not None and not _valid_date(date)):
+            results[index] = _result(op, 'invalid', message='날짜(YYYY-MM-DD)와 기분 점수 또는 감정이 필요합니다.')
+            continue
+        try:
+            timestamp = _parse_time(op.get('updated_at')) if date is None else None
+        except ValueError:
+            results[index] = _result(op, 'invalid', message='updated_at 형식이 올바르지 않습니다.')
+            continue
+        existing.add(client_id)
+        entry = MoodEntry(user_id=user_id, timestamp=timestamp, date=date, mood=mood, mood_score=mood_score,
+                          source='sync', recorded_at=now, client_id=client_id)
+        new_entries.append((index, entry))
+
+    if new_entries:
+        MoodEntry.add_many([entry for _, entry in new_entries])
+        user_stats.record_moods(user_id, [entry.to_dict() for _, entry in new_entries])
+        mood_trends.invalidate(user_id)
+    for index, entry in new_entries:
+        increment_rollup(METRIC_MOOD_ENTRIES, entry.date, key=mood_key(entry.to_dict()))
+        calendar_summaries.record_mood(user_id, entry.date, mood_score=entry.mood_score, mood=entry.mood)
+        results[index] = _result(operations[index], 'applied', id=str(entry._id))
+    return results
+
+
+def _serialize(doc, fields):
+    doc['_id'] = str(doc['_id'])
+    for field in fields:
+        if isinstance(doc.get(field), datetime.datetime):
+            doc[field] = doc[field].isoformat()
+    return doc
+
+
+def _after(field, position):
+    """(field, _id) 오름차순에서 position 다음에 오는 문서 조건. field 가 없는 문서는 가장 앞에 옵니다."""
+    if position is None:
+        return {}
+    value, _id = position
+    if value is None:
+        return {'$or': [{field: {'$ne': None}}, {field: None, '_id': {'$gt': _id}}]}
+    return {'$or': [{field: {'$gt': value}}, {field: value, '_id': {'$gt': _id}}]}
+
+
+def _page(docs, field):
+    """PULL_PAGE_SIZE + 1 개까지 읽은 문서 -> (이번 페이지, 마지막 위치, 남은 변경 여부)"""
+    docs = list(docs)
+    page = docs[:PULL_PAGE_SIZE]
+    position = (page[-1].get(field), page[-1]['_id']) if page else None
+    return page, position, len(docs) > PULL_PAGE_SIZE
+
+
+def pull_changes(user_id, since, until, positions=None):
+    """(since, until] 사이에 서버에 반영된 변경 사항을 반환합니다. since 가 None 이면 전체.
+
+    positions 는 이어받기 커서의 종류별 마지막 위치입니다.
+    반환값: (변경 사항, 다음 커서, 남은 변경 여부)
+    """
+    db = get_mongo_db()
+    positions = dict(positions or {})
+    window = {'$lte': until} if since is None else {'$gt': since, '$lte': until}
+    has_more = False
+
+    diary_conditions = []
+    if since is not None:
+        # server_updated_at 이 없는 기존 일기는 서버에서 기록한 updated_at 으로 대신 판단합니다.
+        diary_conditions.append({'$or': [
+            {'server_updated_at': window},
+            {'server_updated_at': {'$exists': False}, 'updated_at': window},
+        ]})
+    if positions.get('diaries'):
+        diary_conditions.append(_after('server_updated_at', positions['diaries']))
+    diary_query = {'user_id': user_id, **({'$and': diary_conditions} if diary_conditions else {})}
+    diaries, position, more = _page(db.diary_entries.find(diary_query, {'keywords': 0})
+                                    .sort([('server_updated_at', 1), ('_id', 1)]).limit(PULL_PAGE_SIZE + 1),
+                                    'server_updated_at')
+    diaries = [_serialize(doc, ('created_at', 'updated_at', 'server_updated_at')) for doc in diaries]
+    positions['diaries'] = position or positions.get('diaries')
+    has_more |= more
+
+    deleted = []
+    if since is not None:
+        tombstones, position, more = _page(db[diary_derived.TOMBSTONE_COLLECTION].find(
+            {'user_id': user_id, 'kind': 'diary', 'deleted_at': window, **_after('deleted_at', positions.get('deleted_diaries'))}
+        ).sort([('deleted_at', 1), ('_id', 1)]).limit(PULL_PAGE_SIZE + 1), 'deleted_at')
+        deleted = [{'id': doc['id'], 'client_id': doc.get('client_id'), 'deleted_at': doc['deleted_at'].isoformat()}
+                   for doc in tombstones]
+        positions['deleted_diaries'] = position or positions.get('deleted_diaries')
+        has_more |= more
+
+    moods, position, more = _page(MoodEntry.aggregate([
+        {'$match': {'recorded_at': window, **_after('recorded_at', positions.get('moods'))}},
+        {'$project': {'legacy_id': 0}},
+        {'$sort': {'recorded_at': 1, '_id': 1}},
+        {'$limit': PULL_PAGE_SIZE + 1},
+    ], user_id), 'recorded_at')
+    moods = [_serialize(doc, ('timestamp', 'recorded_at')) for doc in moods]
+    positions['moods'] = position or positions.get('moods')
+    has_more |= more
+
+    changes = {'diaries': diaries, 'deleted_diaries': deleted, 'moods': moods}
+    if not has_more:
+        return changes, encode_cursor(until), False
+    positions = {kind: position for kind, position in positions.items() if position is not None}
+    return changes, encode_cursor(until, since, positions), True
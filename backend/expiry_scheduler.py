@@ -0,0 +1,159 @@
+# backend/expiry_scheduler.py
+# 공지사항 게시 종료와 게시글 정지 기간 만료를 제때 반영하는 백그라운드 스케줄러입니다.
+#   - notice_end     : 게시 종료일이 지난 공지 -> is_public = False, 공개 공지 캐시 갱신 (public_notices)
+#   - post_suspension: 정지 해제 일시가 지난 게시글 -> is_suspended = False, suspended_until = NULL
+#
+# 가까운 시일 안에 예정된 전환을 (시각, 종류, ID) 최소 힙에 넣어 두고, 가장 이른 시각까지 기다렸다가 처리합니다.
+# 힙에는 앞으로 SWEEP_INTERVAL_SECONDS 안에 예정된 전환만 담으며, 같은 주기로 sweep() 이
+#   1) 이미 시각이 지난 전환을 모두 반영하고 (다른 워커에서 만든 전환, 서버가 꺼져 있던 동안의 전환 보정)
+#   2) 다음 구간에 예정된 전환을 DB 에서 다시 읽어 힙을 채웁니다.
+# 관리자가 게시 종료일/정지 기간을 지정하면 라우트에서 schedule() 로 같은 워커의 힙에 바로 넣습니다.
+#
+# 전환은 "시각이 지났고 아직 반영되지 않은 행" 만 바꾸는 조건부 UPDATE 이므로
+# 여러 워커가 같은 전환을 처리하거나, 수정되기 전의 오래된 항목이 힙에 남아 있어도 결과는 같습니다.
+# 스케줄러 스레드는 워커의 첫 요청에서 시작하며 EXPIRY_SCHEDULER_ENABLED=false 로 끌 수 있습니다.
+# (이 경우 cron 등에서 flask apply-expiries 를 주기적으로 실행하세요.)
+import heapq
+import datetime
+import threading
+from backend.extensions import db
+from backend.maria_models import Notice, Post
+from backend import public_notices
+
+SWEEP_INTERVAL_SECONDS = 60
+# 처리 중 오류(DB 연결 실패 등)가 나면 이 시간부터 두 배씩 늘려 최대 SWEEP_INTERVAL_SECONDS 까지 기다렸다가 다시 sweep 합니다.
+ERROR_BACKOFF_SECONDS = 5
+NOTICE_END = 'notice_end'
+POST_SUSPENSION = 'post_suspension'
+
+_heap = []
+_horizon = None
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_thread = None
+
+
+def _utc_naive(value):
+    """DB 컬럼과 비교할 수 있도록 timezone 이 있는 값은 UTC naive datetime 으로 바꿉니다."""
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def apply_due(now=None):
+    """시각이 지난 전환을 모두 반영합니다. 반환값: {'notices_ended': 건수, 'posts_unsuspended': 건수}"""
+    now = now or datetime.datetime.utcnow()
+    notices_ended = db.session.execute(
+        db.update(Notice).where(Notice.is_public == True, Notice.end_date <= now)
+        .values(is_public=False).execution_options(synchronize_session=False)
+    ).rowcount
+    # 정지 해제는 작성자의 수정이 아니므로 updated_at 은 그대로 둡니다.
+    posts_unsuspended = db.session.execute(
+        db.update(Post).where(Post.is_suspended == True, Post.suspended_until <= now)
+        .values(is_suspended=False, suspended_until=None, updated_at=Post.updated_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    if notices_ended:
+        public_notices.invalidate()
+    return {'notices_ended': notices_ended, 'posts_unsuspended': posts_unsuspended}
+
+
+def _upcoming(now, horizon):
+    events = [(end_date, NOTICE_END, notice_id) for notice_id, end_date in
+              db.session.query(Notice.id, Notice.end_date)
+              .filter(Notice.is_public == True, Notice.end_date > now, Notice.end_date <= horizon)]
+    events += [(suspended_until, POST_SUSPENSION, post_id) for post_id, suspended_until in
+               db.session.query(Post.id, Post.suspended_until)
+               .filter(Post.is_suspended == True, Post.suspended_until > now, Post.suspended_until <= horizon)]
+    return events
+
+
+def sweep(now=None):
+    """지난 전환을 반영하고 다음 SWEEP_INTERVAL_SECONDS 동안의 전환으로 힙을 다시 채웁니다."""
+    global _horizon
+    now = now or datetime.datetime.utcnow()
+    result = apply_due(now)
+    horizon = now + datetime.timedelta(seconds=SWEEP_INTERVAL_SECONDS)
+    events = _upcoming(now, horizon)
+    heapq.heapify(events)
+    with _lock:
+        _heap[:] = events
+        _horizon = horizon
+    return result
+
+
+def schedule(kind, item_id, due_at):
+    """전환을 예약합니다. 다음 sweep 전에 도래하는 것만 힙에 넣고, 나머지는 sweep 이 읽어 옵니다."""
+    if due_at is None:
+        return
+    due_at = _utc_naive(due_at)
+    with _lock:
+        if _horizon is None or due_at > _horizon:
+            return
+        heapq.heappush(_heap, (due_at, kind, item_id))
+    _wakeup.set()
+
+
+def _pop_due(now):
+    due = []
+    with _lock:
+        while _heap and _heap[0][0] <= now:
+            due.append(heapq.heappop(_heap))
+    return due
+
+
+def _seconds_until_next(next_sweep_at):
+    now = datetime.datetime.utcnow()
+    with _lock:
+        next_at = min(_heap[0][0], next_sweep_at) if _heap else next_sweep_at
+    return max((next_at - now).total_seconds(), 0)
+
+
+def _run(app):
+    next_sweep_at = datetime.datetime.utcnow()
+    failures = 0
+    while True:
+        with app.app_context():
+            now = datetime.datetime.utcnow()
+            try:
+                if now >= next_sweep_at:
+                    # 실패하더라도 같은 시각의 sweep 을 곧바로 반복하지 않도록 먼저 다음 시각을 정합니다.
+                    next_sweep_at = now + datetime.timedelta(seconds=SWEEP_INTERVAL_SECONDS)
+                    sweep(now)
+                elif _pop_due(now):
+                    # 어떤 전환이 도래했는지와 관계없이 지난 전환을 모두 조건부로 반영합니다.
+                    apply_due(now)
+                failures = 0
+            except Exception as e:
+                db.session.rollback()
+                failures += 1
+                backoff = min(ERROR_BACKOFF_SECONDS * 2 ** (failures - 1), SWEEP_INTERVAL_SECONDS)
+                # 놓친 전환은 백오프 뒤의 sweep 이 다시 반영합니다.
+                next_sweep_at = now + datetime.timedelta(seconds=backoff)
+                app.logger.error(f"Error applying scheduled expiries (retry in {backoff}s): {e}", exc_info=True)
+            finally:
+                db.session.remove()
+        _wakeup.wait(_seconds_until_next(next_sweep_at))
+        _wakeup.clear()
+
+
+def start(app):
+    """이 프로세스의 스케줄러 스레드를 (아직 없으면) 시작합니다."""
+    global _thread
+    if _thread is not None:
+        return
+    with _lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=_run, args=(app,), name='expiry-scheduler', daemon=True)
+        _thread.start()
+
+
+def init_app(app):
+    if not app.config.get('EXPIRY_SCHEDULER_ENABLED', True):
+        return
+
+    @app.before_request
+    def start_expiry_scheduler():
+        start(app)
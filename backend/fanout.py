@@ -0,0 +1,95 @@
+# backend/fanout.py
+# 서로 독립적인 여러 저장소 조회(MariaDB / MongoDB)를 동시에 실행하는 fan-out 도우미입니다.
+# 대시보드처럼 여러 개의 카운트를 모아 보여주는 API 에서 전체 지연 시간이
+# 각 조회 시간의 합이 아니라 가장 느린 조회 하나의 시간이 되도록 합니다.
+#
+#   values, trace = fan_out({
+#       'total_users': lambda: User.query.count(),
+#       'diary_entry_count': lambda: get_mongo_db().diary_entries.estimated_document_count(),
+#   }, timeout=1.0)
+#
+# - 스레드 수가 제한된 공용 ThreadPoolExecutor 에서 실행되며, 각 작업은 자체 app context 안에서 돕니다.
+#   (g 는 공유되지 않으므로 g.user_id 같은 값은 호출 전에 변수로 꺼내 클로저로 넘겨주세요.)
+# - 작업별 제한 시간을 넘기거나 예외가 나면 fallback 값으로 대신하고 나머지 결과는 그대로 반환합니다.
+#   (이미 실행 중인 쿼리는 중단되지 않으므로 MongoDB 쿼리에는 maxTimeMS 를 함께 지정하는 것이 좋습니다.)
+# - trace 에는 작업별 상태(ok/timeout/error)와 소요 시간(ms)이 담기며, 로그와 Server-Timing 헤더로 남깁니다.
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from flask import current_app
+
+MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 2.0
+
+STATUS_OK = 'ok'
+STATUS_TIMEOUT = 'timeout'
+STATUS_ERROR = 'error'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # gunicorn 워커 프로세스마다 처음 사용할 때 만듭니다.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='fanout')
+        return _executor
+
+
+def _run_in_context(app, fn):
+    """(결과, 소요 시간 ms, 예외) 를 반환합니다. 실패한 작업도 실제 소요 시간을 남기기 위해 예외를 값으로 돌려줍니다."""
+    with app.app_context():
+        started = time.perf_counter()
+        try:
+            return fn(), (time.perf_counter() - started) * 1000, None
+        except Exception as e:
+            return None, (time.perf_counter() - started) * 1000, e
+
+
+def fan_out(branches, timeout=DEFAULT_TIMEOUT, timeouts=None, fallback=None, label='fan-out'):
+    """branches: {이름: 인자 없는 함수} 를 동시에 실행합니다.
+
+    timeout 은 모든 작업의 기본 제한 시간(초)이고, timeouts 로 작업별 제한 시간을 따로 줄 수 있습니다.
+    반환값: (values, trace)
+      values: {이름: 결과 또는 fallback}
+      trace: [{'name', 'status', 'ms'}, ...] (branches 순서)
+    """
+    app = current_app._get_current_object()
+    executor = _get_executor()
+    timeouts = timeouts or {}
+    started = time.perf_counter()
+    futures = {name: executor.submit(_run_in_context, app, fn) for name, fn in branches.items()}
+
+    values, trace = {}, []
+    for name, future in futures.items():
+        deadline = started + timeouts.get(name, timeout)
+        try:
+            value, elapsed, error = future.result(timeout=max(deadline - time.perf_counter(), 0))
+        except FutureTimeoutError:
+            # 아직 시작하지 않은 작업은 취소되고, 실행 중인 작업은 결과만 버립니다.
+            future.cancel()
+            values[name], elapsed, status = fallback, (time.perf_counter() - started) * 1000, STATUS_TIMEOUT
+            app.logger.warning(f"[{label}] '{name}' timed out after {elapsed:.1f} ms")
+        else:
+            if error is None:
+                values[name], status = value, STATUS_OK
+            else:
+                values[name], status = fallback, STATUS_ERROR
+                app.logger.error(f"[{label}] '{name}' failed: {error}", exc_info=error)
+        trace.append({'name': name, 'status': status, 'ms': round(elapsed, 1)})
+
+    total = (time.perf_counter() - started) * 1000
+    app.logger.info(f"[{label}] {total:.1f} ms total | " +
+                    ", ".join(f"{branch['name']}={branch['ms']}ms({branch['status']})" for branch in trace))
+    return values, trace
+
+
+def failed_branches(trace):
+    return [branch['name'] for branch in trace if branch['status'] != STATUS_OK]
+
+
+def server_timing(trace):
+    """브라우저 개발자 도구에서 작업별 지연 시간을 볼 수 있도록 Server-Timing 헤더 값을 만듭니다."""
+    return ', '.join(f"{branch['name']};desc={branch['status']};dur={branch['ms']}" for branch in trace)
@@ -0,0 +1,143 @@
+# backend/keyword_analytics.py
+# 연구자용 전체 코퍼스 키워드 집계 배치 작업입니다. (`flask build-keyword-rollups`)
+# 일기 / 챗봇 대화(사용자 발화) / 커뮤니티 게시글 본문을 서버 측 커서로 스트리밍하면서
+# 청크 단위로 프로세스 풀에서 토큰화하고, 청크별 카운터를 합쳐 월 단위 집계 문서로 저장합니다.
+#
+#   {'_id': 'diary:2025-08', 'source': 'diary', 'period': '2025-08',
+#    'documents': 812, 'counts': {'친구': 120, '회사': 98, ...}, 'updated_at': ...}
+#
+# 카운트는 '해당 키워드가 등장한 문서 수' 입니다. 관리자 상위 키워드 API 는 이 컬렉션만 읽습니다.
+import os
+import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pymongo import ReplaceOne
+from backend.mongo_models import get_mongo_db
+from backend.keywords import extract_keywords
+
+KEYWORD_ROLLUP_COLLECTION = 'keyword_rollups'
+
+# 기간(월)별로 보관할 최대 키워드 수. 꼬리 부분은 상위 키워드 계산에 영향이 거의 없습니다.
+KEEP_TOP_KEYWORDS = 500
+
+# source 이름 -> (컬렉션, 조건, 본문 필드들, 시각 필드)
+KEYWORD_SOURCES = {
+    'diary': ('diary_entries', {}, ('title', 'content'), 'created_at'),
+    'chat': ('chat_history', {'sender': 'user'}, ('message',), 'timestamp'),
+    'community': ('post_contents', {}, ('content',), 'created_at'),
+}
+
+
+def _period_of(value):
+    return value.strftime('%Y-%m') if isinstance(value, datetime.datetime) else None
+
+
+def count_chunk(items):
+    """[(기간, 텍스트), ...] 를 토큰화해 {기간: (문서 수, Counter)} 로 반환합니다.
+
+    프로세스 풀에서 실행되므로 모듈 최상위 함수여야 하며 DB/Flask 에 접근하지 않습니다.
+    """
+    result = {}
+    for period, text in items:
+        documents, counts = result.get(period, (0, Counter()))
+        counts.update(extract_keywords(text))
+        result[period] = (documents + 1, counts)
+    return result
+
+
+def _stream_chunks(db, source, since=None, chunk_size=2000):
+    """source 의 문서를 서버 측 커서로 읽어 (기간, 텍스트) 청크를 생성합니다."""
+    collection_name, query, text_fields, time_field = KEYWORD_SOURCES[source]
+    query = dict(query)
+    if since is not None:
+        query[time_field] = {'$gte': since}
+    projection = {'_id': 0, time_field: 1, **{field: 1 for field in text_fields}}
+    cursor = db[collection_name].find(query, projection).batch_size(chunk_size)
+    chunk = []
+    for doc in cursor:
+        period = _period_of(doc.get(time_field))
+        if period is None:
+            continue
+        chunk.append((period, ' '.join(str(doc.get(field) or '') for field in text_fields)))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _merge(totals, partial):
+    for period, (documents, counts) in partial.items():
+        total_documents, total_counts = totals.get(period, (0, Counter()))
+        total_counts.update(counts)
+        totals[period] = (total_documents + documents, total_counts)
+
+
+def _count_source(db, source, executor, since, chunk_size, max_pending):
+    totals = {}
+    pending = set()
+    for chunk in _stream_chunks(db, source, since, chunk_size):
+        pending.add(executor.submit(count_chunk, chunk))
+        # 커서가 풀보다 빠르게 읽어도 메모리에 쌓이는 청크 수는 max_pending 으로 제한됩니다.
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                _merge(totals, future.result())
+    for future in pending:
+        _merge(totals, future.result())
+    return totals
+
+
+def build_keyword_rollups(sources=None, since=None, workers=None, chunk_size=2000):
+    """source 별 월간 키워드 집계를 다시 계산해 덮어씁니다.
+
+    since(datetime) 를 주면 그 시점이 속한 달부터만 다시 계산합니다.
+    반환값: {source: 갱신된 기간(월) 수}
+    """
+    db = get_mongo_db()
+    collection = db[KEYWORD_ROLLUP_COLLECTION]
+    if since is not None:
+        since = datetime.datetime(since.year, since.month, 1)
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for source in (sources or KEYWORD_SOURCES.keys()):
+            totals = _count_source(db, source, executor, since, chunk_size, max_pending)
+            now = datetime.datetime.utcnow()
+            operations = [
+                ReplaceOne({'_id': f'{source}:{period}'}, {
+                    'source': source,
+                    'period': period,
+                    'documents': documents,
+                    'counts': dict(counts.most_common(KEEP_TOP_KEYWORDS)),
+                    'updated_at': now,
+                }, upsert=True)
+                for period, (documents, counts) in totals.items()
+            ]
+            if operations:
+                collection.bulk_write(operations, ordered=False)
+            # 다시 계산한 범위에서 원본이 사라진 기간의 집계 문서는 제거합니다.
+            stale_query = {'source': source, 'period': {'$nin': list(totals.keys())}}
+            if since is not None:
+                stale_query['period']['$gte'] = since.strftime('%Y-%m')
+            collection.delete_many(stale_query)
+            results[source] = len(operations)
+    return results
+
+
+def get_top_keywords(start_period=None, end_period=None, sources=None, limit=10):
+    """기간('YYYY-MM') 내 집계 문서를 합산해 [(키워드, 문서 수), ...] 상위 limit 개를 반환합니다."""
+    query = {}
+    if sources:
+        query['source'] = {'$in': list(sources)}
+    if start_period or end_period:
+        query['period'] = {}
+        if start_period:
+            query['period']['$gte'] = start_period
+        if end_period:
+            query['period']['$lte'] = end_period
+    totals = Counter()
+    for rollup in get_mongo_db()[KEYWORD_ROLLUP_COLLECTION].find(query, {'counts': 1}):
+        totals.update(rollup.get('counts', {}))
+    return sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:limit]
@@ -0,0 +1,133 @@
+# backend/keywords.py
+# 일기 키워드 추출과 사용자별 키워드 카운터(user_keyword_counts)를 관리합니다.
+# 키워드는 일기 작성/수정 시점에 한 번만 추출해 일기 문서의 keywords 필드에 저장하고,
+# 사용자별 카운터 문서는 추가/삭제된 키워드만 $inc 로 갱신합니다.
+#
+#   {'_id': 3, 'counts': {'친구': 4, '회사': 2, ...}, 'updated_at': ...}
+#
+# 카운트는 '해당 키워드가 등장한 일기 수' 입니다. (일기 하나에서 여러 번 나와도 1)
+import re
+import datetime
+from collections import Counter
+from pymongo import UpdateOne
+from flask import current_app
+from backend.mongo_models import get_mongo_db
+
+USER_KEYWORD_COLLECTION = 'user_keyword_counts'
+
+# 일기 하나에서 저장할 최대 키워드 수
+MAX_KEYWORDS_PER_DIARY = 20
+
+_TOKEN_PATTERN = re.compile(r'[가-힣]+|[A-Za-z][A-Za-z0-9]+')
+
+# 어절 끝에서 떼어낼 조사/어미 (긴 것부터 검사합니다)
+_SUFFIXES = sorted([
+    '에서부터', '으로부터', '에게서', '한테서', '이라서', '이라고', '이라는', '이지만',
+    '에서는', '에게는', '으로는', '까지는', '부터는', '했는데', '했지만', '했어요', '했다고',
+    '에서', '에게', '한테', '으로', '까지', '부터', '처럼', '보다', '이랑', '하고', '이나',
+    '라서', '라고', '라는', '지만', '는데', '했다', '했고', '해서', '하게', '하는', '하다',
+    '했던', '하며', '이다', '였다', '이었',
+    '은', '는', '이', '가', '을', '를', '에', '의', '도', '만', '로', '와', '과', '랑', '나', '요',
+], key=len, reverse=True)
+
+# 과거/진행형 용언(먹었다, 받았다고, 했는데 ...)은 키워드에서 제외합니다.
+_PREDICATE_PATTERN = re.compile(
+    r'(았|었|였|했|겠|웠|졌|왔|갔|봤|줬|냈|났|섰|렸|켰|쳤)(다|다고|다는|는데|지만|어요|고|서|던|는)?$'
+    r'|(한|된|는)다$|습니다$|는데$'
+)
+
+STOPWORDS = frozenset([
+    '오늘', '어제', '내일', '그리고', '그래서', '그런데', '하지만', '그러나', '그냥', '정말', '진짜',
+    '너무', '조금', '많이', '아주', '매우', '계속', '다시', '이제', '아직', '벌써', '항상', '가끔',
+    '나는', '내가', '저는', '제가', '우리', '그것', '이것', '저것', '여기', '거기', '저기',
+    '무엇', '어떤', '어떻게', '왜냐하면', '때문', '정도', '하루', '생각', '느낌', '것같다',
+    '있다', '없다', '했다', '한다', '된다', '같다', '이다', '아니', '그렇', '있었', '없었',
+    'the', 'and', 'for', 'with', 'this', 'that', 'was', 'are',
+])
+
+
+def _stem(token):
+    """조사/어미를 한 번 떼어냅니다. 남는 어간이 2글자 미만이면 원래 토큰을 유지합니다."""
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            return token[:-len(suffix)]
+    return token
+
+
+def extract_keywords(text, limit=MAX_KEYWORDS_PER_DIARY):
+    """텍스트에서 키워드를 등장 빈도순으로 최대 limit 개 추출합니다.
+
+    형태소 분석기 없이 어절 분리 + 조사/어미 제거 + 불용어 제거만 수행하는 경량 추출기입니다.
+    """
+    counts = Counter()
+    for token in _TOKEN_PATTERN.findall(text or ''):
+        token = _stem(token.lower())
+        if len(token) < 2 or token in STOPWORDS or _PREDICATE_PATTERN.search(token):
+            continue
+        counts[token] += 1
+    return [keyword for keyword, _ in counts.most_common(limit)]
+
+
+def diary_keywords(title, content):
+    return extract_keywords(f"{title or ''} {content or ''}")
+
+
+def apply_keyword_changes(user_id, old_keywords=None, new_keywords=None):
+    """일기 키워드가 old -> new 로 바뀐 만큼 사용자 카운터를 갱신합니다.
+
+    집계 실패가 원래 쓰기 요청을 실패시키지 않도록 예외는 로그만 남깁니다. (rebuild 로 복구 가능)
+    """
+    old_set, new_set = set(old_keywords or []), set(new_keywords or [])
+    inc = {f'counts.{keyword}': 1 for keyword in new_set - old_set}
+    inc.update({f'counts.{keyword}': -1 for keyword in old_set - new_set})
+    if not inc:
+        return
+    try:
+        get_mongo_db()[USER_KEYWORD_COLLECTION].update_one(
+            {'_id': user_id},
+            {'$inc': inc, '$set': {'updated_at': datetime.datetime.utcnow()}},
+            upsert=True
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error updating keyword counts for user {user_id}: {e}", exc_info=True)
+
+
+def get_top_keywords(user_id, limit=10):
+    """[(키워드, 일기 수), ...] 상위 limit 개를 반환합니다. 카운터 문서 하나만 읽습니다."""
+    doc = get_mongo_db()[USER_KEYWORD_COLLECTION].find_one({'_id': user_id}, {'counts': 1}) or {}
+    counts = [(keyword, count) for keyword, count in doc.get('counts', {}).items() if count > 0]
+    counts.sort(key=lambda item: (-item[1], item[0]))
+    return counts[:limit]
+
+
+def delete_user_keywords(user_id):
+    get_mongo_db()[USER_KEYWORD_COLLECTION].delete_one({'_id': user_id})
+
+
+def rebuild_keywords(batch_size=500):
+    """모든 일기의 keywords 필드를 다시 추출하고 사용자별 카운터를 처음부터 다시 계산합니다.
+
+    반환값: (처리한 일기 수, 카운터를 갱신한 사용자 수)
+    """
+    db = get_mongo_db()
+    user_counts = {}
+    operations = []
+    processed = 0
+    cursor = db.diary_entries.find({}, {'user_id': 1, 'title': 1, 'content': 1}).batch_size(batch_size)
+    for entry in cursor:
+        keywords = diary_keywords(entry.get('title'), entry.get('content'))
+        user_counts.setdefault(entry.get('user_id'), Counter()).update(keywords)
+        operations.append(UpdateOne({'_id': entry['_id']}, {'$set': {'keywords': keywords}}))
+        processed += 1
+        if len(operations) >= batch_size:
+            db.diary_entries.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        db.diary_entries.bulk_write(operations, ordered=False)
+
+    now = datetime.datetime.utcnow()
+    collection = db[USER_KEYWORD_COLLECTION]
+    collection.delete_many({'_id': {'$nin': list(user_counts.keys())}})
+    for user_id, counts in user_counts.items():
+        collection.replace_one({'_id': user_id}, {'counts': dict(counts), 'updated_at': now}, upsert=True)
+    return processed, len(user_counts)
@@ -40,6 +40,11 @@ class User(db.Model):
     # User와 NicknameHistory의 일대다 관계 설정
     nickname_history = db.relationship('NicknameHistory', backref='user', lazy=True, cascade="all, delete-orphan")
 
+    # 관리자 사용자 목록: 가입일 최신순 keyset 페이지네이션 (username/email/nickname/user_uid 는 UNIQUE 인덱스 사용)
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -93,6 +98,14 @@ class Post(db.Model):
     comments = db.relationship('Comment', backref='post', lazy=True, cascade="all, delete-orphan")
     likes = db.relationship('PostLike', backref='post', lazy=True, cascade="all, delete-orphan")
 
+    # 게시글 목록: (공지 우선, 최신순) 정렬 및 카테고리 필터
+    __table_args__ = (
+        db.Index('ix_posts_is_notice_created_at', 'is_notice', 'created_at'),
+        db.Index('ix_posts_category_is_notice_created_at', 'category', 'is_notice', 'created_at'),
+        # 정지 기간 만료 처리 (expiry_scheduler)
+        db.Index('ix_posts_is_suspended_suspended_until', 'is_suspended', 'suspended_until'),
+    )
+
 class Comment(db.Model):
     __tablename__ = 'comments'
     id = db.Column(db.Integer, primary_key=True)
@@ -104,11 +117,21 @@ class Comment(db.Model):
     likes = db.relationship('CommentLike', backref='comment', lazy=True, cascade="all, delete-orphan")
     is_anonymous = db.Column(db.Boolean, nullable=False, default=False)
 
+    # 게시글 상세: 게시글별 댓글을 작성순으로 조회
+    __table_args__ = (
+        db.Index('ix_comments_post_id_created_at', 'post_id', 'created_at'),
+    )
+
 class PostLike(db.Model):
     __tablename__ = 'post_likes'
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
     post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), primary_key=True)
 
+    # PK가 (user_id, post_id)이므로 게시글별 좋아요 수 집계를 위한 별도 인덱스
+    __table_args__ = (
+        db.Index('ix_post_likes_post_id', 'post_id'),
+    )
+
 class CommentLike(db.Model):
     __tablename__ = 'comment_likes'
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
@@ -122,6 +145,10 @@ class NicknameHistory(db.Model):
     new_nickname = db.Column(db.String(80), nullable=False)
     changed_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_nickname_history_user_id_changed_at', 'user_id', 'changed_at'),
+    )
+
 # NEW: Notice Model for Notice Management
 class Notice(db.Model):
     __tablename__ = 'notices'
@@ -138,5 +165,10 @@ class Notice(db.Model):
     # Notice와 User의 관계 설정 (작성자)
     author = relationship('User', backref='notices', lazy=True)
 
+    # 공개 공지사항 조회: 공개 여부 + 게시 기간 필터
+    __table_args__ = (
+        db.Index('ix_notices_is_public_start_date_end_date', 'is_public', 'start_date', 'end_date'),
+    )
+
     def __repr__(self):
         return f'<Notice {self.title}>'
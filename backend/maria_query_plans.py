@@ -0,0 +1,120 @@
+# backend/maria_query_plans.py
+# MariaDB 핫 쿼리들의 실행 계획(EXPLAIN)을 검사해 풀 스캔이나 filesort 로
+# 회귀하지 않았는지 확인합니다. `flask explain-hot-queries` 에서 사용합니다.
+import datetime
+from sqlalchemy import create_engine, func, or_, and_
+from backend.extensions import db
+from backend.maria_models import Post, Comment, PostLike, Notice, NicknameHistory, User, UserRole
+from backend.expiry_scheduler import SWEEP_INTERVAL_SECONDS
+
+
+def _hot_queries():
+    """라우트에서 실행하는 쿼리와 같은 모양의 대표 쿼리 목록을 반환합니다.
+
+    allow_filesort: 결과 집합이 항상 작아 정렬 비용이 무시할 만한 쿼리에만 True 로 둡니다.
+    """
+    now = datetime.datetime(2000, 1, 1)
+    like_count = db.select(func.count()).where(PostLike.post_id == Post.id).correlate(Post).scalar_subquery()
+    comment_count = db.select(func.count()).where(Comment.post_id == Post.id).correlate(Post).scalar_subquery()
+    posts_list = db.select(Post.id, like_count, comment_count)\
+        .order_by(Post.is_notice.desc(), Post.created_at.desc()).limit(25)
+
+    return [
+        # community_routes.get_posts
+        {'name': 'get_posts', 'statement': posts_list},
+        {'name': 'get_posts (category_filter)', 'statement': posts_list.where(Post.category == 'free')},
+        # community_routes.get_post_detail
+        {'name': 'get_post_detail (counts)',
+         'statement': db.select(Post.id, like_count, comment_count).where(Post.id == 1)},
+        {'name': 'get_post_detail (comments)',
+         'statement': db.select(Comment.id).where(Comment.post_id == 1).order_by(Comment.created_at.asc())},
+        # public_notices._load (공개 공지 캐시 재구성)
+        {'name': 'public notices cache',
+         'statement': db.select(Notice.id).where(
+             Notice.is_public == True,
+             Notice.start_date != None,
+             or_(Notice.end_date == None, Notice.end_date > now)
+         ).order_by(Notice.created_at.desc()),
+         'allow_filesort': True},
+        # expiry_scheduler.apply_due / _upcoming
+        {'name': 'expiry (due notices)',
+         'statement': db.select(Notice.id).where(Notice.is_public == True, Notice.end_date <= now)},
+        {'name': 'expiry (due post suspensions)',
+         'statement': db.select(Post.id).where(Post.is_suspended == True, Post.suspended_until <= now)},
+        {'name': 'expiry (upcoming post suspensions)',
+         'statement': db.select(Post.id, Post.suspended_until).where(
+             Post.is_suspended == True, Post.suspended_until > now,
+             Post.suspended_until <= now + datetime.timedelta(seconds=SWEEP_INTERVAL_SECONDS))},
+        {'name': 'expiry (upcoming notices)',
+         'statement': db.select(Notice.id, Notice.end_date).where(
+             Notice.is_public == True, Notice.end_date > now,
+             Notice.end_date <= now + datetime.timedelta(seconds=SWEEP_INTERVAL_SECONDS))},
+        # admin_users.get_page (가입일 최신순 keyset / username 순 접두어 검색 / 역할 필터)
+        {'name': 'admin users (created_at keyset)',
+         'statement': db.select(User.id).where(or_(User.created_at < now, and_(User.created_at == now, User.id < 1)))
+             .order_by(User.created_at.desc(), User.id.desc()).limit(51)},
+        {'name': 'admin users (username prefix)',
+         'statement': db.select(User.id).where(User.username.like('ab%', escape='\\'), User.username > 'ab')
+             .order_by(User.username.asc()).limit(51)},
+        {'name': 'admin users (role filter)',
+         'statement': db.select(User.id).where(
+             db.select(UserRole.user_id).where(UserRole.user_id == User.id, UserRole.role_id == 1).exists()
+         ).order_by(User.created_at.desc(), User.id.desc()).limit(51)},
+        # admin_users.typeahead
+        {'name': 'admin users typeahead (email)',
+         'statement': db.select(User.id).where(User.email.like('ab%', escape='\\')).order_by(User.email.asc()).limit(10)},
+        # auth_routes.get_nickname_history
+        {'name': 'get_nickname_history',
+         'statement': db.select(NicknameHistory.id).where(NicknameHistory.user_id == 1)
+             .order_by(NicknameHistory.changed_at.desc())},
+    ]
+
+
+def _explain(connection, statement):
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    if connection.dialect.name == 'sqlite':
+        return [row['detail'] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").mappings()]
+    return [dict(row) for row in connection.exec_driver_sql(f"EXPLAIN {sql}").mappings()]
+
+
+def _find_problems(dialect_name, plan_rows, allow_filesort=False):
+    """실행 계획에서 풀 스캔/filesort 항목을 찾아 설명 문자열 목록으로 반환합니다."""
+    problems = []
+    for row in plan_rows:
+        if dialect_name == 'sqlite':
+            # 예: "SCAN posts" (풀 스캔) / "SCAN posts USING INDEX ..." (인덱스 순회)
+            if row.startswith('SCAN') and 'USING' not in row:
+                problems.append(f"full scan: {row}")
+            if not allow_filesort and 'TEMP B-TREE FOR ORDER BY' in row:
+                problems.append(f"filesort: {row}")
+        else:
+            if row.get('type') == 'ALL':
+                problems.append(f"full scan: table={row.get('table')}")
+            if not allow_filesort and 'Using filesort' in (row.get('Extra') or ''):
+                problems.append(f"filesort: table={row.get('table')}")
+    return problems
+
+
+def check_hot_queries(engine=None):
+    """모든 핫 쿼리를 EXPLAIN 하여 [{'name', 'plan', 'problems'}] 목록을 반환합니다."""
+    engine = engine if engine is not None else db.engine
+    results = []
+    with engine.connect() as connection:
+        for query in _hot_queries():
+            plan = _explain(connection, query['statement'])
+            results.append({
+                'name': query['name'],
+                'plan': plan,
+                'problems': _find_problems(connection.dialect.name, plan, query.get('allow_filesort', False)),
+            })
+    return results
+
+
+def create_standin_engine():
+    """모델 정의(인덱스 포함)로 스키마를 만든 인메모리 SQLite 엔진을 반환합니다.
+
+    실제 MariaDB 없이도 CI 등에서 인덱스 누락을 확인할 수 있습니다.
+    """
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    return engine
@@ -0,0 +1,47 @@
+# backend/mongo_aggregations.py
+# 차트/통계용 집계를 Python 이 아닌 MongoDB 내부($match/$group)에서 수행하는 공용 계층입니다.
+# *_pipeline 함수는 순수하게 파이프라인만 만들고, 나머지 함수가 실제 컬렉션에 실행합니다.
+# 감정 기록은 MoodEntry(mood_series) 를 통해 읽으며, 파이프라인 앞부분은 MoodEntry.readings_pipeline 이 만듭니다.
+from backend.mongo_models import MoodEntry
+
+# 감정 라벨(mood)이 없으면 점수(mood_score)를 문자열로 사용합니다. (analytics_rollups.mood_key 와 동일)
+MOOD_KEY_EXPRESSION = {'$ifNull': ['$mood', {'$toString': '$mood_score'}]}
+
+
+def mood_distribution_stages():
+    """펼쳐진 감정 기록에서 감정별 기록 수를 많은 순으로 집계하는 단계."""
+    return [
+        {'$project': {'_id': 0, 'mood_key': MOOD_KEY_EXPRESSION}},
+        {'$match': {'mood_key': {'$ne': None}}},
+        {'$group': {'_id': '$mood_key', 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1, '_id': 1}},
+    ]
+
+
+def recent_most_frequent_mood_stages(recent=30):
+    """최근 N개의 감정 기록 중 가장 빈번한 감정을 구하는 단계."""
+    return [
+        {'$sort': {'timestamp': -1}},
+        {'$limit': recent},
+    ] + mood_distribution_stages() + [{'$limit': 1}]
+
+
+def mood_distribution_pipeline(user_id=None, mode=MoodEntry.MODE_TIMESERIES):
+    """감정 분포 전체 파이프라인. user_id 가 없으면 전체 사용자 대상입니다."""
+    return MoodEntry.readings_pipeline(user_id, mode=mode) + mood_distribution_stages()
+
+
+def recent_most_frequent_mood_pipeline(user_id, recent=30, mode=MoodEntry.MODE_TIMESERIES):
+    return MoodEntry.readings_pipeline(user_id, mode=mode) + recent_most_frequent_mood_stages(recent)
+
+
+def get_mood_distribution(user_id=None):
+    """[(감정, 기록 수), ...] 를 기록 수 내림차순으로 반환합니다."""
+    return [(doc['_id'], doc['count']) for doc in MoodEntry.aggregate(mood_distribution_stages(), user_id)]
+
+
+def get_recent_most_frequent_mood(user_id, recent=30):
+    """최근 기록 기준 가장 빈번한 감정을 반환합니다. 기록이 없으면 None."""
+    result = MoodEntry.aggregate(recent_most_frequent_mood_stages(recent), user_id)
+    return result[0]['_id'] if result else None
+
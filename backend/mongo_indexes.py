@@ -0,0 +1,198 @@
+# backend/mongo_indexes.py
+# MongoDB 컬렉션별 인덱스 정의(레지스트리)와 인덱스 생성/사용 현황 리포트 도구입니다.
+# 새 쿼리 패턴을 추가할 때는 MONGO_INDEXES 와 HOT_QUERIES 를 함께 갱신해주세요.
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from flask import current_app
+from backend.mongo_models import get_mongo_db, MoodEntry
+from backend.diary_derived import TOMBSTONE_RETENTION_DAYS
+
+# 컬렉션 이름 -> 생성해야 할 인덱스 목록
+# 감정 기록(mood_series)은 저장 방식에 따라 인덱스가 달라 MoodEntry.ensure_collection() 이 직접 관리합니다.
+MONGO_INDEXES = {
+    'diary_entries': [
+        # 날짜별 조회 / 월별 요약 (user_id + date 범위) 및 일기 목록 keyset 페이지네이션 (date, _id)
+        IndexModel([('user_id', ASCENDING), ('date', ASCENDING), ('_id', ASCENDING)], name='user_id_date_id'),
+        # 내 일기 목록 (최신순) / 활동 타임라인 (created_at, _id)
+        IndexModel([('user_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], name='user_id_created_at_id'),
+        # 관리자 DB 기록 피드 (created_at, _id) keyset / 월별 작성량 통계
+        IndexModel([('created_at', DESCENDING), ('_id', DESCENDING)], name='created_at_id'),
+        # 일괄 동기화: client_id 멱등 처리 / 변경 사항 (server_updated_at, _id) keyset
+        IndexModel([('user_id', ASCENDING), ('client_id', ASCENDING)], name='user_id_client_id', unique=True,
+                   partialFilterExpression={'client_id': {'$type': 'string'}}),
+        IndexModel([('user_id', ASCENDING), ('server_updated_at', ASCENDING), ('_id', ASCENDING)],
+                   name='user_id_server_updated_at_id'),
+    ],
+    'chat_history': [
+        IndexModel([('user_id', ASCENDING), ('chat_session_id', ASCENDING), ('timestamp', ASCENDING)],
+                   name='user_id_chat_session_id_timestamp'),
+        # 관리자용 세션 상세 조회 (user_id 없이 세션 ID만 사용)
+        IndexModel([('chat_session_id', ASCENDING), ('timestamp', ASCENDING)], name='chat_session_id_timestamp'),
+    ],
+    'chat_sessions': [
+        IndexModel([('user_id', ASCENDING), ('chat_session_id', ASCENDING)], name='user_id_chat_session_id'),
+        IndexModel([('user_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], name='user_id_created_at_id'),
+        IndexModel([('created_at', DESCENDING), ('_id', DESCENDING)], name='created_at_id'),
+    ],
+    'inquiries': [
+        IndexModel([('user_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], name='user_id_created_at_id'),
+        IndexModel([('created_at', DESCENDING), ('_id', DESCENDING)], name='created_at_id'),
+    ],
+    'psych_test_results': [
+        IndexModel([('user_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], name='user_id_created_at_id'),
+    ],
+    'chat_feedback': [
+        IndexModel([('user_id', ASCENDING), ('timestamp', DESCENDING)], name='user_id_timestamp'),
+        IndexModel([('timestamp', DESCENDING)], name='timestamp'),
+        IndexModel([('chat_session_id', ASCENDING)], name='chat_session_id'),
+    ],
+    'role_menu_assignments': [
+        IndexModel([('role_name', ASCENDING)], name='role_name'),
+    ],
+    'menu_items': [
+        IndexModel([('order', ASCENDING)], name='order'),
+        IndexModel([('name', ASCENDING)], name='name'),
+    ],
+    'analytics_rollups': [
+        IndexModel([('metric', ASCENDING), ('day', ASCENDING)], name='metric_day'),
+    ],
+    'keyword_rollups': [
+        IndexModel([('source', ASCENDING), ('period', ASCENDING)], name='source_period'),
+        IndexModel([('period', ASCENDING)], name='period'),
+    ],
+    'calendar_months': [
+        IndexModel([('user_id', ASCENDING), ('month', ASCENDING)], name='user_id_month'),
+    ],
+    'diary_search_index': [
+        # 2-gram 역색인 (멀티키): {'user_id': ..., 'grams': {'$all': [...]}}
+        IndexModel([('user_id', ASCENDING), ('grams', ASCENDING)], name='user_id_grams'),
+    ],
+    'sync_tombstones': [
+        # 삭제된 일기 (deleted_at, _id) keyset
+        IndexModel([('user_id', ASCENDING), ('kind', ASCENDING), ('deleted_at', ASCENDING), ('_id', ASCENDING)],
+                   name='user_id_kind_deleted_at_id'),
+        IndexModel([('deleted_at', ASCENDING)], name='deleted_at_ttl', expireAfterSeconds=TOMBSTONE_RETENTION_DAYS * 24 * 3600),
+    ],
+    'mood_trend_cache': [
+        # 회원 탈퇴 시 캐시/버전 문서 정리: delete_many({'user_id': ...})
+        IndexModel([('user_id', ASCENDING)], name='user_id'),
+    ],
+    'cms_content': [
+        IndexModel([('type', ASCENDING), ('created_at', ASCENDING)], name='type_created_at'),
+    ],
+}
+
+# 인덱스를 반드시 타야 하는 대표 쿼리 모음 (index-report 에서 explain() 으로 검사)
+# 값 자체는 의미가 없으며, 쿼리 모양(필드/정렬)만 플래너에 전달하기 위한 샘플입니다.
+HOT_QUERIES = [
+    {'collection': 'diary_entries', 'filter': {'user_id': 0}, 'sort': [('created_at', DESCENDING)]},
+    {'collection': 'diary_entries', 'filter': {'user_id': 0, 'date': '1970-01-01'}},
+    {'collection': 'diary_entries', 'filter': {'user_id': 0, 'date': {'$gte': '1970-01-01', '$lt': '1970-02-01'}}},
+    {'collection': 'diary_entries', 'filter': {}, 'sort': [('created_at', DESCENDING)]},
+    {'collection': 'diary_entries', 'filter': {'user_id': 0, '$or': [{'date': {'$lt': ''}}, {'date': '', '_id': {'$lt': 0}}]},
+     'sort': [('date', DESCENDING), ('_id', DESCENDING)]},
+    {'collection': 'chat_history', 'filter': {'user_id': 0, 'chat_session_id': ''}, 'sort': [('timestamp', ASCENDING)]},
+    {'collection': 'chat_history', 'filter': {'chat_session_id': ''}, 'sort': [('timestamp', ASCENDING)]},
+    {'collection': 'chat_sessions', 'filter': {'user_id': 0, 'chat_session_id': ''}},
+    {'collection': 'chat_sessions', 'filter': {'user_id': 0, 'is_hidden': {'$ne': True}}, 'sort': [('created_at', DESCENDING)]},
+    {'collection': 'chat_sessions', 'filter': {}, 'sort': [('created_at', DESCENDING)]},
+    {'collection': 'inquiries', 'filter': {'user_id': 0}, 'sort': [('created_at', DESCENDING)]},
+    {'collection': 'inquiries', 'filter': {}, 'sort': [('created_at', DESCENDING)]},
+    {'collection': 'psych_test_results', 'filter': {'user_id': 0}, 'sort': [('created_at', DESCENDING)]},
+    # 내 테스트 결과 목록 다음 페이지: (created_at, _id) keyset
+    {'collection': 'psych_test_results', 'filter': {'user_id': 0, '$or': [{'created_at': {'$lt': 0}}, {'created_at': 0, '_id': {'$lt': 0}}]},
+     'sort': [('created_at', DESCENDING), ('_id', DESCENDING)]},
+    # 활동 타임라인 다음 페이지: (created_at, _id) keyset
+    *[{'collection': name, 'filter': {'$and': [{'user_id': 0}, {'$or': [{'created_at': {'$lt': 0}}, {'created_at': 0, '_id': {'$lt': 0}}]}]},
+       'sort': [('created_at', DESCENDING), ('_id', DESCENDING)]}
+      for name in ('diary_entries', 'chat_sessions', 'psych_test_results', 'inquiries')],
+    # 관리자 DB 기록 피드 다음 페이지: 전체 사용자 (created_at, _id) keyset
+    *[{'collection': name, 'filter': {'$or': [{'created_at': {'$lt': 0}}, {'created_at': 0, '_id': {'$lt': 0}}]},
+       'sort': [('created_at', DESCENDING), ('_id', DESCENDING)]}
+      for name in ('diary_entries', 'chat_sessions', 'inquiries')],
+    {'collection': 'chat_feedback', 'filter': {'user_id': 0}, 'sort': [('timestamp', DESCENDING)]},
+    {'collection': 'chat_feedback', 'filter': {'chat_session_id': ''}},
+    {'collection': 'role_menu_assignments', 'filter': {'role_name': {'$in': ['']}}},
+    {'collection': 'analytics_rollups', 'filter': {'metric': ''}, 'sort': [('day', ASCENDING)]},
+    {'collection': 'keyword_rollups', 'filter': {'period': {'$gte': '', '$lte': ''}}},
+    {'collection': 'diary_search_index', 'filter': {'user_id': 0, 'grams': {'$all': ['', '']}}},
+    {'collection': 'diary_search_index', 'filter': {'user_id': 0, 'grams': {'$all': ['', '']}, 'title_grams': {'$all': ['', '']}},
+     'sort': [('date', DESCENDING), ('_id', DESCENDING)]},
+    {'collection': 'cms_content', 'filter': {'type': ''}, 'sort': [('created_at', ASCENDING)]},
+    # 일괄 동기화 변경 사항 다음 페이지: (server_updated_at, _id) / (deleted_at, _id) keyset
+    {'collection': 'diary_entries',
+     'filter': {'user_id': 0, '$or': [{'server_updated_at': {'$gt': 0}}, {'server_updated_at': 0, '_id': {'$gt': 0}}]},
+     'sort': [('server_updated_at', ASCENDING), ('_id', ASCENDING)]},
+    {'collection': 'sync_tombstones',
+     'filter': {'user_id': 0, 'kind': 'diary', 'deleted_at': {'$gt': 0, '$lte': 0},
+                '$or': [{'deleted_at': {'$gt': 0}}, {'deleted_at': 0, '_id': {'$gt': 0}}]},
+     'sort': [('deleted_at', ASCENDING), ('_id', ASCENDING)]},
+]
+
+
+def ensure_indexes(db=None):
+    """레지스트리에 정의된 모든 인덱스를 생성합니다. 이미 있는 인덱스는 그대로 둡니다.
+
+    반환값: {컬렉션 이름: 생성(확인)된 인덱스 이름 목록 또는 오류 메시지}
+    """
+    db = db if db is not None else get_mongo_db()
+    results = {}
+    for collection_name, index_models in MONGO_INDEXES.items():
+        try:
+            results[collection_name] = db[collection_name].create_indexes(index_models)
+        except OperationFailure as e:
+            # 같은 키에 다른 옵션/이름의 인덱스가 이미 있는 경우 등. 나머지 컬렉션은 계속 진행합니다.
+            current_app.logger.error(f"Error creating indexes for '{collection_name}': {e}")
+            results[collection_name] = f"ERROR: {e}"
+    try:
+        results[MoodEntry.COLLECTION_NAME] = [MoodEntry.ensure_collection(db)]
+    except OperationFailure as e:
+        current_app.logger.error(f"Error preparing '{MoodEntry.COLLECTION_NAME}': {e}")
+        results[MoodEntry.COLLECTION_NAME] = f"ERROR: {e}"
+    return results
+
+
+def _find_stages(plan, stage_name):
+    """explain() 결과의 플랜 트리를 재귀적으로 탐색해 특정 stage 가 있는지 확인합니다."""
+    if isinstance(plan, dict):
+        if plan.get('stage') == stage_name:
+            return True
+        return any(_find_stages(value, stage_name) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_find_stages(item, stage_name) for item in plan)
+    return False
+
+
+def find_collscan_queries(db=None):
+    """HOT_QUERIES 를 explain() 하여 여전히 COLLSCAN 으로 실행되는 쿼리 목록을 반환합니다."""
+    db = db if db is not None else get_mongo_db()
+    collscans = []
+    for query in HOT_QUERIES:
+        cursor = db[query['collection']].find(query['filter'])
+        if query.get('sort'):
+            cursor = cursor.sort(query['sort'])
+        plan = cursor.explain().get('queryPlanner', {}).get('winningPlan', {})
+        if _find_stages(plan, 'COLLSCAN'):
+            collscans.append(query)
+    return collscans
+
+
+def find_unused_indexes(db=None):
+    """$indexStats 로 서버 기동 이후 한 번도 사용되지 않은 인덱스를 찾습니다. (_id 인덱스 제외)"""
+    db = db if db is not None else get_mongo_db()
+    existing = set(db.list_collection_names())
+    unused = []
+    for collection_name in MONGO_INDEXES:
+        if collection_name not in existing:
+            continue
+        for stats in db[collection_name].aggregate([{'$indexStats': {}}]):
+            if stats['name'] == '_id_':
+                continue
+            accesses = stats.get('accesses', {})
+            if accesses.get('ops', 0) == 0:
+                unused.append({
+                    'collection': collection_name,
+                    'index': stats['name'],
+                    'since': accesses.get('since'),
+                })
+    return unused
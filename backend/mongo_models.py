@@ -1,5 +1,8 @@
 from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure, CollectionInvalid
 import json
+import base64
 import datetime
 from flask import current_app
 from backend.extensions import mongo
@@ -251,7 +254,14 @@ class MenuItem:
 
 # DiaryEntry 모델
 class DiaryEntry:
-    def __init__(self, user_id, title, content, date, mood_emoji_key, created_at=None, updated_at=None, _id=None):
+    COLLECTION_NAME = "diary_entries"
+    # fields= 로 선택할 수 있는 필드 (_id 는 항상 포함)
+    SELECTABLE_FIELDS = ("title", "content", "date", "mood_emoji_key", "keywords", "created_at", "updated_at")
+    DEFAULT_PAGE_SIZE = 30
+    MAX_PAGE_SIZE = 100
+
+    def __init__(self, user_id, title, content, date, mood_emoji_key, created_at=None, updated_at=None, _id=None, keywords=None,
+                 client_id=None, server_updated_at=None):
         self._id = _id if _id else ObjectId()
         self.user_id = user_id
         self.title = title
@@ -260,6 +270,10 @@ class DiaryEntry:
         self.mood_emoji_key = mood_emoji_key
         self.created_at = created_at if created_at is not None else datetime.datetime.utcnow()
         self.updated_at = updated_at if updated_at is not None else datetime.datetime.utcnow()
+        self.keywords = keywords if keywords is not None else []
+        # 오프라인 동기화용: 클라이언트가 만든 ID, 서버에 마지막으로 반영된 시각(변경 커서 기준)
+        self.client_id = client_id
+        self.server_updated_at = server_updated_at if server_updated_at is not None else datetime.datetime.utcnow()
 
     def to_dict(self):
         return {
@@ -269,30 +283,388 @@ class DiaryEntry:
             "content": self.content,
             "date": self.date,
             "mood_emoji_key": self.mood_emoji_key,
+            "keywords": self.keywords,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
+            "server_updated_at": self.server_updated_at,
+            **({"client_id": self.client_id} if self.client_id is not None else {}),
         }
     
     @staticmethod
     def from_mongo(data):
         return DiaryEntry(**data)
 
-# MoodEntry 모델
+    @staticmethod
+    def encode_cursor(entry):
+        """페이지 마지막 일기의 (date, _id) 를 URL 에 넣을 수 있는 불투명 커서로 만듭니다."""
+        raw = json.dumps([entry['date'], str(entry['_id'])]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """커서를 (date, ObjectId) 로 되돌립니다. 형식이 잘못되면 ValueError."""
+        try:
+            date, entry_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return date, ObjectId(entry_id)
+        except Exception:
+            raise ValueError("invalid cursor")
+
+    @staticmethod
+    def projection(fields=None):
+        """fields 목록으로 MongoDB projection 을 만듭니다. None 이면 전체 필드."""
+        if not fields:
+            return None
+        unknown = [field for field in fields if field not in DiaryEntry.SELECTABLE_FIELDS]
+        if unknown:
+            raise ValueError(f"unknown fields: {', '.join(unknown)}")
+        # 다음 페이지 커서를 만들기 위해 date 는 항상 포함합니다.
+        return {field: 1 for field in set(fields) | {'date'}}
+
+    @staticmethod
+    def find_page(user_id, cursor=None, limit=DEFAULT_PAGE_SIZE, fields=None):
+        """(date, _id) 내림차순 keyset 페이지네이션으로 일기 목록을 가져옵니다.
+
+        (user_id, date, _id) 인덱스를 따라 limit+1 개만 읽으므로 전체 일기 수와 무관하게 일정한 비용입니다.
+        반환값: (일기 목록, 다음 페이지 커서 또는 None)
+        """
+        query = {"user_id": user_id}
+        if cursor:
+            last_date, last_id = DiaryEntry.decode_cursor(cursor)
+            query["$or"] = [
+                {"date": {"$lt": last_date}},
+                {"date": last_date, "_id": {"$lt": last_id}},
+            ]
+        try:
+            db = get_mongo_db()
+            entries = list(
+                db[DiaryEntry.COLLECTION_NAME].find(query, DiaryEntry.projection(fields))
+                .sort([("date", DESCENDING), ("_id", DESCENDING)])
+                .limit(limit + 1)
+            )
+        except Exception as e:
+            current_app.logger.error(f"Error fetching diary entries from MongoDB: {e}")
+            raise
+        next_cursor = DiaryEntry.encode_cursor(entries[limit - 1]) if len(entries) > limit else None
+        return entries[:limit], next_cursor
+
+# MoodEntry 모델 (시계열 감정 기록)
+# 모든 감정 기록은 mood_series 컬렉션 하나에 저장됩니다.
+# - MongoDB 5.0+ : time-series 컬렉션 (timeField='timestamp', metaField='user_id')
+# - 그 외       : 사용자/월 단위 버킷 문서 {'user_id', 'month', 'count', 'readings': [...]}
+# 라우트에서는 저장 방식과 무관하게 이 클래스의 메서드만 사용합니다.
 class MoodEntry:
-    def __init__(self, user_id, date, mood_score, timestamp=None, _id=None):
+    COLLECTION_NAME = "mood_series"
+    LEGACY_COLLECTION_NAME = "mood_entries"
+    MIGRATION_STATE_COLLECTION = "migration_state"
+    LEGACY_MIGRATION_ID = "mood_entries_to_mood_series"
+    MODE_TIMESERIES = "timeseries"
+    MODE_BUCKETED = "bucketed"
+    BUCKET_SIZE = 200
+    _storage_modes = {}
+
+    def __init__(self, user_id, timestamp=None, date=None, mood=None, mood_score=None, source=None,
+                 recorded_at=None, legacy_id=None, _id=None, client_id=None):
         self._id = _id if _id else ObjectId()
         self.user_id = user_id
-        self.date = date
+        self.recorded_at = recorded_at if recorded_at is not None else datetime.datetime.utcnow()
+        # timestamp 는 '감정이 해당하는 시점'입니다. 날짜만 지정된 기록은 그 날짜의 0시로 저장합니다.
+        if timestamp is None:
+            timestamp = datetime.datetime.strptime(date, '%Y-%m-%d') if date else self.recorded_at
+        self.timestamp = timestamp
+        self.date = date if date else timestamp.strftime('%Y-%m-%d')
+        self.mood = mood
         self.mood_score = mood_score
-        self.timestamp = timestamp if timestamp is not None else datetime.datetime.utcnow()
+        self.source = source
+        self.legacy_id = legacy_id
+        self.client_id = client_id
 
     def to_dict(self):
-        return self.__dict__
+        data = {
+            "_id": self._id,
+            "user_id": self.user_id,
+            "timestamp": self.timestamp,
+            "date": self.date,
+            "mood": self.mood,
+            "mood_score": self.mood_score,
+            "source": self.source,
+            "recorded_at": self.recorded_at,
+        }
+        if self.legacy_id is not None:
+            data["legacy_id"] = self.legacy_id
+        if self.client_id is not None:
+            data["client_id"] = self.client_id
+        return data
 
     @staticmethod
     def from_mongo(data):
         return MoodEntry(**data)
 
+    @staticmethod
+    def from_legacy(doc):
+        """기존 mood_entries 문서({mood, recorded_at} 또는 {date, mood_score, timestamp})를 변환합니다.
+
+        마이그레이션을 다시 실행해도 같은 기록이 되도록 기존 _id 를 그대로 사용합니다.
+        """
+        if doc.get('date'):
+            return MoodEntry(
+                user_id=doc.get('user_id'), date=doc['date'], mood=doc.get('mood'),
+                mood_score=doc.get('mood_score'), source='diary_mood',
+                recorded_at=doc.get('timestamp') or doc.get('recorded_at'), legacy_id=doc['_id'], _id=doc['_id']
+            )
+        recorded_at = doc.get('recorded_at') or doc.get('timestamp') or doc['_id'].generation_time.replace(tzinfo=None)
+        return MoodEntry(
+            user_id=doc.get('user_id'), timestamp=recorded_at, mood=doc.get('mood'),
+            mood_score=doc.get('mood_score'), source='mood_record',
+            recorded_at=recorded_at, legacy_id=doc['_id'], _id=doc['_id']
+        )
+
+    @staticmethod
+    def ensure_collection(db=None):
+        """mood_series 컬렉션을 준비하고 저장 방식(timeseries/bucketed)을 반환합니다."""
+        db = db if db is not None else get_mongo_db()
+        existing = list(db.list_collections(filter={'name': MoodEntry.COLLECTION_NAME}))
+        if existing:
+            mode = MoodEntry.MODE_TIMESERIES if existing[0].get('options', {}).get('timeseries') else MoodEntry.MODE_BUCKETED
+        else:
+            try:
+                db.create_collection(MoodEntry.COLLECTION_NAME, timeseries={
+                    'timeField': 'timestamp', 'metaField': 'user_id', 'granularity': 'hours'
+                })
+                mode = MoodEntry.MODE_TIMESERIES
+            except (OperationFailure, CollectionInvalid) as e:
+                current_app.logger.warning(f"Time-series collection unavailable, falling back to bucketed schema: {e}")
+                db.create_collection(MoodEntry.COLLECTION_NAME)
+                mode = MoodEntry.MODE_BUCKETED
+
+        collection = db[MoodEntry.COLLECTION_NAME]
+        if mode == MoodEntry.MODE_TIMESERIES:
+            collection.create_index([('user_id', ASCENDING), ('timestamp', DESCENDING)], name='user_id_timestamp')
+            # 전체 사용자 대상 최신순 조회 (관리자 DB 기록 피드)
+            collection.create_index([('timestamp', DESCENDING)], name='timestamp')
+        else:
+            collection.create_index([('user_id', ASCENDING), ('month', ASCENDING)], name='user_id_month')
+            collection.create_index([('month', DESCENDING)], name='month')
+            collection.create_index([('readings._id', ASCENDING)], name='readings_id')
+            # 마이그레이션 재실행 시 이미 옮긴 기록 확인용
+            collection.create_index([('readings.legacy_id', ASCENDING)], name='readings_legacy_id', sparse=True)
+        MoodEntry._storage_modes[db.name] = mode
+        return mode
+
+    @staticmethod
+    def storage_mode(db=None):
+        db = db if db is not None else get_mongo_db()
+        if db.name not in MoodEntry._storage_modes:
+            MoodEntry.ensure_collection(db)
+        return MoodEntry._storage_modes[db.name]
+
+    @staticmethod
+    def add_many(entries):
+        """감정 기록 여러 개를 저장합니다. 버킷 방식에서는 (사용자, 월) 버킷마다 $push 합니다."""
+        if not entries:
+            return 0
+        try:
+            db = get_mongo_db()
+            collection = db[MoodEntry.COLLECTION_NAME]
+            if MoodEntry.storage_mode(db) == MoodEntry.MODE_TIMESERIES:
+                collection.insert_many([entry.to_dict() for entry in entries], ordered=False)
+                return len(entries)
+
+            buckets = {}
+            for entry in entries:
+                buckets.setdefault((entry.user_id, entry.timestamp.strftime('%Y-%m')), []).append(entry.to_dict())
+            for (user_id, month), readings in buckets.items():
+                for offset in range(0, len(readings), MoodEntry.BUCKET_SIZE):
+                    chunk = readings[offset:offset + MoodEntry.BUCKET_SIZE]
+                    # 가득 찬 버킷에는 조건이 맞지 않으므로 upsert 로 새 버킷이 만들어집니다.
+                    collection.update_one(
+                        {'user_id': user_id, 'month': month, 'count': {'$lte': MoodEntry.BUCKET_SIZE - len(chunk)}},
+                        {'$push': {'readings': {'$each': chunk}}, '$inc': {'count': len(chunk)}},
+                        upsert=True
+                    )
+            return len(entries)
+        except Exception as e:
+            current_app.logger.error(f"Error adding mood entries to MongoDB: {e}")
+            raise
+
+    @staticmethod
+    def add(entry):
+        MoodEntry.add_many([entry])
+        return entry
+
+    @staticmethod
+    def readings_pipeline(user_id=None, start=None, end=None, mode=None):
+        """저장 방식과 무관하게 '감정 기록 1건 = 문서 1개' 형태로 펼쳐주는 집계 파이프라인 앞부분.
+
+        start 이상 end 미만(timestamp 기준) 범위로 제한합니다.
+        """
+        mode = mode or MoodEntry.storage_mode()
+        time_range = {}
+        if start is not None:
+            time_range['$gte'] = start
+        if end is not None:
+            time_range['$lt'] = end
+
+        if mode == MoodEntry.MODE_TIMESERIES:
+            match = {}
+            if user_id is not None:
+                match['user_id'] = user_id
+            if time_range:
+                match['timestamp'] = time_range
+            return [{'$match': match}] if match else []
+
+        bucket_match = {}
+        if user_id is not None:
+            bucket_match['user_id'] = user_id
+        if time_range:
+            bucket_match['month'] = {}
+            if start is not None:
+                bucket_match['month']['$gte'] = start.strftime('%Y-%m')
+            if end is not None:
+                # end 는 미포함이므로 end 직전 시각이 속한 달까지만 봅니다. (end 가 월초이면 그 달의 버킷은 제외)
+                bucket_match['month']['$lte'] = (end - datetime.timedelta(microseconds=1)).strftime('%Y-%m')
+        stages = [{'$match': bucket_match}] if bucket_match else []
+        stages += [
+            {'$unwind': '$readings'},
+            # 각 reading 은 user_id 를 포함한 완전한 기록(to_dict)이므로 그대로 루트로 올립니다.
+            {'$replaceRoot': {'newRoot': '$readings'}},
+        ]
+        if time_range:
+            stages.append({'$match': {'timestamp': time_range}})
+        return stages
+
+    @staticmethod
+    def time_windows(user_id=None, start=None, end=None):
+        """[start, end) 를 최신 구간부터 나눈 (구간 시작, 구간 끝) 이터레이터.
+
+        버킷 방식에서는 기록이 있는 월을 month 인덱스로 하나씩 찾아 월 단위로 나눕니다.
+        최신순으로 일부만 읽는 쪽에서 필요한 월의 버킷만 펼치도록 할 때 사용합니다.
+        time-series 방식은 timestamp 인덱스로 바로 범위를 읽으므로 구간 하나만 반환합니다.
+        """
+        db = get_mongo_db()
+        if MoodEntry.storage_mode(db) == MoodEntry.MODE_TIMESERIES:
+            yield start, end
+            return
+        collection = db[MoodEntry.COLLECTION_NAME]
+        upper = (end - datetime.timedelta(microseconds=1)).strftime('%Y-%m') if end is not None else None
+        while True:
+            query = {'user_id': user_id} if user_id is not None else {}
+            month_range = {}
+            if upper is not None:
+                month_range['$lte'] = upper
+            if start is not None:
+                month_range['$gte'] = start.strftime('%Y-%m')
+            if month_range:
+                query['month'] = month_range
+            bucket = collection.find_one(query, {'month': 1}, sort=[('month', DESCENDING)])
+            if not bucket:
+                return
+            month_start = datetime.datetime.strptime(bucket['month'], '%Y-%m')
+            next_month = (month_start + datetime.timedelta(days=32)).replace(day=1)
+            yield (max(month_start, start) if start is not None else month_start,
+                   min(next_month, end) if end is not None else next_month)
+            upper = (month_start - datetime.timedelta(days=1)).strftime('%Y-%m')
+
+    @staticmethod
+    def aggregate(stages, user_id=None, start=None, end=None):
+        """펼쳐진 감정 기록에 추가 집계 단계를 실행합니다."""
+        try:
+            db = get_mongo_db()
+            pipeline = MoodEntry.readings_pipeline(user_id, start, end, MoodEntry.storage_mode(db)) + list(stages)
+            return list(db[MoodEntry.COLLECTION_NAME].aggregate(pipeline, allowDiskUse=True))
+        except Exception as e:
+            current_app.logger.error(f"Error aggregating mood entries from MongoDB: {e}")
+            raise
+
+    @staticmethod
+    def get_range(user_id=None, start=None, end=None, descending=False, limit=None):
+        """기간 내 감정 기록을 timestamp 순으로 반환합니다. user_id 가 없으면 전체 사용자 대상입니다."""
+        stages = [{'$sort': {'timestamp': -1 if descending else 1}}]
+        if limit:
+            stages.append({'$limit': limit})
+        return MoodEntry.aggregate(stages, user_id, start, end)
+
+    @staticmethod
+    def delete_for_user(user_id):
+        """사용자의 모든 감정 기록을 삭제합니다. (기존 mood_entries 포함)"""
+        try:
+            db = get_mongo_db()
+            db[MoodEntry.COLLECTION_NAME].delete_many({'user_id': user_id})
+            db[MoodEntry.LEGACY_COLLECTION_NAME].delete_many({'user_id': user_id})
+        except Exception as e:
+            current_app.logger.error(f"Error deleting mood entries from MongoDB: {e}")
+            raise
+
+    @staticmethod
+    def migrate_legacy(batch_size=1000):
+        """기존 mood_entries 문서를 배치 단위로 mood_series 로 옮깁니다.
+
+        마지막으로 옮긴 _id 를 migration_state 에 기록하므로 중단 후 다시 실행해도 이어서 진행합니다.
+        기록 직전에 중단되어 같은 배치를 다시 처리하더라도 이미 옮긴 기록(legacy_id)은 건너뜁니다.
+        끝까지 옮기면 completed_at 을 기록합니다. (legacy_migration_completed)
+        반환값: 이번 실행에서 새로 옮긴 문서 수
+        """
+        db = get_mongo_db()
+        state_id = MoodEntry.LEGACY_MIGRATION_ID
+        state = db[MoodEntry.MIGRATION_STATE_COLLECTION].find_one({'_id': state_id}) or {}
+        query = {'_id': {'$gt': state['last_id']}} if state.get('last_id') else {}
+
+        migrated = 0
+        batch = []
+        cursor = db[MoodEntry.LEGACY_COLLECTION_NAME].find(query).sort('_id', 1).batch_size(batch_size)
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                migrated += MoodEntry._migrate_batch(db, state_id, batch)
+                batch = []
+        if batch:
+            migrated += MoodEntry._migrate_batch(db, state_id, batch)
+        # 새 기록은 더 이상 mood_entries 에 쓰이지 않으므로, 끝까지 옮겼다면 이후 실행은 확인 없이 건너뜁니다.
+        db[MoodEntry.MIGRATION_STATE_COLLECTION].update_one(
+            {'_id': state_id}, {'$set': {'completed_at': datetime.datetime.utcnow()}}, upsert=True
+        )
+        return migrated
+
+    @staticmethod
+    def legacy_migration_completed():
+        """기존 mood_entries 를 mood_series 로 모두 옮겼는지 여부"""
+        state = get_mongo_db()[MoodEntry.MIGRATION_STATE_COLLECTION].find_one(
+            {'_id': MoodEntry.LEGACY_MIGRATION_ID}, {'completed_at': 1})
+        return bool(state and state.get('completed_at'))
+
+    @staticmethod
+    def _migrated_legacy_ids(db, entries):
+        """entries 중 이미 mood_series 에 옮겨진 기록의 legacy_id 집합을 반환합니다."""
+        legacy_ids = [entry.legacy_id for entry in entries]
+        collection = db[MoodEntry.COLLECTION_NAME]
+        if MoodEntry.storage_mode(db) == MoodEntry.MODE_TIMESERIES:
+            # time-series 컬렉션은 유니크 인덱스/upsert 를 지원하지 않으므로
+            # 배치의 (user_id, timestamp) 범위로 버킷을 좁힌 뒤 legacy_id 를 확인합니다.
+            query = {
+                'user_id': {'$in': list({entry.user_id for entry in entries})},
+                'timestamp': {'$gte': min(entry.timestamp for entry in entries),
+                              '$lte': max(entry.timestamp for entry in entries)},
+                'legacy_id': {'$in': legacy_ids},
+            }
+            return {doc['legacy_id'] for doc in collection.find(query, {'legacy_id': 1})}
+        found = set()
+        for bucket in collection.find({'readings.legacy_id': {'$in': legacy_ids}}, {'readings.legacy_id': 1}):
+            found.update(reading.get('legacy_id') for reading in bucket.get('readings', []))
+        return found & set(legacy_ids)
+
+    @staticmethod
+    def _migrate_batch(db, state_id, docs):
+        entries = [MoodEntry.from_legacy(doc) for doc in docs]
+        migrated_ids = MoodEntry._migrated_legacy_ids(db, entries)
+        new_entries = [entry for entry in entries if entry.legacy_id not in migrated_ids]
+        MoodEntry.add_many(new_entries)
+        db[MoodEntry.MIGRATION_STATE_COLLECTION].update_one(
+            {'_id': state_id},
+            {'$set': {'last_id': docs[-1]['_id'], 'updated_at': datetime.datetime.utcnow()},
+             '$inc': {'migrated': len(new_entries)}},
+            upsert=True
+        )
+        return len(new_entries)
+
 # Inquiry 모델
 class Inquiry:
     def __init__(self, user_id, username, email, title, content, created_at=None, _id=None, status="pending", reply_content=None, replied_at=None, replied_by_user_id=None):
@@ -349,11 +721,20 @@ class PsychQuestion:
         return PsychQuestion(**data)
 
 # PsychTestResult 모델
+# test_title / test_type 은 제출 시점의 테스트 정보 스냅샷입니다. (목록/상세 조회 시 테스트를 다시 조회하지 않음)
+# 이 필드가 없는 기존 결과는 조회 시 카탈로그에서 채웁니다.
 class PsychTestResult:
-    def __init__(self, user_id, test_id, answers, result_summary, result_details=None, created_at=None, _id=None):
+    COLLECTION_NAME = "psych_test_results"
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
+    def __init__(self, user_id, test_id, answers, result_summary, result_details=None, created_at=None, _id=None,
+                 test_title=None, test_type=None):
         self._id = _id if _id else ObjectId()
         self.user_id = user_id
         self.test_id = test_id
+        self.test_title = test_title
+        self.test_type = test_type
         self.answers = answers
         self.result_summary = result_summary
         self.result_details = result_details
@@ -366,6 +747,47 @@ class PsychTestResult:
     def from_mongo(data):
         return PsychTestResult(**data)
 
+    @staticmethod
+    def encode_cursor(result):
+        """페이지 마지막 결과의 (created_at, _id) 를 불투명 커서로 만듭니다."""
+        raw = json.dumps([result['created_at'].isoformat(), str(result['_id'])]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """커서를 (created_at, ObjectId) 로 되돌립니다. 형식이 잘못되면 ValueError."""
+        try:
+            created_at, result_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return datetime.datetime.fromisoformat(created_at), ObjectId(result_id)
+        except Exception:
+            raise ValueError("invalid cursor")
+
+    @staticmethod
+    def find_page(user_id, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """(created_at, _id) 내림차순 keyset 페이지네이션으로 사용자의 테스트 결과를 가져옵니다.
+
+        (user_id, created_at, _id) 인덱스를 따라 limit+1 개만 읽습니다.
+        반환값: (결과 목록, 다음 페이지 커서 또는 None)
+        """
+        query = {"user_id": user_id}
+        if cursor:
+            last_created_at, last_id = PsychTestResult.decode_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$lt": last_created_at}},
+                {"created_at": last_created_at, "_id": {"$lt": last_id}},
+            ]
+        try:
+            results = list(
+                get_mongo_db()[PsychTestResult.COLLECTION_NAME].find(query)
+                .sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+                .limit(limit + 1)
+            )
+        except Exception as e:
+            current_app.logger.error(f"Error fetching psych test results from MongoDB: {e}")
+            raise
+        next_cursor = PsychTestResult.encode_cursor(results[limit - 1]) if len(results) > limit else None
+        return results[:limit], next_cursor
+
 # ChatbotFeedback 모델
 class ChatbotFeedback:
     COLLECTION_NAME = 'chat_feedback'
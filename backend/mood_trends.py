@@ -0,0 +1,197 @@
+# backend/mood_trends.py
+# '나의 변화' 페이지용 감정 추세 분석입니다. (GET /api/graph/mood_trends)
+# 사용자의 감정 점수(mood_score)를 날짜별 연속 배열로 만든 뒤 NumPy 벡터 연산만으로
+# 이동 평균 / 변동성 / 요일별 패턴 / 연속 기록 / 변화 시점을 계산합니다.
+# 결과는 사용자별로 mood_trend_cache 에 저장되며 감정 기록이 추가되면 invalidate() 가 사용자의 버전을 올립니다.
+# 캐시 문서에는 계산을 시작할 때의 버전을 함께 저장하므로, 계산 도중 기록이 추가되어 늦게 저장된 결과는 쓰이지 않습니다.
+# (여러 gunicorn 워커가 같은 캐시를 보도록 프로세스 메모리 대신 MongoDB 에 둡니다.)
+#   {'_id': '3:version', 'user_id': 3, 'version': 5}
+#   {'_id': '3:7', 'user_id': 3, 'version': 5, 'computed_on': '2025-08-01', 'result': {...}}
+import datetime
+import numpy as np
+from flask import current_app
+from pymongo.errors import DuplicateKeyError
+from backend.mongo_models import get_mongo_db, MoodEntry
+
+TREND_CACHE_COLLECTION = 'mood_trend_cache'
+
+DEFAULT_WINDOW = 7
+# 캐시 문서가 window 별로 생기므로 허용 값을 제한합니다.
+ALLOWED_WINDOWS = (7, 14, 30)
+# 이 점수 이상이면 '좋은 날'로 봅니다. (1~5점)
+GOOD_MOOD_SCORE = 4
+# 변화 시점: 전후 window 일 평균 차이가 이 값 이상인 지점
+CHANGE_POINT_THRESHOLD = 1.0
+
+WEEKDAY_LABELS = ['월', '화', '수', '목', '금', '토', '일']
+
+
+def _rolling_sums(values, window):
+    """길이 n 배열에서 끝이 i 인 window 구간 합 (i >= window-1). 누적합 차이로 O(n) 계산합니다."""
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    return cumulative[window:] - cumulative[:-window]
+
+
+def _runs(mask):
+    """불리언 배열에서 True 가 연속되는 구간들의 (시작, 길이) 배열을 반환합니다."""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    starts, ends = edges[::2], edges[1::2]
+    return starts, ends - starts
+
+
+def _to_dates(day_numbers):
+    """일 번호 배열 -> 'YYYY-MM-DD' 문자열 리스트 (한 번의 배열 변환)"""
+    return np.asarray(day_numbers, dtype=np.int64).astype('datetime64[D]').astype(str).tolist()
+
+
+def _to_date(day_number):
+    return _to_dates([day_number])[0]
+
+
+def compute_trends(days, scores, window=DEFAULT_WINDOW, today=None):
+    """days: 1970-01-01 기준 일 번호(int 배열, 오름차순), scores: 같은 길이의 점수 배열."""
+    days = np.asarray(days, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+    if days.size == 0:
+        return {'window': window, 'days': 0}
+
+    # 1) 같은 날 여러 기록은 평균 내어 첫 기록일~마지막 기록일의 연속 배열로 펼칩니다. (기록 없는 날은 NaN)
+    first = days[0]
+    offsets = days - first
+    length = int(offsets[-1]) + 1
+    sums = np.bincount(offsets, weights=scores, minlength=length)
+    counts = np.bincount(offsets, minlength=length)
+    has_record = counts > 0
+    daily = np.full(length, np.nan)
+    daily[has_record] = sums[has_record] / counts[has_record]
+
+    # 2) 이동 평균 / 이동 표준편차: 기록 있는 날만 포함 (NaN 은 0 으로 두고 개수로 나눔)
+    filled = np.where(has_record, daily, 0.0)
+    window = max(1, min(window, length))
+    window_counts = _rolling_sums(has_record.astype(np.float64), window)
+    window_sums = _rolling_sums(filled, window)
+    window_squares = _rolling_sums(filled ** 2, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rolling_mean = window_sums / window_counts
+        rolling_std = np.sqrt(np.maximum(window_squares / window_counts - rolling_mean ** 2, 0.0))
+    valid = window_counts > 0
+    rolling_days = np.arange(window - 1, length)[valid] + first
+
+    # 3) 요일별 평균 (1970-01-01 은 목요일 -> 월요일=0 이 되도록 +3)
+    record_days = np.flatnonzero(has_record) + first
+    weekdays = (record_days + 3) % 7
+    weekday_sums = np.bincount(weekdays, weights=daily[has_record], minlength=7)
+    weekday_counts = np.bincount(weekdays, minlength=7)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weekday_means = weekday_sums / weekday_counts
+
+    # 4) 연속 기록 / 좋은 기분 연속
+    starts, lengths = _runs(has_record)
+    today_number = (np.datetime64(today or datetime.date.today(), 'D') - np.datetime64('1970-01-01', 'D')).astype(np.int64)
+    last_run_end = starts[-1] + lengths[-1] - 1 + first
+    current_streak = int(lengths[-1]) if today_number - last_run_end <= 1 else 0
+    good_starts, good_lengths = _runs(has_record & (np.nan_to_num(daily) >= GOOD_MOOD_SCORE))
+    longest_good = int(good_lengths.max()) if good_lengths.size else 0
+
+    # 5) 변화 시점: 기록 있는 날 기준으로 앞 window 개 평균과 뒤 window 개 평균의 차이
+    change_points = []
+    values = daily[has_record]
+    if values.size >= 2 * window:
+        prefix = np.concatenate(([0.0], np.cumsum(values)))
+        split = np.arange(window, values.size - window + 1)
+        before = (prefix[split] - prefix[split - window]) / window
+        after = (prefix[split + window] - prefix[split]) / window
+        delta = after - before
+        magnitude = np.abs(delta)
+        # 임계값을 넘고 주변(±window)에서 가장 큰 지점만 남깁니다.
+        candidates = np.flatnonzero(magnitude >= CHANGE_POINT_THRESHOLD)
+        for index in candidates:
+            low, high = max(index - window, 0), min(index + window + 1, magnitude.size)
+            if magnitude[index] == magnitude[low:high].max() and (not change_points or index - change_points[-1][0] > window):
+                change_points.append((index, delta[index]))
+        change_points = [{
+            'date': _to_date(record_days[split[index]]),
+            'before': round(float(before[index]), 2),
+            'after': round(float(after[index]), 2),
+            'direction': 'up' if change > 0 else 'down',
+        } for index, change in change_points]
+
+    return {
+        'window': window,
+        'days': int(has_record.sum()),
+        'first_date': _to_date(first),
+        'last_date': _to_date(days[-1]),
+        'average': round(float(values.mean()), 2),
+        'volatility': round(float(values.std()), 2),
+        'rolling': {
+            'dates': _to_dates(rolling_days),
+            'mean': np.round(rolling_mean[valid], 2).tolist(),
+            'std': np.round(rolling_std[valid], 2).tolist(),
+        },
+        'weekday': {
+            'labels': WEEKDAY_LABELS,
+            'mean': [None if np.isnan(mean) else round(float(mean), 2) for mean in weekday_means],
+            'count': weekday_counts.tolist(),
+        },
+        'streaks': {
+            'current': current_streak,
+            'longest': int(lengths.max()),
+            'longest_good_mood': longest_good,
+        },
+        'change_points': change_points,
+    }
+
+
+def load_scores(user_id):
+    """사용자의 점수형 감정 기록을 (일 번호 배열, 점수 배열) 로 읽습니다."""
+    readings = MoodEntry.aggregate([
+        {'$match': {'mood_score': {'$ne': None}}},
+        {'$project': {'_id': 0, 'timestamp': 1, 'mood_score': 1}},
+        {'$sort': {'timestamp': 1}},
+    ], user_id)
+    if not readings:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    timestamps = np.array([reading['timestamp'] for reading in readings], dtype='datetime64[D]')
+    days = (timestamps - np.datetime64('1970-01-01', 'D')).astype(np.int64)
+    scores = np.fromiter((reading['mood_score'] for reading in readings), dtype=np.float64, count=len(readings))
+    return days, scores
+
+
+def _version_id(user_id):
+    return f'{user_id}:version'
+
+
+def get_trends(user_id, window=DEFAULT_WINDOW):
+    """캐시에 있으면 그대로, 없으면 계산해 저장한 뒤 반환합니다."""
+    collection = get_mongo_db()[TREND_CACHE_COLLECTION]
+    cache_id = f'{user_id}:{window}'
+    today = datetime.date.today().isoformat()
+    docs = {doc['_id']: doc for doc in collection.find({'_id': {'$in': [cache_id, _version_id(user_id)]}})}
+    version = docs.get(_version_id(user_id), {}).get('version', 0)
+    cached = docs.get(cache_id)
+    # 현재 연속 기록은 날짜가 바뀌면 달라지므로 계산한 날짜가 같을 때만 사용합니다.
+    if cached and cached.get('version') == version and cached.get('computed_on') == today:
+        return cached['result']
+
+    result = compute_trends(*load_scores(user_id), window=window)
+    try:
+        # 더 새로운 버전으로 이미 저장된 결과는 덮어쓰지 않습니다. (조건이 맞지 않으면 upsert 가 중복 키로 실패)
+        collection.replace_one(
+            {'_id': cache_id, '$or': [{'version': {'$lte': version}}, {'version': None}]},
+            {'user_id': user_id, 'version': version, 'computed_on': today, 'result': result},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        pass
+    return result
+
+
+def invalidate(user_id):
+    """감정 기록이 추가/삭제되면 호출합니다. 실패해도 원래 요청은 성공시키고 로그만 남깁니다."""
+    try:
+        get_mongo_db()[TREND_CACHE_COLLECTION].update_one(
+            {'_id': _version_id(user_id)}, {'$inc': {'version': 1}, '$set': {'user_id': user_id}}, upsert=True
+        )
+    except Exception as e:
+        current_app.logger.error(f"Error invalidating mood trend cache for user {user_id}: {e}", exc_info=True)
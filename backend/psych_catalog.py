@@ -0,0 +1,107 @@
+# backend/psych_catalog.py
+# 심리 테스트 카탈로그의 프로세스 내 캐시입니다.
+# 테스트 정의(psych_tests)와 문항(psych_questions)은 관리자가 수정할 때만 바뀌므로
+# 모든 테스트를 한 번에 읽어 아래 형태로 만들어 두고, 테스트 목록/문항 조회/결과 제출에서 재사용합니다.
+#   - 문항은 order 순으로 미리 정렬하고 응답용(직렬화된) 형태로 보관
+#   - 채점 규칙(psych_tests.scoring)을 가중치 행렬로 미리 컴파일해 채점 시 조회 없이 바로 계산 (psych_scoring)
+# 관리자가 CMS 에서 테스트 관련 콘텐츠를 수정하면 bump_version() 으로 버전이 올라가고,
+# 각 워커는 버전이 달라진 것을 확인하면 카탈로그를 다시 읽습니다. (cache_versions)
+# DB 에서 테스트를 직접 수정한 경우에는 flask bump-psych-catalog 로 버전을 올려주세요.
+import datetime
+import threading
+from bson.objectid import ObjectId
+from flask import current_app
+from backend.mongo_models import get_mongo_db
+from backend import cache_versions, psych_scoring
+
+CATALOG_VERSION_NAME = 'psych_catalog'
+# 이 CMS 콘텐츠 유형이 수정되면 카탈로그 버전을 올립니다.
+CMS_CONTENT_TYPES = ('psych_test_questions', 'psych_tests')
+
+_catalog = None
+_load_lock = threading.Lock()
+
+
+def _serialize(doc):
+    doc = dict(doc)
+    for key, value in doc.items():
+        if isinstance(value, ObjectId):
+            doc[key] = str(value)
+        elif isinstance(value, datetime.datetime):
+            doc[key] = value.isoformat()
+    return doc
+
+
+def _load(version):
+    db = get_mongo_db()
+    raw_tests = list(db.psych_tests.find({}).sort('created_at', 1))
+    question_ids = [ObjectId(q_id) for test in raw_tests for q_id in test.get('questions', []) if ObjectId.is_valid(q_id)]
+    raw_questions = {str(q['_id']): q for q in db.psych_questions.find({'_id': {'$in': question_ids}})} if question_ids else {}
+
+    tests = []
+    for raw in raw_tests:
+        question_docs = [raw_questions[str(q_id)] for q_id in raw.get('questions', []) if str(q_id) in raw_questions]
+        question_docs.sort(key=lambda q: q.get('order', 0))
+        listing = _serialize(raw)
+        listing['questions'] = [str(q_id) for q_id in raw.get('questions', [])]
+        tests.append({
+            'id': str(raw['_id']),
+            'title': raw.get('title'),
+            'description': raw.get('description'),
+            'test_type': raw.get('test_type'),
+            # GET /tests 응답 항목
+            'listing': listing,
+            # GET /tests/<id>/questions 응답 (order 순)
+            'questions': [_serialize(q) for q in question_docs],
+            # 채점용: 컴파일된 채점 규칙
+            'scoring': _compile(raw, question_docs),
+        })
+    return {'version': version, 'tests': tests, 'by_id': {test['id']: test for test in tests}}
+
+
+def _compile(raw, question_docs):
+    try:
+        return psych_scoring.compile_rules(raw, question_docs)
+    except ValueError as e:
+        # 저장된 규칙이 잘못되었으면 테스트 유형의 기본 규칙으로 채점합니다.
+        current_app.logger.error(f"Invalid scoring rules for psych test {raw['_id']}: {e}")
+        return psych_scoring.compile_rules({'test_type': raw.get('test_type')}, question_docs)
+
+
+def get_catalog():
+    """현재 버전의 카탈로그를 반환합니다. 버전이 바뀌었으면 다시 읽습니다."""
+    global _catalog
+    version = cache_versions.current(CATALOG_VERSION_NAME)
+    catalog = _catalog
+    if catalog is not None and catalog['version'] == version:
+        return catalog
+    with _load_lock:
+        if _catalog is None or _catalog['version'] != version:
+            _catalog = _load(version)
+        return _catalog
+
+
+def list_tests():
+    return [test['listing'] for test in get_catalog()['tests']]
+
+
+def get_test(test_id):
+    return get_catalog()['by_id'].get(str(test_id))
+
+
+def bump_version():
+    """테스트/문항이 수정되었음을 알립니다. 모든 워커가 다음 확인 시 카탈로그를 다시 읽습니다."""
+    return cache_versions.bump(CATALOG_VERSION_NAME)
+
+
+def score_answers(test, answers):
+    """답변 [{'question_id', 'selected_option_index'}] 을 테스트의 채점 규칙으로 채점합니다.
+
+    반환값: (유효한 답변 목록, 결과 요약, 결과 상세, 유효하지 않은 답변 목록)
+    """
+    scoring = test['scoring']
+    processed, summary, details = scoring.evaluate([answers])[0]
+    valid = {(answer['question_id'], answer['selected_option_index']) for answer in processed}
+    invalid = [answer for answer in answers
+               if (answer.get('question_id'), answer.get('selected_option_index')) not in valid]
+    return processed, summary, details, invalid
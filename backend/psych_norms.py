@@ -0,0 +1,140 @@
+# backend/psych_norms.py
+# 심리 테스트별 점수 분포(규준)와 백분위 / z-점수 계산입니다.
+# 결과 페이지에서 "상위 몇 %" 를 보여줄 때마다 psych_test_results 전체를 읽지 않도록
+# 테스트별 점수 히스토그램을 psych_test_norms 컬렉션에 유지합니다.
+#
+#   {'_id': '<테스트 ID>', 'low': 0, 'width': 1, 'bins': 101, 'counts': [0, 2, ...],
+#    'count': 1234, 'sum': ..., 'sum_sq': ..., 'updated_at': ...}
+#
+# - 구간은 채점 규칙으로 계산한 primary 척도의 이론적 범위를 최대 MAX_BINS 개로 나눈 것입니다.
+#   (정수 점수이고 범위가 좁으면 폭 1, 즉 점수 하나당 구간 하나)
+# - 결과가 제출될 때마다 해당 구간과 합계를 $inc 로 갱신하고(record), 문서가 없거나 채점 규칙이 바뀌어
+#   구간이 달라졌으면 저장된 결과 전체로 다시 만듭니다. (flask rebuild-psych-norms 로도 가능)
+# - 조회 시에는 누적 분포를 프로세스 내에 CACHE_TTL_SECONDS 동안 보관하고 numpy.searchsorted 로
+#   O(log 구간 수) 에 백분위를 찾습니다.
+import math
+import time
+import datetime
+import threading
+import numpy as np
+from bson.objectid import ObjectId
+from flask import current_app
+from backend.mongo_models import get_mongo_db
+
+NORMS_COLLECTION = 'psych_test_norms'
+MAX_BINS = 200
+CACHE_TTL_SECONDS = 60
+# 표본이 이보다 적으면 백분위를 제공하지 않습니다.
+MIN_SAMPLE_SIZE = 20
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _layout(test):
+    """테스트의 채점 규칙으로 (최저점, 구간 폭, 구간 수) 를 정합니다."""
+    low, high = test['scoring'].primary_range()
+    span = high - low
+    if float(low).is_integer() and float(span).is_integer():
+        width = max(1, math.ceil((span + 1) / MAX_BINS))
+        bins = int(span // width) + 1
+    else:
+        width = span / MAX_BINS if span > 0 else 1.0
+        bins = MAX_BINS
+    return float(low), float(width), int(bins)
+
+
+def _bin_indices(scores, low, width, bins):
+    return np.clip(np.floor((np.asarray(scores, dtype=np.float64) - low) / width), 0, bins - 1).astype(np.int64)
+
+
+def rebuild(test):
+    """저장된 결과 전체로 테스트의 히스토그램을 다시 만듭니다. 반환값: 표본 수"""
+    db = get_mongo_db()
+    low, width, bins = _layout(test)
+    query = {'test_id': {'$in': [test['id'], ObjectId(test['id'])]}, 'result_details.total_score': {'$type': 'number'}}
+    scores = np.array([doc['result_details']['total_score']
+                       for doc in db.psych_test_results.find(query, {'result_details.total_score': 1})], dtype=np.float64)
+    counts = np.bincount(_bin_indices(scores, low, width, bins), minlength=bins)
+    db[NORMS_COLLECTION].replace_one({'_id': test['id']}, {
+        'low': low, 'width': width, 'bins': bins,
+        'counts': counts.tolist(),
+        'count': int(len(scores)),
+        'sum': float(scores.sum()),
+        'sum_sq': float((scores ** 2).sum()),
+        'updated_at': datetime.datetime.utcnow(),
+    }, upsert=True)
+    with _cache_lock:
+        _cache.pop(test['id'], None)
+    return int(len(scores))
+
+
+def record(test, score):
+    """새 결과 점수를 히스토그램에 더합니다. 결과 제출을 실패시키지 않도록 예외는 로그만 남깁니다.
+
+    결과를 저장한 뒤에 호출해야 합니다. (히스토그램을 새로 만들 때 방금 저장한 결과도 포함됨)
+    """
+    try:
+        low, width, bins = _layout(test)
+        index = int(_bin_indices([score], low, width, bins)[0])
+        updated = get_mongo_db()[NORMS_COLLECTION].update_one(
+            # 구간 설정이 같을 때만 더합니다. 다르면(문서 없음/규칙 변경) 전체로 다시 만듭니다.
+            {'_id': test['id'], 'low': low, 'width': width, 'bins': bins},
+            {'$inc': {f'counts.{index}': 1, 'count': 1, 'sum': float(score), 'sum_sq': float(score) ** 2},
+             '$set': {'updated_at': datetime.datetime.utcnow()}}
+        )
+        if not updated.matched_count:
+            rebuild(test)
+    except Exception as e:
+        current_app.logger.error(f"Error updating psych test norms for test {test['id']}: {e}", exc_info=True)
+
+
+def _load(test):
+    doc = get_mongo_db()[NORMS_COLLECTION].find_one({'_id': test['id']})
+    if doc is None or (doc['low'], doc['width'], doc['bins']) != _layout(test):
+        rebuild(test)
+        doc = get_mongo_db()[NORMS_COLLECTION].find_one({'_id': test['id']})
+    count = doc['count']
+    mean = doc['sum'] / count if count else 0.0
+    return {
+        'edges': doc['low'] + doc['width'] * np.arange(doc['bins']),
+        'counts': np.asarray(doc['counts'], dtype=np.float64),
+        # 구간 i 이전까지의 누적 표본 수
+        'below': np.concatenate(([0.0], np.cumsum(doc['counts'])[:-1])),
+        'count': count,
+        'mean': mean,
+        'std': math.sqrt(max(doc['sum_sq'] / count - mean ** 2, 0.0)) if count else 0.0,
+    }
+
+
+def get_norm(test):
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(test['id'])
+    if cached and cached[0] > now:
+        return cached[1]
+    norm = _load(test)
+    with _cache_lock:
+        _cache[test['id']] = (now + CACHE_TTL_SECONDS, norm)
+    return norm
+
+
+def position(test, score):
+    """점수의 백분위(같은 구간은 절반만 포함)와 z-점수. 표본이 부족하면 None."""
+    norm = get_norm(test)
+    if norm['count'] < MIN_SAMPLE_SIZE:
+        return None
+    index = max(int(np.searchsorted(norm['edges'], score, side='right')) - 1, 0)
+    percentile = (norm['below'][index] + norm['counts'][index] / 2) / norm['count'] * 100
+    return {
+        'percentile': round(float(percentile), 1),
+        'z_score': round((score - norm['mean']) / norm['std'], 2) if norm['std'] > 0 else 0.0,
+        'mean': round(norm['mean'], 2),
+        'std': round(norm['std'], 2),
+        'sample_size': norm['count'],
+    }
+
+
+def rebuild_psych_norms(tests):
+    """여러 테스트의 히스토그램을 다시 만듭니다. 반환값: {테스트 ID: 표본 수}"""
+    return {test['id']: rebuild(test) for test in tests}
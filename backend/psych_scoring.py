@@ -0,0 +1,231 @@
+# backend/psych_scoring.py
+# 심리 테스트 채점 엔진입니다.
+# 채점 규칙은 테스트 문서(psych_tests.scoring)에 선언적으로 저장하고, 카탈로그를 읽을 때 한 번
+# NumPy 가중치 행렬로 컴파일합니다. 제출 1건 채점과 저장된 결과 일괄 재채점이 같은 행렬 연산을 사용하므로
+# 규칙을 바꾼 뒤 과거 결과도 같은 기준으로 다시 계산할 수 있습니다. (flask rescore-psych-results)
+#
+#   'scoring': {
+#       'scales': [                                   # 척도(하위 척도) 목록
+#           {'key': 'total_score'},                   # items 생략 시 모든 문항, 가중치 1
+#           {'key': 'social', 'items': ['<문항 ID>', ...], 'weights': {'<문항 ID>': 2},
+#            'reverse': ['<문항 ID>']},               # 역채점: (선택지 최고점 + 최저점) - 점수
+#       ],
+#       'primary': 'total_score',                     # 구간(bands)을 적용할 척도, result_details.total_score 로 저장
+#       'label_field': 'type',                        # 구간 라벨을 저장할 result_details 키
+#       'bands': [{'min': 80, 'label': 'Extrovert', 'summary': '...'}, {'min': None, ...}],   # min 이상이면 해당 구간
+#       'default_summary': '테스트 결과 요약',          # 해당 구간이 없을 때
+#       'option_breakdown': True,                     # 선택지 문구별 점수 합(scores_by_option) 포함 여부
+#   }
+#
+# 규칙이 없는 테스트는 test_type 별 DEFAULT_SCORING 을 사용합니다. (기존 하드코딩 기준과 동일)
+import numpy as np
+from pymongo import UpdateOne
+from bson.objectid import ObjectId
+
+TOTAL_SCALE = {'key': 'total_score'}
+
+DEFAULT_SCORING = {
+    'personality': {
+        'scales': [TOTAL_SCALE],
+        'primary': 'total_score',
+        'label_field': 'type',
+        'bands': [
+            {'min': 80, 'label': 'Extrovert', 'summary': '당신은 매우 외향적인 성격입니다.'},
+            {'min': 50, 'label': 'Ambivert', 'summary': '당신은 중간 정도의 외향성을 가집니다.'},
+            {'min': None, 'label': 'Introvert', 'summary': '당신은 내향적인 성격입니다.'},
+        ],
+        'option_breakdown': True,
+    },
+    'emotion_diagnosis': {
+        'scales': [TOTAL_SCALE],
+        'primary': 'total_score',
+        'label_field': 'level',
+        'bands': [
+            {'min': 70, 'label': 'High Stress',
+             'summary': '현재 높은 수준의 스트레스를 경험하고 있습니다. 전문가와 상담을 고려해보세요.'},
+            {'min': 40, 'label': 'Moderate Stress', 'summary': '일반적인 수준의 스트레스를 경험하고 있습니다. 휴식이 필요합니다.'},
+            {'min': None, 'label': 'Low Stress', 'summary': '현재 안정적인 감정 상태입니다.'},
+        ],
+    },
+}
+FALLBACK_SCORING = {'scales': [TOTAL_SCALE], 'primary': 'total_score'}
+DEFAULT_SUMMARY = '테스트 결과 요약'
+
+
+def rules_for(test_doc):
+    return test_doc.get('scoring') or DEFAULT_SCORING.get(test_doc.get('test_type'), FALLBACK_SCORING)
+
+
+class CompiledScoring:
+    """채점 규칙을 행렬로 컴파일한 결과.
+
+    문항 q 의 원점수 x_q, 응답 여부 m_q 에 대해 척도 s 의 점수는
+        sum_q w[s,q] * (역채점이면 (max_q + min_q) - x_q, 아니면 x_q)
+      = (X @ linear.T + M @ offset.T)[s]
+    로 계산됩니다. (linear = w * (1 - 2r), offset = w * r * (max_q + min_q))
+    """
+
+    def __init__(self, rules, question_docs):
+        self.question_ids = [str(q['_id']) for q in question_docs]
+        self.question_index = {q_id: column for column, q_id in enumerate(self.question_ids)}
+        options = [q.get('options', []) for q in question_docs]
+        self.option_texts = [[option.get('text') for option in opts] for opts in options]
+
+        # 문항 x 선택지 점수표 (선택지 수가 다르면 뒤를 0 으로 채움)
+        width = max((len(opts) for opts in options), default=0)
+        self.option_scores = np.zeros((len(options), max(width, 1)))
+        self.option_counts = np.array([len(opts) for opts in options], dtype=np.int64)
+        for row, opts in enumerate(options):
+            self.option_scores[row, :len(opts)] = [float(option.get('score', 0)) for option in opts]
+        # 선택지가 없는 문항은 역채점 기준점을 0 으로 둡니다.
+        span = np.array([(min(scores) + max(scores)) if scores else 0.0
+                         for scores in ([float(o.get('score', 0)) for o in opts] for opts in options)])
+
+        scales = rules.get('scales') or [TOTAL_SCALE]
+        self.scale_keys = [scale['key'] for scale in scales]
+        if len(set(self.scale_keys)) != len(self.scale_keys):
+            raise ValueError("scale key 가 중복되었습니다.")
+        weights = np.zeros((len(scales), len(self.question_ids)))
+        reverse = np.zeros_like(weights)
+        for row, scale in enumerate(scales):
+            items = scale.get('items')
+            columns = range(len(self.question_ids)) if items is None else [self._column(q_id) for q_id in items]
+            custom = scale.get('weights') or {}
+            for column in columns:
+                weights[row, column] = float(custom.get(self.question_ids[column], 1))
+            for q_id in scale.get('reverse') or []:
+                reverse[row, self._column(q_id)] = 1
+        self.linear = weights * (1 - 2 * reverse)
+        self.offset = weights * reverse * span
+
+        primary = rules.get('primary', self.scale_keys[0])
+        if primary not in self.scale_keys:
+            raise ValueError(f"primary 척도 '{primary}' 가 scales 에 없습니다.")
+        self.primary_index = self.scale_keys.index(primary)
+        self.label_field = rules.get('label_field')
+        self.default_summary = rules.get('default_summary', DEFAULT_SUMMARY)
+        self.option_breakdown = bool(rules.get('option_breakdown'))
+
+        # 구간: min 오름차순으로 정렬해 searchsorted 로 찾습니다. (min 이 없으면 -inf)
+        bands = sorted(rules.get('bands') or [], key=lambda band: -np.inf if band.get('min') is None else band['min'])
+        self.band_mins = np.array([-np.inf if band.get('min') is None else float(band['min']) for band in bands])
+        self.bands = bands
+
+    def _column(self, q_id):
+        if str(q_id) not in self.question_index:
+            raise ValueError(f"문항 '{q_id}' 가 테스트에 없습니다.")
+        return self.question_index[str(q_id)]
+
+    def choice_matrix(self, answer_lists):
+        """답변 목록들 -> (결과 수 x 문항 수) 선택지 인덱스 행렬. 응답하지 않았거나 유효하지 않으면 -1."""
+        choices = np.full((len(answer_lists), len(self.question_ids)), -1, dtype=np.int64)
+        for row, answers in enumerate(answer_lists):
+            for answer in answers or []:
+                column = self.question_index.get(str(answer.get('question_id')))
+                index = answer.get('selected_option_index')
+                if column is None or not isinstance(index, int) or isinstance(index, bool):
+                    continue
+                if 0 <= index < self.option_counts[column]:
+                    choices[row, column] = index
+        return choices
+
+    def score(self, choices):
+        """선택지 인덱스 행렬 -> (원점수 행렬, 응답 여부 행렬, 척도 점수 행렬, 구간 인덱스 배열)"""
+        answered = choices >= 0
+        raw = np.where(answered, self.option_scores[np.arange(choices.shape[1]), np.maximum(choices, 0)], 0.0)
+        scales = raw @ self.linear.T + answered.astype(np.float64) @ self.offset.T
+        if len(self.bands):
+            band_index = np.searchsorted(self.band_mins, scales[:, self.primary_index], side='right') - 1
+        else:
+            band_index = np.full(len(choices), -1)
+        return raw, answered, scales, band_index
+
+    def describe(self, raw_row, answered_row, scale_row, band):
+        """한 결과의 (processed_answers, result_summary, result_details) 를 만듭니다."""
+        processed = [{
+            'question_id': self.question_ids[column],
+            'selected_option_index': None,
+            'score': _number(raw_row[column]),
+        } for column in np.flatnonzero(answered_row)]
+        details = {
+            'total_score': _number(scale_row[self.primary_index]),
+            'scales': {key: _number(value) for key, value in zip(self.scale_keys, scale_row)},
+        }
+        summary = self.default_summary
+        if band >= 0:
+            summary = self.bands[band].get('summary', summary)
+            if self.label_field:
+                details[self.label_field] = self.bands[band].get('label')
+        return processed, summary, details
+
+    def primary_range(self):
+        """primary 척도가 가질 수 있는 (최저점, 최고점). 모든 문항에 응답했다고 가정합니다."""
+        low = high = 0.0
+        for column, count in enumerate(self.option_counts):
+            if not count:
+                continue
+            values = (self.linear[self.primary_index, column] * self.option_scores[column, :count]
+                      + self.offset[self.primary_index, column])
+            low, high = low + values.min(), high + values.max()
+        return low, high
+
+    def evaluate(self, answer_lists):
+        """답변 목록들을 한 번의 행렬 연산으로 채점합니다. 반환값: [(processed_answers, summary, details), ...]"""
+        choices = self.choice_matrix(answer_lists)
+        raw, answered, scales, bands = self.score(choices)
+        results = []
+        for row in range(len(answer_lists)):
+            processed, summary, details = self.describe(raw[row], answered[row], scales[row], bands[row])
+            for answer in processed:
+                answer['selected_option_index'] = int(choices[row, self.question_index[answer['question_id']]])
+            if self.option_breakdown:
+                breakdown = {}
+                for answer in processed:
+                    text = self.option_texts[self.question_index[answer['question_id']]][answer['selected_option_index']]
+                    breakdown[text] = breakdown.get(text, 0) + answer['score']
+                details['scores_by_option'] = breakdown
+            results.append((processed, summary, details))
+        return results
+
+
+def _number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else round(value, 4)
+
+
+def compile_rules(test_doc, question_docs):
+    """테스트 문서의 채점 규칙을 컴파일합니다. 규칙이 잘못되었으면 ValueError."""
+    try:
+        return CompiledScoring(rules_for(test_doc), question_docs)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"잘못된 채점 규칙: {e}")
+
+
+def rescore_results(db, test_id, compiled, batch_size=1000):
+    """저장된 psych_test_results 를 현재 규칙으로 다시 채점해 bulk_write 로 덮어씁니다. 반환값: 갱신된 결과 수"""
+    # test_id 는 문자열로 저장되어 왔지만 ObjectId 로 저장된 결과도 함께 처리합니다.
+    query = {'test_id': {'$in': [str(test_id), ObjectId(test_id)]}}
+    collection = db.psych_test_results
+    updated = 0
+    batch = []
+
+    def flush():
+        nonlocal updated
+        results = compiled.evaluate([doc.get('answers') for doc in batch])
+        operations = [
+            UpdateOne({'_id': doc['_id']}, {'$set': {
+                'answers': processed, 'result_summary': summary, 'result_details': details,
+            }})
+            for doc, (processed, summary, details) in zip(batch, results)
+        ]
+        if operations:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+        batch.clear()
+
+    for doc in collection.find(query, {'answers': 1}).batch_size(batch_size):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return updated
@@ -0,0 +1,66 @@
+# backend/public_notices.py
+# 공개 공지사항 (GET /api/admin/notices/public) 의 프로세스 내 캐시입니다.
+# 로그인 없이 자주 호출되는 목록이므로 요청마다 notices 테이블을 조회하지 않고,
+# 공개 상태이면서 아직 게시 기간이 끝나지 않은 공지(게시 시작 전 포함)를 한 번에 읽어 두었다가
+# 요청 시점의 시각으로 게시 기간만 걸러 반환합니다.
+#
+# 공지가 생성/수정/삭제되거나 게시 종료 전환(expiry_scheduler)이 일어나면 invalidate() 로
+# 버전을 올리고, 각 워커는 버전이 달라진 것을 확인하면 다시 읽습니다. (cache_versions)
+# 작성자 닉네임은 캐시하지 않고 조회 시 user_profiles 로 붙입니다.
+import datetime
+import threading
+from flask import current_app
+from sqlalchemy import or_
+from backend.extensions import db
+from backend.maria_models import Notice
+from backend import cache_versions
+
+VERSION_NAME = 'public_notices'
+FIELDS = ('id', 'title', 'content', 'user_id', 'start_date', 'end_date', 'created_at')
+
+_cache = None
+_load_lock = threading.Lock()
+
+
+def _load(version):
+    now = datetime.datetime.utcnow()
+    # 게시 시작일이 없는 공지는 공개 목록에 나오지 않습니다. (start_date <= now 조건과 동일)
+    rows = db.session.query(*(getattr(Notice, field) for field in FIELDS)).filter(
+        Notice.is_public == True,
+        Notice.start_date != None,
+        or_(Notice.end_date == None, Notice.end_date > now)
+    ).order_by(Notice.created_at.desc()).all()
+    return {'version': version, 'notices': [dict(zip(FIELDS, row)) for row in rows]}
+
+
+def _get_cache():
+    global _cache
+    version = cache_versions.current(VERSION_NAME)
+    cache = _cache
+    if cache is not None and cache['version'] == version:
+        return cache
+    with _load_lock:
+        if _cache is None or _cache['version'] != version:
+            _cache = _load(version)
+        return _cache
+
+
+def get_active(now=None):
+    """지금 게시 중인 공지사항 목록 (최신순). 항목은 FIELDS 키를 가진 dict 입니다."""
+    now = now or datetime.datetime.utcnow()
+    return [notice for notice in _get_cache()['notices']
+            if notice['start_date'] <= now and (notice['end_date'] is None or notice['end_date'] > now)]
+
+
+def invalidate():
+    """공지사항이 수정되었음을 알립니다. 모든 워커가 다음 확인 시 목록을 다시 읽습니다.
+
+    이미 커밋된 원래 요청을 실패시키지 않도록 버전 갱신 실패는 로그만 남기고 이 워커의 캐시만 비웁니다.
+    """
+    global _cache
+    try:
+        return cache_versions.bump(VERSION_NAME)
+    except Exception as e:
+        current_app.logger.error(f"Error bumping public notice cache version: {e}", exc_info=True)
+        with _load_lock:
+            _cache = None
@@ -6,11 +6,14 @@ from backend.extensions import db, mongo
 from backend.maria_models import User, Post, Comment, Role, UserRole, Notice, PostLike
 from backend.mongo_models import DiaryEntry, MoodEntry, Inquiry, PsychTest, PsychQuestion, PsychTestResult
 from backend.routes.auth_routes import token_required, roles_required
+from backend.analytics_rollups import sum_counts, monthly_totals, METRIC_DIARY_ENTRIES, METRIC_MOOD_ENTRIES
+from backend.keywords import delete_user_keywords
+from backend import calendar_summaries, diary_search, diary_derived, mood_trends, user_stats, counters, psych_catalog, user_profiles, admin_records, admin_users, admin_bulk, public_notices, expiry_scheduler
+from backend.keyword_analytics import get_top_keywords as get_corpus_top_keywords, KEYWORD_SOURCES
+from backend.fanout import fan_out, failed_branches, server_timing
 from bson.objectid import ObjectId
 import datetime
 from datetime import timedelta
-from collections import Counter
-from sqlalchemy import and_
 from sqlalchemy.orm import joinedload
 
 # --- Helper Function for MongoDB Connection ---
@@ -32,23 +35,29 @@ def record(state):
 
 
 # 대시보드 통계 API
+# 통계 항목별 제한 시간(초)
+DASHBOARD_QUERY_TIMEOUT = 2.0
+
 @admin_bp.route('/dashboard/stats', methods=['GET'])
 @token_required
 @roles_required(['관리자'])
 def get_dashboard_stats():
     try:
-        db_mongo = get_mongo_db()
-        total_users = User.query.count()
-        ai_chat_count = db_mongo.chat_history.count_documents({})
-        diary_entry_count = db_mongo.diary_entries.count_documents({})
-        community_post_count = Post.query.count()
-
-        return jsonify({
-            'total_users': total_users,
-            'ai_chat_count': ai_chat_count,
-            'diary_entry_count': diary_entry_count,
-            'community_post_count': community_post_count
-        }), 200
+        # 전체 카운트는 global_counters / 추정치 / TTL 캐시에서 읽습니다. (최대 몇 초 늦게 반영될 수 있음)
+        # 캐시가 비어 있는 항목은 저장소를 조회하므로 동시에 실행합니다. 늦거나 실패한 항목은 null 로 반환됩니다.
+        stats, trace = fan_out({
+            'total_users': lambda: counters.get(counters.COUNTER_USERS),
+            'ai_chat_count': lambda: counters.get(counters.COUNTER_CHAT_MESSAGES),
+            'diary_entry_count': lambda: counters.get(counters.COUNTER_DIARY_ENTRIES),
+            'community_post_count': lambda: counters.get(counters.COUNTER_POSTS),
+        }, timeout=DASHBOARD_QUERY_TIMEOUT, label='admin dashboard stats')
+
+        unavailable = failed_branches(trace)
+        if unavailable:
+            stats['unavailable'] = unavailable
+        response = jsonify(stats)
+        response.headers['Server-Timing'] = server_timing(trace)
+        return response, 200
     except Exception as e:
         current_app.logger.error(f"Error fetching admin dashboard stats: {e}", exc_info=True)
         return jsonify({'message': '대시보드 통계를 불러오는 데 실패했습니다.'}), 500
@@ -277,33 +286,59 @@ def update_role_menu_configs(role_id):
         return jsonify({'message': '역할 메뉴 할당 업데이트에 실패했습니다.'}), 500
 
 # 사용자 관리 API
+# ?limit=50&cursor=<next_cursor>&sort=created_at|username&role=관리자&q=<접두어>&field=username|email|nickname|user_uid
 @admin_bp.route('/users', methods=['GET'])
 @token_required
 @roles_required(['관리자'])
 def get_all_users():
+    sort = request.args.get('sort', admin_users.SORT_CREATED_AT)
+    if sort not in admin_users.SORTS:
+        return jsonify({'message': f"sort 는 {', '.join(admin_users.SORTS)} 중에서 선택해주세요."}), 400
+    field = request.args.get('field')
+    if field and field not in admin_users.SEARCH_FIELDS:
+        return jsonify({'message': f"field 는 {', '.join(admin_users.SEARCH_FIELDS)} 중에서 선택해주세요."}), 400
+
+    try:
+        limit = min(int(request.args.get('limit', admin_users.DEFAULT_PAGE_SIZE)), admin_users.MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({'message': 'limit 은 1 이상의 숫자여야 합니다.'}), 400
+
     try:
-        users = User.query.options(joinedload(User.roles)).all()
-        users_data = []
-        for user in users:
-            user_dict = {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'user_uid': user.user_uid,
-                'nickname': user.nickname,
-                'gender': user.gender,
-                'age': user.age,
-                'major': user.major,
-                'created_at': user.created_at.isoformat() if user.created_at else None,
-                'updated_at': user.updated_at.isoformat() if user.updated_at else None,
-                'roles': [role.name for role in user.roles]
-            }
-            users_data.append(user_dict)
-        return jsonify({'users': users_data}), 200
+        try:
+            users_data, next_cursor = admin_users.get_page(
+                request.args.get('cursor'), limit, sort, request.args.get('role'),
+                request.args.get('q', '').strip(), (field,) if field else admin_users.SEARCH_FIELDS
+            )
+        except ValueError:
+            return jsonify({'message': '잘못된 커서입니다.'}), 400
+        return jsonify({'users': users_data, 'next_cursor': next_cursor}), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching all users: {e}", exc_info=True)
         return jsonify({'message': '사용자 목록을 불러오는 데 실패했습니다.'}), 500
 
+# 사용자 자동완성 (username / email / nickname / user_uid 접두어)
+@admin_bp.route('/users/typeahead', methods=['GET'])
+@token_required
+@roles_required(['관리자'])
+def get_users_typeahead():
+    prefix = request.args.get('q', '').strip()
+    if not prefix:
+        return jsonify({'users': []}), 200
+    try:
+        limit = min(int(request.args.get('limit', admin_users.TYPEAHEAD_LIMIT)), admin_users.TYPEAHEAD_LIMIT)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({'message': 'limit 은 1 이상의 숫자여야 합니다.'}), 400
+
+    try:
+        return jsonify({'users': admin_users.typeahead(prefix, limit)}), 200
+    except Exception as e:
+        current_app.logger.error(f"Error fetching user typeahead: {e}", exc_info=True)
+        return jsonify({'message': '사용자 검색에 실패했습니다.'}), 500
+
 # 사용자 역할 업데이트
 @admin_bp.route('/users/<int:user_id>/roles', methods=['PUT'])
 @token_required
@@ -320,12 +355,8 @@ def update_user_roles(user_id):
         if not user:
             return jsonify({'message': '사용자를 찾을 수 없습니다.'}), 404
 
-        user.roles.clear()
-        
-        for role_name in new_role_names:
-            role = Role.query.filter_by(name=role_name).first()
-            if role:
-                user.roles.append(role)
+        # 역할은 IN 쿼리 한 번으로 조회합니다. (없는 역할 이름은 무시)
+        user.roles = Role.query.filter(Role.name.in_(new_role_names)).all() if new_role_names else []
         db.session.commit()
         return jsonify({'message': '사용자 역할이 성공적으로 업데이트되었습니다.'}), 200
     except Exception as e:
@@ -333,6 +364,42 @@ def update_user_roles(user_id):
         current_app.logger.error(f"Error updating roles for user {user_id}: {e}", exc_info=True)
         return jsonify({'message': '사용자 역할 업데이트에 실패했습니다.'}), 500
 
+# 사용자 역할 일괄 변경
+# body: {"user_ids": [1, 2, ...], "roles": ["운영자"], "mode": "set" | "add" | "remove"}
+@admin_bp.route('/users/bulk_roles', methods=['PUT'])
+@token_required
+@roles_required(['관리자'])
+def bulk_update_user_roles():
+    data = request.get_json() or {}
+    role_names = data.get('roles', [])
+    mode = data.get('mode', 'set')
+
+    try:
+        user_ids = admin_bulk.normalize_ids(data.get('user_ids'))
+    except ValueError:
+        return jsonify({'message': f"user_ids 는 1~{admin_bulk.MAX_IDS}개의 사용자 ID 리스트여야 합니다."}), 400
+    if not isinstance(role_names, list):
+        return jsonify({'message': '역할은 리스트 형태여야 합니다.'}), 400
+    if mode not in admin_bulk.ROLE_MODES:
+        return jsonify({'message': f"mode 는 {', '.join(admin_bulk.ROLE_MODES)} 중에서 선택해주세요."}), 400
+    if mode != 'set' and not role_names:
+        return jsonify({'message': '추가/제거할 역할을 지정해야 합니다.'}), 400
+
+    try:
+        role_ids = admin_bulk.resolve_roles(role_names)
+        unknown = [name for name in role_names if name not in role_ids]
+        if unknown:
+            return jsonify({'message': f"존재하지 않는 역할입니다: {', '.join(map(str, unknown))}"}), 400
+
+        # 자기 자신의 역할은 일괄 변경 대상에서 제외합니다. (관리자 권한을 실수로 잃지 않도록)
+        results = admin_bulk.update_user_roles(user_ids, list(role_ids.values()), mode, skip_ids=(g.user_id,))
+        return jsonify({'message': '사용자 역할 일괄 변경이 완료되었습니다.',
+                        'results': results, 'counts': admin_bulk.summarize(results)}), 200
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error bulk updating roles for users {user_ids}: {e}", exc_info=True)
+        return jsonify({'message': '사용자 역할 일괄 변경에 실패했습니다.'}), 500
+
 # 사용자 강제 삭제
 @admin_bp.route('/users/<int:user_id>/force_delete', methods=['DELETE'])
 @token_required
@@ -346,15 +413,31 @@ def force_delete_user(user_id):
         db_mongo = get_mongo_db()
         
         posts_by_user = Post.query.filter_by(user_id=user_id).all()
+        # 삭제되는 게시글에 달린 다른 사용자의 댓글 수도 통계에서 빼야 합니다.
+        stats_deltas = {}
         for post in posts_by_user:
             if post.mongo_content_id:
                 db_mongo.post_contents.delete_one({'_id': ObjectId(post.mongo_content_id)})
+            for other_user_id, deltas in user_stats.post_deletion_deltas(post).items():
+                if other_user_id != user_id:
+                    stats_deltas.setdefault(other_user_id, {'comment_count': 0})['comment_count'] += deltas['comment_count']
         
         db_mongo.diary_entries.delete_many({'user_id': user_id})
-        db_mongo.mood_entries.delete_many({'user_id': user_id})
+        delete_user_keywords(user_id)
+        MoodEntry.delete_for_user(user_id)
+        calendar_summaries.delete_for_user(user_id)
+        diary_search.delete_for_user(user_id)
+        db_mongo[diary_derived.TOMBSTONE_COLLECTION].delete_many({'user_id': user_id})
+        db_mongo[mood_trends.TREND_CACHE_COLLECTION].delete_many({'user_id': user_id})
 
         db.session.delete(user)
         db.session.commit()
+        user_stats.delete_for_user(user_id)
+        user_stats.apply_deltas(stats_deltas)
+        user_profiles.invalidate(user_id)
+        counters.increment(counters.COUNTER_USERS, -1)
+        if posts_by_user:
+            counters.increment(counters.COUNTER_POSTS, -len(posts_by_user))
 
         return jsonify({'message': '사용자 및 관련 데이터가 성공적으로 삭제되었습니다.'}), 200
     except Exception as e:
@@ -390,6 +473,8 @@ def create_notice():
         )
         db.session.add(new_notice)
         db.session.commit()
+        public_notices.invalidate()
+        expiry_scheduler.schedule(expiry_scheduler.NOTICE_END, new_notice.id, new_notice.end_date)
         return jsonify({'message': '공지사항이 성공적으로 생성되었습니다.', 'id': new_notice.id}), 201
     except Exception as e:
         db.session.rollback()
@@ -426,11 +511,8 @@ def get_notice(notice_id):
         notice = db.session.get(Notice, notice_id)
         if not notice:
             return jsonify({'message': '공지사항을 찾을 수 없습니다.'}), 404
-        
-        if notice.is_public and notice.end_date and notice.end_date < datetime.datetime.utcnow():
-            notice.is_public = False
-            db.session.commit()
 
+        # 게시 종료일이 지난 공지의 비공개 전환은 expiry_scheduler 가 처리합니다.
         notice_data = {
             'id': notice.id, 'title': notice.title, 'content': notice.content,
             'user_id': notice.user_id,
@@ -442,7 +524,6 @@ def get_notice(notice_id):
         }
         return jsonify(notice_data), 200
     except Exception as e:
-        db.session.rollback()
         current_app.logger.error(f"Error fetching notice {notice_id}: {e}", exc_info=True)
         return jsonify({'message': '공지사항을 불러오는 데 실패했습니다.'}), 500
 
@@ -469,6 +550,8 @@ def update_notice(notice_id):
             notice.end_date = datetime.datetime.fromisoformat(end_date_str.replace('Z', '+00:00')) if end_date_str else None
 
         db.session.commit()
+        public_notices.invalidate()
+        expiry_scheduler.schedule(expiry_scheduler.NOTICE_END, notice.id, notice.end_date)
         return jsonify({'message': '공지사항이 성공적으로 수정되었습니다.'}), 200
     except Exception as e:
         db.session.rollback()
@@ -486,6 +569,9 @@ def toggle_notice_visibility(notice_id):
         
         notice.is_public = not notice.is_public
         db.session.commit()
+        public_notices.invalidate()
+        if notice.is_public:
+            expiry_scheduler.schedule(expiry_scheduler.NOTICE_END, notice.id, notice.end_date)
         status = "공개" if notice.is_public else "비공개"
         return jsonify({'message': f'공지사항이 성공적으로 {status} 처리되었습니다.', 'is_public': notice.is_public}), 200
     except Exception as e:
@@ -504,6 +590,7 @@ def delete_notice(notice_id):
         
         db.session.delete(notice)
         db.session.commit()
+        public_notices.invalidate()
         return jsonify({'message': '공지사항이 성공적으로 삭제되었습니다.'}), 200
     except Exception as e:
         db.session.rollback()
@@ -511,87 +598,56 @@ def delete_notice(notice_id):
         return jsonify({'message': '공지사항 삭제에 실패했습니다.'}), 500
 
 
+# 공개 공지사항 (로그인 불필요). 게시 중인 공지를 public_notices 캐시에서 읽기만 합니다.
 @admin_bp.route('/notices/public', methods=['GET'])
 def get_public_notices():
     try:
-        notices_to_update = Notice.query.filter(
-            Notice.is_public == True,
-            Notice.end_date != None,
-            Notice.end_date < datetime.datetime.utcnow()
-        ).all()
-
-        for notice in notices_to_update:
-            notice.is_public = False
-        if notices_to_update:
-            db.session.commit()
-
-        public_notices = Notice.query.filter(
-            Notice.is_public == True,
-            and_(
-                Notice.start_date <= datetime.datetime.utcnow(),
-                (Notice.end_date == None) | (Notice.end_date > datetime.datetime.utcnow())
-            )
-        ).options(joinedload(Notice.author)).order_by(Notice.created_at.desc()).all()
-
+        active_notices = public_notices.get_active()
+        authors = user_profiles.resolve(n['user_id'] for n in active_notices)
         notices_data = []
-        for n in public_notices:
+        for n in active_notices:
+            author = authors.get(n['user_id'])
             notices_data.append({
-                'id': n.id, 'title': n.title, 'content': n.content,
-                'author_nickname': n.author.nickname if n.author else '알 수 없음',
-                'created_at': n.created_at.isoformat() if n.created_at else None
+                'id': n['id'], 'title': n['title'], 'content': n['content'],
+                'author_nickname': author['nickname'] if author else '알 수 없음',
+                'created_at': n['created_at'].isoformat() if n['created_at'] else None
             })
         return jsonify({'notices': notices_data}), 200
     except Exception as e:
-        db.session.rollback()
         current_app.logger.error(f"Error fetching public notices: {e}", exc_info=True)
         return jsonify({'message': '공지사항을 불러오는 데 실패했습니다.'}), 500
 
 
 # DB 관리 API
+# 일기 / 감정 기록 / 챗봇 상담 / 문의를 최신순으로 합친 피드 (admin_records)
+# ?limit=50&cursor=<next_cursor>&types=diary,inquiry&user_id=3&start=2024-01-01&end=2024-01-31&status=pending
 @admin_bp.route('/db_records', methods=['GET'])
 @token_required
 @roles_required(['관리자', '개발자', '연구자'])
 def get_db_records():
+    types_param = request.args.get('types')
+    sources = [source.strip() for source in types_param.split(',') if source.strip()] if types_param else None
+    if sources and any(source not in admin_records.SOURCES for source in sources):
+        return jsonify({'message': f"types 는 {', '.join(admin_records.SOURCES)} 중에서 선택해주세요."}), 400
+
     try:
-        db_mongo = get_mongo_db()
-        records_data = []
-
-        # 일기 기록
-        diary_entries = list(db_mongo.diary_entries.find({}).sort('created_at', -1).limit(100))
-        for entry in diary_entries:
-            user = db.session.get(User, entry.get('user_id'))
-            created_at_val = entry.get('created_at', datetime.datetime.utcnow())
-            timestamp_iso = created_at_val.isoformat() if isinstance(created_at_val, datetime.datetime) else created_at_val
-            records_data.append({
-                'id': str(entry['_id']),
-                'user_id': entry.get('user_id'),
-                'user_username': user.username if user else 'Unknown',
-                'user_email': user.email if user else 'Unknown',
-                'type': '일기',
-                'summary': entry.get('title', '제목 없음'),
-                'timestamp': timestamp_iso,
-                'conversation': [{'role': '일기 내용', 'text': entry.get('content', '내용 없음')}]
-            })
-        
-        # 감정 기록
-        mood_entries = list(db_mongo.mood_entries.find({}).sort('timestamp', -1).limit(100))
-        for entry in mood_entries:
-            user = db.session.get(User, entry.get('user_id'))
-            timestamp_val = entry.get('timestamp', datetime.datetime.utcnow())
-            timestamp_iso_mood = timestamp_val.isoformat() if isinstance(timestamp_val, datetime.datetime) else timestamp_val
-            records_data.append({
-                'id': str(entry['_id']),
-                'user_id': entry.get('user_id'),
-                'user_username': user.username if user else 'Unknown',
-                'user_email': user.email if user else 'Unknown',
-                'type': '감정 기록',
-                'summary': f"감정: {entry.get('mood', '알 수 없음')}",
-                'timestamp': timestamp_iso_mood,
-                'conversation': [{'role': '감정', 'text': entry.get('mood', '알 수 없음')}]
-            })
+        limit = min(int(request.args.get('limit', admin_records.DEFAULT_PAGE_SIZE)), admin_records.MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError
+        user_id = int(request.args['user_id']) if request.args.get('user_id') else None
+        start = datetime.date.fromisoformat(request.args['start']) if request.args.get('start') else None
+        end = datetime.date.fromisoformat(request.args['end']) if request.args.get('end') else None
+    except ValueError:
+        return jsonify({'message': 'limit, user_id 는 숫자, start, end 는 YYYY-MM-DD 형식이어야 합니다.'}), 400
 
-        records_data.sort(key=lambda x: x['timestamp'], reverse=True)
-        return jsonify({'records': records_data}), 200
+    try:
+        try:
+            records, next_cursor = admin_records.get_page(
+                request.args.get('cursor'), limit, sources, user_id, start, end, request.args.get('status')
+            )
+        except ValueError:
+            return jsonify({'message': '잘못된 커서입니다.'}), 400
+        return jsonify({'records': records, 'next_cursor': next_cursor}), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching DB records: {e}", exc_info=True)
         return jsonify({'message': 'DB 기록을 불러오는 데 실패했습니다.'}), 500
@@ -678,8 +734,11 @@ def delete_post_admin(post_id):
             db_mongo = get_mongo_db()
             db_mongo.post_contents.delete_one({'_id': ObjectId(post.mongo_content_id)})
 
+        stats_deltas = user_stats.post_deletion_deltas(post)
         db.session.delete(post)
         db.session.commit()
+        user_stats.apply_deltas(stats_deltas)
+        counters.increment(counters.COUNTER_POSTS, -1)
         return jsonify({'message': '게시글이 성공적으로 삭제되었습니다.'}), 200
     except Exception as e:
         db.session.rollback()
@@ -715,6 +774,7 @@ def toggle_post_suspension(post_id):
             message = "게시글 정지가 성공적으로 해제되었습니다."
         
         db.session.commit()
+        expiry_scheduler.schedule(expiry_scheduler.POST_SUSPENSION, post.id, post.suspended_until)
         return jsonify({'message': message}), 200
     except Exception as e:
         db.session.rollback()
@@ -722,6 +782,56 @@ def toggle_post_suspension(post_id):
         return jsonify({'message': '게시글 정지/해제 처리에 실패했습니다.'}), 500
 
 
+# 게시글 일괄 정지/해제
+# body: {"post_ids": [1, 2, ...], "suspend": true, "duration_hours": 24}
+@admin_bp.route('/posts/bulk_suspension', methods=['PUT'])
+@token_required
+@roles_required(['관리자', '운영자'])
+def bulk_toggle_post_suspension():
+    data = request.get_json() or {}
+    suspend = data.get('suspend')
+    duration_hours = data.get('duration_hours')
+
+    try:
+        post_ids = admin_bulk.normalize_ids(data.get('post_ids'))
+    except ValueError:
+        return jsonify({'message': f"post_ids 는 1~{admin_bulk.MAX_IDS}개의 게시글 ID 리스트여야 합니다."}), 400
+    if suspend is None:
+        return jsonify({'message': '정지 여부(suspend)를 지정해야 합니다.'}), 400
+    if suspend and (not isinstance(duration_hours, (int, float)) or duration_hours <= 0):
+        return jsonify({'message': '유효한 정지 기간(시간)을 입력해야 합니다.'}), 400
+
+    try:
+        results = admin_bulk.suspend_posts(post_ids, bool(suspend), duration_hours)
+        message = f"게시글 일괄 정지({duration_hours}시간)가 완료되었습니다." if suspend else "게시글 일괄 정지 해제가 완료되었습니다."
+        return jsonify({'message': message, 'results': results, 'counts': admin_bulk.summarize(results)}), 200
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error bulk toggling suspension for posts {post_ids}: {e}", exc_info=True)
+        return jsonify({'message': '게시글 일괄 정지/해제 처리에 실패했습니다.'}), 500
+
+# 게시글 일괄 삭제
+# body: {"post_ids": [1, 2, ...]}
+@admin_bp.route('/posts/bulk_delete', methods=['POST'])
+@token_required
+@roles_required(['관리자', '운영자'])
+def bulk_delete_posts_admin():
+    data = request.get_json() or {}
+    try:
+        post_ids = admin_bulk.normalize_ids(data.get('post_ids'))
+    except ValueError:
+        return jsonify({'message': f"post_ids 는 1~{admin_bulk.MAX_IDS}개의 게시글 ID 리스트여야 합니다."}), 400
+
+    try:
+        results = admin_bulk.delete_posts(post_ids)
+        return jsonify({'message': '게시글 일괄 삭제가 완료되었습니다.',
+                        'results': results, 'counts': admin_bulk.summarize(results)}), 200
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error bulk deleting posts {post_ids}: {e}", exc_info=True)
+        return jsonify({'message': '게시글 일괄 삭제에 실패했습니다.'}), 500
+
+
 # CMS (콘텐츠 관리 시스템) APIs
 @admin_bp.route('/cms/<string:content_type>', methods=['GET'])
 @token_required
@@ -767,6 +877,8 @@ def add_cms_content(content_type):
         if content_type == 'psych_test_questions':
             new_item['options'] = data.get('options', [])
         result = db_mongo.cms_content.insert_one(new_item)
+        if content_type in psych_catalog.CMS_CONTENT_TYPES:
+            psych_catalog.bump_version()
         return jsonify({'id': str(result.inserted_id)}), 201
     except Exception as e:
         current_app.logger.error(f"Error adding CMS content for {content_type}: {e}", exc_info=True)
@@ -786,6 +898,8 @@ def update_cms_content(content_type, item_id):
             update_data['options'] = data['options']
         result = db_mongo.cms_content.update_one({'_id': ObjectId(item_id)}, {'$set': update_data})
         if result.matched_count == 0: return jsonify({'message': '콘텐츠를 찾을 수 없습니다.'}), 404
+        if content_type in psych_catalog.CMS_CONTENT_TYPES:
+            psych_catalog.bump_version()
         return jsonify({'message': '콘텐츠가 성공적으로 업데이트되었습니다.'}), 200
     except Exception as e:
         current_app.logger.error(f"Error updating CMS item {item_id}: {e}", exc_info=True)
@@ -800,6 +914,8 @@ def delete_cms_content(content_type, item_id):
         db_mongo = get_mongo_db()
         result = db_mongo.cms_content.delete_one({'_id': ObjectId(item_id)})
         if result.deleted_count == 0: return jsonify({'message': '콘텐츠를 찾을 수 없습니다.'}), 404
+        if content_type in psych_catalog.CMS_CONTENT_TYPES:
+            psych_catalog.bump_version()
         return jsonify({'message': '콘텐츠가 성공적으로 삭제되었습니다.'}), 200
     except Exception as e:
         current_app.logger.error(f"Error deleting CMS item {item_id}: {e}", exc_info=True)
@@ -811,13 +927,14 @@ def delete_cms_content(content_type, item_id):
 @token_required
 @roles_required(['관리자', '연구자'])
 def get_analytics_mood_distribution():
+    # 원본 mood_entries 대신 일별 집계(analytics_rollups)를 합산합니다. (O(일 수))
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
     try:
-        db_mongo = get_mongo_db()
-        mood_entries = db_mongo.mood_entries.find({})
-        mood_counts = Counter(entry['mood'] for entry in mood_entries)
+        mood_counts = sum_counts(METRIC_MOOD_ENTRIES, start_date, end_date)
         return jsonify({
-            'labels': list(mood_counts.keys()),
-            'datasets': [{'data': list(mood_counts.values())}]
+            'labels': [mood for mood, _ in mood_counts],
+            'datasets': [{'data': [count for _, count in mood_counts]}]
         }), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching mood distribution data: {e}", exc_info=True)
@@ -828,16 +945,13 @@ def get_analytics_mood_distribution():
 @token_required
 @roles_required(['관리자', '연구자'])
 def get_analytics_diary_entry_counts():
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
     try:
-        db_mongo = get_mongo_db()
-        pipeline = [
-            {'$group': {'_id': {'$dateToString': {'format': '%Y-%m', 'date': '$created_at'}}, 'count': {'$sum': 1}}},
-            {'$sort': {'_id': 1}}
-        ]
-        results = list(db_mongo.diary_entries.aggregate(pipeline))
+        results = monthly_totals(METRIC_DIARY_ENTRIES, start_date, end_date)
         return jsonify({
-            'labels': [res['_id'] for res in results],
-            'datasets': [{'data': [res['count'] for res in results]}]
+            'labels': [month for month, _ in results],
+            'datasets': [{'data': [count for _, count in results]}]
         }), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching diary entry counts data: {e}", exc_info=True)
@@ -847,10 +961,19 @@ def get_analytics_diary_entry_counts():
 @token_required
 @roles_required(['관리자', '연구자'])
 def get_analytics_top_keywords():
+    # `flask build-keyword-rollups` 가 만든 월별 키워드 집계(keyword_rollups)를 합산합니다.
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    sources = [source for source in request.args.get('source', '').split(',') if source]
+    if any(source not in KEYWORD_SOURCES for source in sources):
+        return jsonify({'message': f"source 는 {', '.join(KEYWORD_SOURCES)} 중에서 선택해주세요."}), 400
     try:
-        db_mongo = get_mongo_db()
-        all_keywords = ["스트레스", "불안", "행복", "우울", "친구", "가족", "직장"] # 임시 데이터
-        top_10 = Counter(all_keywords).most_common(10)
+        top_10 = get_corpus_top_keywords(
+            start_period=start_date[:7] if start_date else None,
+            end_period=end_date[:7] if end_date else None,
+            sources=sources or None,
+            limit=10
+        )
         return jsonify({
             'labels': [item[0] for item in top_10],
             'datasets': [{'data': [item[1] for item in top_10]}]
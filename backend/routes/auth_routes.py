@@ -2,6 +2,7 @@ import os
 from flask import Blueprint, request, jsonify, g, current_app
 from backend.extensions import db, mongo
 from backend.maria_models import User, Role, UserRole, NicknameHistory
+from backend import counters, user_profiles
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 import jwt
@@ -128,6 +129,7 @@ def register():
 
         db.session.add(new_user)
         db.session.commit()
+        counters.increment(counters.COUNTER_USERS)
         current_app.logger.info(f"User '{username}' (ID: {new_user.id}) successfully registered and committed to DB.")
         return jsonify({'message': '회원가입이 성공적으로 완료되었습니다!'}), 201
     except Exception as e:
@@ -261,6 +263,7 @@ def update_profile():
 
     try:
         db.session.commit()
+        user_profiles.invalidate(user_id)
         return jsonify({'message': '프로필이 성공적으로 업데이트되었습니다.', 'user': user.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
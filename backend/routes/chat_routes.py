@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify, g, current_app
 from openai import OpenAI
 from backend.routes.auth_routes import token_required, roles_required
 from backend.mongo_models import ChatHistory, ChatSession, ChatbotFeedback
+from backend import user_stats
 from datetime import datetime
 
 chat_bp = Blueprint('chat', __name__)
@@ -51,9 +52,11 @@ def chat_with_openai():
     if not chat_session_id:
         chat_session_id = ChatHistory._generate_session_id(user_id) 
         ChatSession.create_session(user_id, chat_session_id, "default")
+        user_stats.increment(user_id, chat_session_count=1)
         current_app.logger.info(f"New chat session created: {chat_session_id}")
 
     ChatHistory.add_message(user_id, "user", user_message, chat_session_id)
+    user_stats.increment(user_id, chat_message_count=1)
 
     system_prompt = (
         "You are an AI psychological counselor providing psychological stability and insight to the user. "
@@ -155,6 +158,7 @@ def delete_chat_session(session_id):
     success = ChatSession.hide_session_for_user(user_id, session_id)
     
     if success:
+        user_stats.increment(user_id, chat_session_count=-1)
         return jsonify({'message': f'Session {session_id} has been hidden.'}), 200
     else:
         return jsonify({'error': 'Session not found or could not be hidden.'}), 404
@@ -3,6 +3,7 @@ from flask import Blueprint, request, jsonify, g, current_app
 from backend.extensions import db, mongo
 from backend.maria_models import Post, Comment, User, PostLike # PostLike 임포트 확인
 from backend.routes.auth_routes import token_required
+from backend import user_stats, counters, user_profiles
 from bson.objectid import ObjectId
 from werkzeug.utils import secure_filename
 import datetime
@@ -20,6 +21,14 @@ def _get_mongo_db():
     db_name = current_app.config.get("MONGO_DBNAME", "mindbridge_db")
     return mongo.cx[db_name]
 
+def _like_count_subquery():
+    """게시글별 좋아요 수 (ix_post_likes_post_id 사용)"""
+    return db.select(func.count()).where(PostLike.post_id == Post.id).correlate(Post).scalar_subquery()
+
+def _comment_count_subquery():
+    """게시글별 댓글 수 (ix_comments_post_id_created_at 사용)"""
+    return db.select(func.count()).where(Comment.post_id == Post.id).correlate(Post).scalar_subquery()
+
 # --- 게시글 관련 API ---
 
 # 게시글 목록 조회
@@ -31,13 +40,13 @@ def get_posts():
         search_query = request.args.get('search_query', '', type=str)
         category_filter = request.args.get('category_filter', '', type=str)
 
+        # 좋아요/댓글 수는 상관 서브쿼리로 계산합니다. (JOIN + GROUP BY 를 쓰면
+        # ix_posts_is_notice_created_at 인덱스로 정렬할 수 없어 filesort 가 발생합니다.)
         query = db.session.query(
-            Post, 
-            func.count(db.distinct(PostLike.user_id)).label('like_count'), 
-            func.count(db.distinct(Comment.id)).label('comment_count') 
-        ).outerjoin(PostLike, Post.id == PostLike.post_id)\
-         .outerjoin(Comment, Post.id == Comment.post_id)\
-         .group_by(Post.id) 
+            Post,
+            _like_count_subquery().label('like_count'),
+            _comment_count_subquery().label('comment_count')
+        )
 
         if search_query:
             query = query.filter(Post.title.like(f'%{search_query}%'))
@@ -50,10 +59,13 @@ def get_posts():
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         posts_paginated = pagination.items
 
+        # 작성자 정보는 페이지 단위로 한 번에 가져옵니다. (게시글마다 author 를 지연 로딩하지 않음)
+        profiles = user_profiles.resolve(post.user_id for post, _, _ in posts_paginated if not post.is_anonymous)
         posts_data = []
         for post, like_count, comment_count in posts_paginated:
-            author_nickname = post.author.nickname if post.author and not post.is_anonymous else '익명'
-            author_uid = post.author.user_uid if post.author and not post.is_anonymous else ''
+            author = None if post.is_anonymous else profiles.get(post.user_id)
+            author_nickname = author['nickname'] if author else '익명'
+            author_uid = author['user_uid'] if author else ''
 
             posts_data.append({
                 'id': post.id,
@@ -88,15 +100,12 @@ def get_posts():
 @community_bp.route('/posts/<int:post_id>', methods=['GET'])
 def get_post_detail(post_id):
     try:
+        # 목록(get_posts)과 같은 상관 서브쿼리로 좋아요/댓글 수를 셉니다. (JOIN 팬아웃 없이 인덱스로 계산)
         post = db.session.query(
             Post,
-            func.count(db.distinct(PostLike.user_id)).label('like_count'),
-            func.count(db.distinct(Comment.id)).label('comment_count')
-        ).outerjoin(PostLike, Post.id == PostLike.post_id)\
-         .outerjoin(Comment, Post.id == Comment.post_id)\
-         .filter(Post.id == post_id)\
-         .group_by(Post.id)\
-         .first()
+            _like_count_subquery().label('like_count'),
+            _comment_count_subquery().label('comment_count')
+        ).filter(Post.id == post_id).first()
         
         if not post:
             return jsonify({'message': '게시글을 찾을 수 없습니다.'}), 404
@@ -109,9 +118,13 @@ def get_post_detail(post_id):
         mongo_content = mongo_db.post_contents.find_one({'_id': ObjectId(post_obj.mongo_content_id)})
         content_text = mongo_content['content'] if mongo_content else '내용 없음'
 
-        author_nickname = post_obj.author.nickname if post_obj.author and not post_obj.is_anonymous else '익명'
-        author_username = post_obj.author.username if post_obj.author and not post_obj.is_anonymous else ''
-        author_uid = post_obj.author.user_uid if post_obj.author and not post_obj.is_anonymous else ''
+        comment_objects = Comment.query.filter_by(post_id=post_id).order_by(Comment.created_at.asc()).all()
+        # 게시글/댓글 작성자 정보를 한 번에 가져옵니다.
+        profiles = user_profiles.resolve([post_obj.user_id] + [comment_obj.user_id for comment_obj in comment_objects])
+        author = None if post_obj.is_anonymous else profiles.get(post_obj.user_id)
+        author_nickname = author['nickname'] if author else '익명'
+        author_username = author['username'] if author else ''
+        author_uid = author['user_uid'] if author else ''
 
         user_liked = False
         if hasattr(g, 'user_id') and g.user_id:
@@ -119,9 +132,9 @@ def get_post_detail(post_id):
             user_liked = user_like is not None
 
         comments = []
-        comment_objects = Comment.query.filter_by(post_id=post_id).order_by(Comment.created_at.asc()).all()
         for comment_obj in comment_objects:
-            comment_author_nickname = comment_obj.author.nickname if comment_obj.author else '탈퇴한 사용자'
+            comment_author = profiles.get(comment_obj.user_id)
+            comment_author_nickname = comment_author['nickname'] if comment_author else '탈퇴한 사용자'
             comments.append({
                 'id': comment_obj.id,
                 'content': comment_obj.content,
@@ -193,6 +206,8 @@ def create_post():
         )
         db.session.add(new_post)
         db.session.commit()
+        user_stats.increment(g.user_id, post_count=1)
+        counters.increment(counters.COUNTER_POSTS)
         return jsonify({'message': '게시글이 성공적으로 작성되었습니다.', 'post_id': new_post.id}), 201
     except Exception as e:
         db.session.rollback()
@@ -253,8 +268,11 @@ def delete_post(post_id):
             mongo_db = _get_mongo_db()
             mongo_db.post_contents.delete_one({'_id': ObjectId(post.mongo_content_id)})
 
+        stats_deltas = user_stats.post_deletion_deltas(post)
         db.session.delete(post)
         db.session.commit()
+        user_stats.apply_deltas(stats_deltas)
+        counters.increment(counters.COUNTER_POSTS, -1)
         return jsonify({'message': '게시글이 성공적으로 삭제되었습니다.'}), 200
     except Exception as e:
         db.session.rollback()
@@ -331,6 +349,7 @@ def create_comment(post_id):
         )
         db.session.add(new_comment)
         db.session.commit()
+        user_stats.increment(user_id, comment_count=1)
         return jsonify({'message': '댓글이 성공적으로 작성되었습니다.', 'comment_id': new_comment.id}), 201
     except Exception as e:
         db.session.rollback()
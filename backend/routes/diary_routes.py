@@ -3,6 +3,9 @@ from backend.extensions import db, mongo
 from backend.maria_models import User
 from backend.mongo_models import DiaryEntry, MoodEntry
 from backend.routes.auth_routes import token_required
+from backend.analytics_rollups import increment as increment_rollup, mood_key, METRIC_MOOD_ENTRIES
+from backend.keywords import diary_keywords
+from backend import calendar_summaries, diary_search, diary_derived, diary_sync, mood_trends, user_stats
 from bson.objectid import ObjectId
 import datetime
 
@@ -33,11 +36,13 @@ def create_diary_entry():
     except ValueError:
         return jsonify({'message': '날짜 형식이 올바르지 않습니다. YYYY-MM-DD 형식으로 입력해주세요.'}), 400
 
-    new_entry = DiaryEntry(user_id=user_id, title=title, content=content, date=date, mood_emoji_key=mood_emoji_key)
+    new_entry = DiaryEntry(user_id=user_id, title=title, content=content, date=date, mood_emoji_key=mood_emoji_key,
+                           keywords=diary_keywords(title, content))
 
     try:
         db_mongo = get_mongo_db()
         db_mongo.diary_entries.insert_one(new_entry.to_dict())
+        diary_derived.on_diary_created(new_entry.to_dict())
         return jsonify({'message': '일기 작성이 성공적으로 완료되었습니다!', 'diary_entry': {'_id': str(new_entry._id)}}), 201
     except Exception as e:
         current_app.logger.error(f"일기 저장 중 MongoDB 오류: {e}", exc_info=True)
@@ -48,33 +53,50 @@ def create_diary_entry():
 def get_diary_entries():
     user_id = g.user_id
     date = request.args.get('date')
+    fields_param = request.args.get('fields')
+    fields = [field.strip() for field in fields_param.split(',') if field.strip()] if fields_param else None
 
-    query = {'user_id': user_id}
-    if date:
-        query['date'] = date
-        
     try:
-        db_mongo = get_mongo_db()
-        entries_cursor = db_mongo.diary_entries.find(query).sort('created_at', -1)
-        entries_data = []
-        for entry in entries_cursor:
-            entry['_id'] = str(entry['_id'])
-            if 'created_at' in entry and isinstance(entry['created_at'], datetime.datetime):
-                entry['created_at'] = entry['created_at'].isoformat()
-            if 'updated_at' in entry and isinstance(entry['updated_at'], datetime.datetime):
-                entry['updated_at'] = entry['updated_at'].isoformat()
-            entries_data.append(entry)
-        
-        if date and entries_data:
-            return jsonify({'diary_entry': entries_data[0]}), 200
-        elif date and not entries_data:
-            return jsonify({'message': '해당 날짜의 일기를 찾을 수 없습니다.'}), 404
-        else:
-            return jsonify(entries_data), 200
+        projection = DiaryEntry.projection(fields)
+    except ValueError:
+        return jsonify({'message': f"fields 는 {', '.join(DiaryEntry.SELECTABLE_FIELDS)} 중에서 선택해주세요."}), 400
+
+    try:
+        limit = min(int(request.args.get('limit', DiaryEntry.DEFAULT_PAGE_SIZE)), DiaryEntry.MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({'message': 'limit 은 1 이상의 숫자여야 합니다.'}), 400
+
+    try:
+        if date:
+            db_mongo = get_mongo_db()
+            entry = db_mongo.diary_entries.find_one({'user_id': user_id, 'date': date}, projection,
+                                                    sort=[('created_at', -1)])
+            if not entry:
+                return jsonify({'message': '해당 날짜의 일기를 찾을 수 없습니다.'}), 404
+            return jsonify({'diary_entry': _serialize_entry(entry)}), 200
+
+        # 날짜 지정이 없으면 (date, _id) 기준 최신순으로 한 페이지씩 반환합니다.
+        try:
+            entries, next_cursor = DiaryEntry.find_page(user_id, request.args.get('cursor'), limit, fields)
+        except ValueError:
+            return jsonify({'message': '잘못된 커서입니다.'}), 400
+        return jsonify({
+            'entries': [_serialize_entry(entry) for entry in entries],
+            'next_cursor': next_cursor
+        }), 200
     except Exception as e:
         current_app.logger.error(f"일기 조회 중 MongoDB 오류: {e}", exc_info=True)
         return jsonify({'message': '일기 조회 중 오류가 발생했습니다.'}), 500
 
+def _serialize_entry(entry):
+    entry['_id'] = str(entry['_id'])
+    for field in ('created_at', 'updated_at', 'server_updated_at'):
+        if isinstance(entry.get(field), datetime.datetime):
+            entry[field] = entry[field].isoformat()
+    return entry
+
 @diary_bp.route('/entries/month_summary', methods=['GET'])
 @token_required
 def get_month_summary():
@@ -91,30 +113,61 @@ def get_month_summary():
     except ValueError:
         return jsonify({'message': '년도와 월은 유효한 숫자여야 합니다.'}), 400
 
-    start_date = datetime.datetime(year, month, 1)
-    end_date = datetime.datetime(year, month + 1, 1) if month < 12 else datetime.datetime(year + 1, 1, 1)
+    if not 1 <= month <= 12:
+        return jsonify({'message': '월은 1에서 12 사이여야 합니다.'}), 400
 
-    query = {
-        'user_id': user_id,
-        'date': {
-            '$gte': start_date.strftime('%Y-%m-%d'),
-            '$lt': end_date.strftime('%Y-%m-%d')
-        }
-    }
-
-    monthly_summary = {}
     try:
-        db_mongo = get_mongo_db()
-        entries_cursor = db_mongo.diary_entries.find(query, {'date': 1, 'mood_emoji_key': 1})
-        for entry in entries_cursor:
-            date_key = entry['date']
-            monthly_summary[date_key] = {'has_entry': True, 'mood_emoji_key': entry.get('mood_emoji_key')}
-        
-        return jsonify({'summary': monthly_summary}), 200
+        # 쓰기 시점에 갱신되는 (사용자, 월) 요약 문서 하나만 읽습니다.
+        return jsonify({'summary': calendar_summaries.get_month(user_id, year, month)}), 200
     except Exception as e:
         current_app.logger.error(f"월별 요약 조회 중 MongoDB 오류: {e}", exc_info=True)
         return jsonify({'message': '월별 요약 정보를 불러오는 데 실패했습니다.'}), 500
 
+@diary_bp.route('/entries/year_summary', methods=['GET'])
+@token_required
+def get_year_summary():
+    user_id = g.user_id
+    try:
+        year = int(request.args.get('year', ''))
+    except ValueError:
+        return jsonify({'message': '년도는 유효한 숫자여야 합니다.'}), 400
+
+    try:
+        return jsonify({'year': year, 'months': calendar_summaries.get_year(user_id, year)}), 200
+    except Exception as e:
+        current_app.logger.error(f"연간 요약 조회 중 MongoDB 오류: {e}", exc_info=True)
+        return jsonify({'message': '연간 요약 정보를 불러오는 데 실패했습니다.'}), 500
+
+@diary_bp.route('/entries/search', methods=['GET'])
+@token_required
+def search_diary_entries():
+    user_id = g.user_id
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'message': '검색어를 입력해주세요.'}), 400
+    try:
+        page = int(request.args.get('page', 1))
+        per_page = min(int(request.args.get('per_page', 10)), 50)
+        if page < 1 or per_page < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({'message': 'page 와 per_page 는 1 이상의 숫자여야 합니다.'}), 400
+
+    try:
+        results, total = diary_search.search(user_id, query, page, per_page)
+        return jsonify({
+            'results': results,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'has_next': page * per_page < total
+        }), 200
+    except ValueError:
+        return jsonify({'message': '두 글자 이상인 검색어를 입력해주세요.'}), 400
+    except Exception as e:
+        current_app.logger.error(f"일기 검색 중 MongoDB 오류: {e}", exc_info=True)
+        return jsonify({'message': '일기 검색 중 오류가 발생했습니다.'}), 500
+
 @diary_bp.route('/entries/<string:entry_id>', methods=['GET'])
 @token_required
 def get_diary_entry_detail(entry_id):
@@ -146,7 +199,8 @@ def update_diary_entry(entry_id):
     date = data.get('date')
     mood_emoji_key = data.get('mood_emoji_key')
 
-    update_fields = {'updated_at': datetime.datetime.utcnow()}
+    now = datetime.datetime.utcnow()
+    update_fields = {'updated_at': now, 'server_updated_at': now}
     if title: update_fields['title'] = title
     if content: update_fields['content'] = content
     if date:
@@ -159,12 +213,18 @@ def update_diary_entry(entry_id):
     
     try:
         db_mongo = get_mongo_db()
-        result = db_mongo.diary_entries.update_one(
-            {'_id': ObjectId(entry_id), 'user_id': user_id},
-            {'$set': update_fields}
-        )
+        query = {'_id': ObjectId(entry_id), 'user_id': user_id}
+        previous = db_mongo.diary_entries.find_one(query, diary_derived.BEFORE_UPDATE_PROJECTION)
+        if not previous:
+            return jsonify({'message': '일기를 찾을 수 없거나 수정 권한이 없습니다.'}), 404
+        if title or content:
+            # 제목/본문이 바뀐 경우에만 키워드를 다시 추출합니다.
+            update_fields['keywords'] = diary_keywords(title or previous.get('title'), content or previous.get('content'))
+
+        result = db_mongo.diary_entries.update_one(query, {'$set': update_fields})
         if result.matched_count == 0:
             return jsonify({'message': '일기를 찾을 수 없거나 수정 권한이 없습니다.'}), 404
+        diary_derived.on_diary_updated(previous, {**previous, **update_fields})
         return jsonify({'message': '일기가 성공적으로 수정되었습니다!'}), 200
     except Exception as e:
         current_app.logger.error(f"일기 수정 중 MongoDB 오류: {e}", exc_info=True)
@@ -176,9 +236,13 @@ def delete_diary_entry(entry_id):
     user_id = g.user_id
     try:
         db_mongo = get_mongo_db()
-        result = db_mongo.diary_entries.delete_one({'_id': ObjectId(entry_id), 'user_id': user_id})
-        if result.deleted_count == 0:
+        deleted_entry = db_mongo.diary_entries.find_one_and_delete(
+            {'_id': ObjectId(entry_id), 'user_id': user_id},
+            projection=diary_derived.DELETED_PROJECTION
+        )
+        if not deleted_entry:
             return jsonify({'message': '일기를 찾을 수 없거나 삭제 권한이 없습니다.'}), 404
+        diary_derived.on_diary_deleted(deleted_entry)
         return jsonify({'message': '일기가 성공적으로 삭제되었습니다!'}), 200
     except Exception as e:
         current_app.logger.error(f"일기 삭제 중 MongoDB 오류: {e}", exc_info=True)
@@ -202,11 +266,14 @@ def create_mood_entry():
     except ValueError:
         return jsonify({'message': '날짜 형식이 올바르지 않습니다.'}), 400
 
-    new_mood_entry = MoodEntry(user_id=user_id, date=date, mood_score=mood_score)
+    new_mood_entry = MoodEntry(user_id=user_id, date=date, mood_score=mood_score, source='diary_mood')
 
     try:
-        db_mongo = get_mongo_db()
-        db_mongo.mood_entries.insert_one(new_mood_entry.to_dict())
+        MoodEntry.add(new_mood_entry)
+        increment_rollup(METRIC_MOOD_ENTRIES, date, key=mood_key({'mood_score': mood_score}))
+        calendar_summaries.record_mood(user_id, date, mood_score=mood_score)
+        user_stats.record_moods(user_id, [new_mood_entry.to_dict()])
+        mood_trends.invalidate(user_id)
         return jsonify({'message': '기분 기록이 성공적으로 완료되었습니다!'}), 201
     except Exception as e:
         current_app.logger.error(f"기분 기록 저장 중 MongoDB 오류: {e}", exc_info=True)
@@ -219,21 +286,67 @@ def get_mood_entries():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
 
-    query = {'user_id': user_id}
+    start, end = None, None
     if start_date and end_date:
-        query['date'] = {'$gte': start_date, '$lte': end_date}
-        
+        try:
+            start = datetime.datetime.strptime(start_date, '%Y-%m-%d')
+            end = datetime.datetime.strptime(end_date, '%Y-%m-%d') + datetime.timedelta(days=1)
+        except ValueError:
+            return jsonify({'message': '날짜 형식이 올바르지 않습니다.'}), 400
+
     try:
-        db_mongo = get_mongo_db()
-        mood_entries_cursor = db_mongo.mood_entries.find(query).sort('date', 1)
+        # (user_id, timestamp) 범위 조회 한 번으로 기간 내 기록을 시간순으로 가져옵니다.
         mood_entries_data = []
-        for entry in mood_entries_cursor:
+        for entry in MoodEntry.get_range(user_id, start, end):
             entry['_id'] = str(entry['_id'])
-            if 'timestamp' in entry and isinstance(entry['timestamp'], datetime.datetime):
-                entry['timestamp'] = entry['timestamp'].isoformat()
+            entry.pop('legacy_id', None)
+            for field in ('timestamp', 'recorded_at'):
+                if isinstance(entry.get(field), datetime.datetime):
+                    entry[field] = entry[field].isoformat()
             mood_entries_data.append(entry)
         
         return jsonify(mood_entries_data), 200
     except Exception as e:
         current_app.logger.error(f"기분 기록 조회 중 MongoDB 오류: {e}", exc_info=True)
-        return jsonify({'message': '기분 기록 조회 중 오류가 발생했습니다.'}), 500
\ No newline at end of file
+        return jsonify({'message': '기분 기록 조회 중 오류가 발생했습니다.'}), 500
+
+@diary_bp.route('/sync', methods=['POST'])
+@token_required
+def sync_entries():
+    """일기/감정 기록의 생성·수정·삭제를 한 번에 반영하고, since 커서 이후의 서버 변경 사항을 돌려줍니다."""
+    data = request.get_json() or {}
+    user_id = g.user_id
+    diaries = data.get('diaries') or []
+    moods = data.get('moods') or []
+
+    if not isinstance(diaries, list) or not isinstance(moods, list):
+        return jsonify({'message': 'diaries 와 moods 는 배열이어야 합니다.'}), 400
+    if len(diaries) + len(moods) > diary_sync.MAX_SYNC_OPERATIONS:
+        return jsonify({'message': f'한 번에 최대 {diary_sync.MAX_SYNC_OPERATIONS}개까지 동기화할 수 있습니다.'}), 400
+    if not all(isinstance(op, dict) for op in diaries + moods):
+        return jsonify({'message': '동기화 항목 형식이 올바르지 않습니다.'}), 400
+
+    try:
+        since, until, positions = diary_sync.decode_cursor(data['since']) if data.get('since') else (None, None, {})
+    except ValueError:
+        return jsonify({'message': '잘못된 커서입니다.'}), 400
+
+    # 밀리초 단위로 맞춘 서버 시각. 이번 요청의 쓰기는 모두 이 시각으로 기록됩니다.
+    now = datetime.datetime.utcnow()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    # 다른 요청이 시각을 정한 뒤 아직 커밋하지 않은 쓰기를 놓치지 않도록 최근 구간은 다음 동기화로 미룹니다.
+    # 이어받기 커서라면 처음 정한 구간을 그대로 이어서 내려줍니다.
+    if until is None:
+        until = now - diary_sync.SETTLE_WINDOW
+        if since is not None and since >= until:
+            until = since
+    try:
+        changes, cursor, has_more = diary_sync.pull_changes(user_id, since, until, positions)
+        results = {
+            'diaries': diary_sync.apply_diary_operations(user_id, diaries, now),
+            'moods': diary_sync.apply_mood_operations(user_id, moods, now),
+        }
+        return jsonify({'results': results, 'changes': changes, 'cursor': cursor, 'has_more': has_more}), 200
+    except Exception as e:
+        current_app.logger.error(f"일괄 동기화 중 MongoDB 오류: {e}", exc_info=True)
+        return jsonify({'message': '동기화 중 오류가 발생했습니다.'}), 500
@@ -1,9 +1,10 @@
 from flask import Blueprint, jsonify, request, current_app, g
-from backend.extensions import mongo
 from backend.routes.auth_routes import token_required
-from collections import Counter
 # FIX: Correct the import path for mongo_models
 from backend.mongo_models import DiaryEntry, MoodEntry 
+from backend.mongo_aggregations import get_mood_distribution as aggregate_mood_distribution
+from backend.keywords import get_top_keywords
+from backend import mood_trends
 
 graph_bp = Blueprint('graph_api', __name__)
 
@@ -13,17 +14,15 @@ graph_bp = Blueprint('graph_api', __name__)
 def get_mood_distribution():
     user_id = g.user_id
     try:
-        mood_entries = mongo.db.mood_entries.find({'user_id': user_id})
-        
-        moods = [entry['mood'] for entry in mood_entries]
-        mood_counts = Counter(moods)
+        # 감정별 집계는 MongoDB 내부에서 수행합니다.
+        mood_counts = aggregate_mood_distribution(user_id)
         
         # Chart.js가 요구하는 형식으로 데이터 구성
         data = {
-            'labels': list(mood_counts.keys()),
+            'labels': [mood for mood, _ in mood_counts],
             'datasets': [{
                 'label': '감정 분포',
-                'data': list(mood_counts.values()),
+                'data': [count for _, count in mood_counts],
                 'backgroundColor': [
                     'rgba(255, 99, 132, 0.7)',
                     'rgba(54, 162, 235, 0.7)',
@@ -56,16 +55,8 @@ def get_mood_distribution():
 def get_keyword_frequency():
     user_id = g.user_id
     try:
-        diary_entries = mongo.db.diary_entries.find({'user_id': user_id})
-        
-        all_keywords = []
-        for entry in diary_entries:
-            all_keywords.extend(entry.get('keywords', []))
-            
-        keyword_counts = Counter(all_keywords)
-        
-        # 가장 빈번한 10개 키워드만 선택
-        top_10_keywords = keyword_counts.most_common(10)
+        # 가장 빈번한 10개 키워드만 선택 (일기 작성 시 갱신되는 사용자별 카운터 문서 하나만 읽음)
+        top_10_keywords = get_top_keywords(user_id, limit=10)
         
         if not top_10_keywords:
              return jsonify({'labels': [], 'datasets': [{'label': '키워드 빈도', 'data': []}]})
@@ -85,4 +76,19 @@ def get_keyword_frequency():
         return jsonify(data)
     except Exception as e:
         current_app.logger.error(f"키워드 데이터 조회 중 오류 발생: {e}", exc_info=True)
-        return jsonify({'message': '데이터를 불러오는 데 실패했습니다.'}), 500
\ No newline at end of file
+        return jsonify({'message': '데이터를 불러오는 데 실패했습니다.'}), 500
+
+# 감정 추세 분석 API ('나의 변화' 페이지)
+# 이동 평균/변동성, 요일별 평균, 연속 기록, 변화 시점을 한 번에 반환합니다.
+@graph_bp.route('/mood_trends', methods=['GET'])
+@token_required
+def get_mood_trends():
+    user_id = g.user_id
+    window = request.args.get('window', mood_trends.DEFAULT_WINDOW, type=int)
+    if window not in mood_trends.ALLOWED_WINDOWS:
+        return jsonify({'message': f"window 는 {', '.join(map(str, mood_trends.ALLOWED_WINDOWS))} 중 하나여야 합니다."}), 400
+    try:
+        return jsonify(mood_trends.get_trends(user_id, window))
+    except Exception as e:
+        current_app.logger.error(f"감정 추세 분석 중 오류 발생: {e}", exc_info=True)
+        return jsonify({'message': '데이터를 불러오는 데 실패했습니다.'}), 500
@@ -0,0 +1,33 @@
+from flask import Blueprint, request, jsonify, g, current_app
+from backend.routes.auth_routes import token_required
+from backend import timeline
+
+me_bp = Blueprint('me_api', __name__)
+
+# 내 활동 타임라인 API (일기 / 감정 기록 / 챗봇 상담 / 심리검사 / 문의를 최신순으로 합친 목록)
+# ?limit=20&cursor=<next_cursor>&types=diary,mood
+@me_bp.route('/timeline', methods=['GET'])
+@token_required
+def get_timeline():
+    user_id = g.user_id
+    types_param = request.args.get('types')
+    sources = [source.strip() for source in types_param.split(',') if source.strip()] if types_param else None
+    if sources and any(source not in timeline.SOURCES for source in sources):
+        return jsonify({'message': f"types 는 {', '.join(timeline.SOURCES)} 중에서 선택해주세요."}), 400
+
+    try:
+        limit = min(int(request.args.get('limit', timeline.DEFAULT_PAGE_SIZE)), timeline.MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({'message': 'limit 은 1 이상의 숫자여야 합니다.'}), 400
+
+    try:
+        try:
+            items, next_cursor = timeline.get_page(user_id, request.args.get('cursor'), limit, sources)
+        except ValueError:
+            return jsonify({'message': '잘못된 커서입니다.'}), 400
+        return jsonify({'items': items, 'next_cursor': next_cursor}), 200
+    except Exception as e:
+        current_app.logger.error(f"타임라인 조회 중 오류 발생: {e}", exc_info=True)
+        return jsonify({'message': '타임라인을 불러오는 데 실패했습니다.'}), 500
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, g, current_app
-from backend.extensions import mongo
 from backend.routes.auth_routes import token_required
+from backend.analytics_rollups import increment as increment_rollup, METRIC_MOOD_ENTRIES
+from backend import calendar_summaries, mood_trends, user_stats
 import datetime
 # FIX: Correct the import path for mongo_models
 from backend.mongo_models import MoodEntry
@@ -19,12 +20,11 @@ def record_mood():
         return jsonify({'message': '감정을 선택해주세요.'}), 400
 
     try:
-        new_mood_entry = {
-            'user_id': user_id,
-            'mood': mood,
-            'recorded_at': datetime.datetime.utcnow()
-        }
-        mongo.db.mood_entries.insert_one(new_mood_entry)
+        new_mood_entry = MoodEntry.add(MoodEntry(user_id=user_id, mood=mood, source='mood_record'))
+        increment_rollup(METRIC_MOOD_ENTRIES, new_mood_entry.recorded_at, key=mood)
+        calendar_summaries.record_mood(user_id, new_mood_entry.date, mood=mood)
+        user_stats.record_moods(user_id, [new_mood_entry.to_dict()])
+        mood_trends.invalidate(user_id)
         return jsonify({'message': '오늘의 감정이 기록되었습니다.'}), 201
     except Exception as e:
         current_app.logger.error(f"감정 기록 중 오류 발생: {e}", exc_info=True)
@@ -44,17 +44,11 @@ def get_mood_history():
         start_date = datetime.datetime.strptime(date_str, '%Y-%m-%d')
         end_date = start_date + datetime.timedelta(days=1)
 
-        mood_entries = mongo.db.mood_entries.find({
-            'user_id': user_id,
-            'recorded_at': {
-                '$gte': start_date,
-                '$lt': end_date
-            }
-        }).sort('recorded_at', -1)
+        mood_entries = MoodEntry.get_range(user_id, start_date, end_date, descending=True)
 
         history = [{
-            'mood': entry['mood'], 
-            'recorded_at': entry['recorded_at'].isoformat()
+            'mood': entry.get('mood'),
+            'recorded_at': entry['timestamp'].isoformat()
         } for entry in mood_entries]
         
         return jsonify({'history': history})
@@ -0,0 +1,160 @@
+# backend/timeline.py
+# 사용자 활동 타임라인 (GET /api/me/timeline)
+# 일기 / 감정 기록 / 챗봇 세션 / 심리검사 결과 / 문의를 최신순으로 한 목록에 합쳐 보여줍니다.
+#
+# 소스마다 (user_id, 시각, _id) 인덱스 순서대로 읽는 커서를 하나씩 열고 heapq.merge 로 k-way 병합합니다.
+# 각 커서는 페이지 크기 + 1 개까지만 읽으므로 전체 컬렉션을 메모리에 올리지 않습니다.
+#
+# 정렬 키는 (시각, 소스 이름, _id) 내림차순이며, 다음 페이지 커서는 마지막 항목의 정렬 키를
+# base64 로 감싼 불투명 문자열입니다. 같은 시각의 항목도 소스 이름과 _id 로 순서가 정해지므로
+# 페이지 경계에서 누락/중복이 생기지 않습니다.
+# 병합 도구(read_collection / read_moods / merge_page)는 관리자 DB 기록 피드(admin_records)에서도 사용합니다.
+import json
+import base64
+import heapq
+import datetime
+from bson.objectid import ObjectId
+from backend.mongo_models import get_mongo_db, MoodEntry
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _diary_item(doc):
+    return {'title': doc.get('title'), 'date': doc.get('date'), 'mood_emoji_key': doc.get('mood_emoji_key')}
+
+
+def _mood_item(doc):
+    return {'date': doc.get('date'), 'mood': doc.get('mood'), 'mood_score': doc.get('mood_score')}
+
+
+def _chat_item(doc):
+    return {'chat_session_id': doc.get('chat_session_id'), 'chat_style': doc.get('chat_style'),
+            'summary': doc.get('summary')}
+
+
+def _psych_item(doc):
+    return {'test_id': str(doc['test_id']) if doc.get('test_id') else None, 'test_title': doc.get('test_title'),
+            'result_summary': doc.get('result_summary')}
+
+
+def _inquiry_item(doc):
+    return {'title': doc.get('title'), 'status': doc.get('status')}
+
+
+# 소스 이름 -> (컬렉션, 시각 필드, 추가 조건, projection, 응답 변환 함수)
+# 감정 기록은 저장 방식(timeseries/bucketed)이 달라 MoodEntry 집계로 따로 읽습니다.
+SOURCES = {
+    'diary': ('diary_entries', 'created_at', {}, {'title': 1, 'date': 1, 'mood_emoji_key': 1, 'created_at': 1}, _diary_item),
+    'mood': (None, 'timestamp', {}, None, _mood_item),
+    'chat': ('chat_sessions', 'created_at', {'is_hidden': {'$ne': True}},
+             {'chat_session_id': 1, 'chat_style': 1, 'summary': 1, 'created_at': 1}, _chat_item),
+    'psych_test': ('psych_test_results', 'created_at', {},
+                   {'test_id': 1, 'test_title': 1, 'result_summary': 1, 'created_at': 1}, _psych_item),
+    'inquiry': ('inquiries', 'created_at', {}, {'title': 1, 'status': 1, 'created_at': 1}, _inquiry_item),
+}
+
+
+def encode_cursor(key):
+    timestamp, source, doc_id = key
+    return base64.urlsafe_b64encode(json.dumps([timestamp.isoformat(), source, str(doc_id)]).encode()).decode()
+
+
+def decode_cursor(cursor, sources=SOURCES):
+    """커서를 (시각, 소스 이름, ObjectId) 로 되돌립니다. 형식이 잘못되면 ValueError."""
+    try:
+        timestamp, source, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if source not in sources:
+            raise ValueError(source)
+        return datetime.datetime.fromisoformat(timestamp), source, ObjectId(doc_id)
+    except Exception:
+        raise ValueError("invalid cursor")
+
+
+def _after(source, time_field, position):
+    """정렬 키 (시각, 소스, _id) 내림차순에서 position 다음에 오는 문서 조건."""
+    if position is None:
+        return {}
+    timestamp, cursor_source, doc_id = position
+    if source < cursor_source:
+        return {time_field: {'$lte': timestamp}}
+    if source > cursor_source:
+        return {time_field: {'$lt': timestamp}}
+    return {'$or': [{time_field: {'$lt': timestamp}}, {time_field: timestamp, '_id': {'$lt': doc_id}}]}
+
+
+def read_collection(db, source, collection_name, time_field, query, projection, position, limit):
+    """컬렉션 하나를 정렬 키 내림차순으로 최대 limit 개 읽는 이터레이터. 항목: (정렬 키, 문서)"""
+    sort = [(time_field, -1), ('_id', -1)]
+    condition = _after(source, time_field, position)
+    if condition:
+        query = {'$and': [query, condition]}
+    for doc in db[collection_name].find(query, projection).sort(sort).limit(limit):
+        yield (doc[time_field], source, doc['_id']), doc
+
+
+def read_moods(source, position, limit, user_id=None, start=None, end=None):
+    """감정 기록(저장 방식과 무관)을 정렬 키 내림차순으로 최대 limit 개 읽는 이터레이터."""
+    condition = _after(source, 'timestamp', position)
+    if position is not None:
+        # 커서 이후(더 최신)의 기록은 필요 없으므로 end 로 내려 보내 month / timestamp 선필터가 적용되게 합니다.
+        # (BSON 날짜는 밀리초 단위이므로 +1ms 미만 == 커서 시각 이하)
+        bound = position[0] + datetime.timedelta(milliseconds=1)
+        end = min(end, bound) if end is not None else bound
+    remaining = limit
+    # 버킷 방식은 최신 월부터 한 달씩 펼쳐 읽으므로 한 페이지에 필요한 월의 버킷만 풀어 봅니다.
+    for window_start, window_end in MoodEntry.time_windows(user_id, start, end):
+        stages = ([{'$match': condition}] if condition else []) + [
+            {'$sort': {'timestamp': -1, '_id': -1}},
+            {'$limit': remaining},
+        ]
+        for doc in MoodEntry.aggregate(stages, user_id, window_start, window_end):
+            yield (doc['timestamp'], source, doc['_id']), doc
+            remaining -= 1
+        if remaining <= 0:
+            return
+
+
+def _sort_key(item):
+    # heapq.merge 는 오름차순 기준이므로 reverse=True 와 함께 사용합니다.
+    timestamp, source, doc_id = item[0]
+    return timestamp, source, doc_id.binary
+
+
+def merge_page(streams, limit):
+    """소스별 이터레이터를 정렬 키 내림차순으로 병합해 limit 개와 다음 페이지 커서(없으면 None)를 반환합니다.
+
+    각 이터레이터는 limit + 1 개까지 읽어야 다음 페이지 여부를 알 수 있습니다.
+    """
+    items, next_cursor = [], None
+    for key, doc in heapq.merge(*streams, key=_sort_key, reverse=True):
+        if len(items) == limit:
+            next_cursor = encode_cursor(items[-1][0])
+            break
+        items.append((key, doc))
+    return items, next_cursor
+
+
+def get_page(user_id, cursor=None, limit=DEFAULT_PAGE_SIZE, sources=None):
+    """타임라인 한 페이지와 다음 페이지 커서(없으면 None)를 반환합니다.
+
+    cursor 가 잘못된 경우 ValueError 를 발생시킵니다.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    db = get_mongo_db()
+    streams = []
+    for source in (sources or SOURCES):
+        collection_name, time_field, extra, projection, _ = SOURCES[source]
+        if collection_name is None:
+            streams.append(read_moods(source, position, limit + 1, user_id))
+        else:
+            streams.append(read_collection(db, source, collection_name, time_field,
+                                           {'user_id': user_id, **extra}, projection, position, limit + 1))
+
+    items, next_cursor = merge_page(streams, limit)
+    return [{
+        'type': source,
+        'id': str(doc_id),
+        'timestamp': timestamp.isoformat(),
+        **SOURCES[source][4](doc),
+    } for (timestamp, source, doc_id), doc in items], next_cursor
@@ -0,0 +1,98 @@
+# backend/user_profiles.py
+# MongoDB 문서나 게시글/댓글 목록에 작성자 정보를 붙일 때 쓰는 사용자 프로필 조회기입니다.
+# 문서마다 db.session.get(User, ...) 를 호출하면 N+1 쿼리가 되므로
+# 필요한 사용자 ID 를 모아 resolve() 로 한 번에 가져옵니다.
+#
+#   profiles = user_profiles.resolve(entry.get('user_id') for entry in entries)
+#   profile = profiles.get(entry.get('user_id'))   # {'username', 'email', 'nickname', 'user_uid'} 또는 None
+#
+# - 캐시에 없는 ID 만 IN 쿼리 한 번으로 조회하고, 결과는 프로세스 내 LRU(MAX_ENTRIES 개)에 보관합니다.
+# - 프로필(닉네임 등)이 바뀌거나 사용자가 삭제되면 invalidate() 를 호출합니다.
+#   같은 워커는 즉시, 다른 워커는 cache_versions 확인 주기 안에 캐시를 비웁니다.
+# - 존재하지 않는(탈퇴한) 사용자는 캐시하지 않으며 결과에서 빠집니다.
+import threading
+from collections import OrderedDict
+from flask import current_app
+from backend.extensions import db
+from backend.maria_models import User
+from backend import cache_versions
+
+PROFILE_FIELDS = ('username', 'email', 'nickname', 'user_uid')
+MAX_ENTRIES = 5000
+VERSION_NAME = 'user_profiles'
+
+_cache = OrderedDict()
+_cache_version = None
+_lock = threading.Lock()
+
+
+def _normalize(user_ids):
+    ids = set()
+    for user_id in user_ids:
+        try:
+            ids.add(int(user_id))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def resolve(user_ids):
+    """사용자 ID 목록 -> {사용자 ID: 프로필 dict}. 없는 사용자는 결과에 포함되지 않습니다."""
+    global _cache_version
+    ids = _normalize(user_ids)
+    if not ids:
+        return {}
+
+    version = cache_versions.current(VERSION_NAME)
+    found = {}
+    with _lock:
+        if version != _cache_version:
+            # 다른 워커에서 프로필이 수정되었습니다.
+            _cache.clear()
+            _cache_version = version
+        for user_id in ids:
+            profile = _cache.get(user_id)
+            if profile is not None:
+                _cache.move_to_end(user_id)
+                found[user_id] = profile
+
+    missing = ids - found.keys()
+    if missing:
+        rows = db.session.query(User.id, *(getattr(User, field) for field in PROFILE_FIELDS))\
+            .filter(User.id.in_(missing)).all()
+        loaded = {row[0]: dict(zip(PROFILE_FIELDS, row[1:])) for row in rows}
+        found.update(loaded)
+        with _lock:
+            _cache.update(loaded)
+            while len(_cache) > MAX_ENTRIES:
+                _cache.popitem(last=False)
+    return found
+
+
+def get(user_id):
+    return resolve([user_id]).get(user_id)
+
+
+def invalidate(user_id):
+    """사용자의 프로필이 바뀌었거나 삭제되었을 때 호출합니다.
+
+    이미 커밋된 원래 요청을 실패시키지 않도록 버전 갱신 실패는 로그만 남깁니다.
+    (이 워커의 캐시는 비우므로 다른 워커만 LRU 에서 밀려날 때까지 이전 프로필을 볼 수 있습니다.)
+    """
+    global _cache_version
+    try:
+        version = cache_versions.bump(VERSION_NAME)
+    except Exception as e:
+        current_app.logger.error(f"Error bumping user profile cache version for user {user_id}: {e}", exc_info=True)
+        with _lock:
+            _cache.clear()
+            _cache_version = None
+        return
+    with _lock:
+        _cache.pop(user_id, None)
+        # 이 워커의 다른 항목은 그대로 유효하므로 새 버전으로 맞춰 둡니다.
+        if _cache_version == version - 1:
+            _cache_version = version
+        else:
+            _cache.clear()
+            _cache_version = version
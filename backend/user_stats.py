@@ -0,0 +1,140 @@
+# backend/user_stats.py
+# 사용자별 대시보드 통계 문서(user_stats)를 관리합니다.
+# 문서 하나 = 사용자 하나이며, 일기/감정/챗봇/심리검사/커뮤니티 쓰기 경로에서 $inc 로 갱신됩니다.
+# 대시보드는 원본 컬렉션을 세지 않고 이 문서 하나만 읽습니다. (find_one)
+# 누락/불일치가 생기면 rebuild_user_stats() (flask rebuild-user-stats) 로 원본에서 다시 계산합니다.
+#
+#   {'_id': 3, 'diary_count': 12, 'mood_count': 40, 'mood_histogram': {'행복': 21, '4': 9, ...},
+#    'recent_moods': ['행복', '4', ...],   # 최근 RECENT_MOODS 개 감정 키 (오래된 것 -> 최신)
+#    'chat_session_count': 5, 'chat_message_count': 31, 'psych_test_count': 2,
+#    'post_count': 3, 'comment_count': 8}
+import datetime
+from collections import Counter
+from pymongo import UpdateOne, ReplaceOne
+from sqlalchemy import func
+from flask import current_app
+from backend.extensions import db
+from backend.maria_models import Post, Comment
+from backend.mongo_models import get_mongo_db, MoodEntry
+from backend.analytics_rollups import mood_key, counter_key
+from backend.mongo_aggregations import MOOD_KEY_EXPRESSION
+
+STATS_COLLECTION = 'user_stats'
+
+# '나의 최근 감정' 계산에 사용하는 최근 감정 기록 수
+RECENT_MOODS = 30
+
+COUNT_FIELDS = ('diary_count', 'mood_count', 'chat_session_count', 'chat_message_count',
+                'psych_test_count', 'post_count', 'comment_count')
+
+
+def increment(user_id, **deltas):
+    """increment(user_id, diary_count=1) 처럼 카운터를 원자적으로 더합니다.
+
+    집계 실패가 원래 쓰기 요청을 실패시키지 않도록 예외는 로그만 남깁니다. (rebuild 로 복구 가능)
+    """
+    apply_deltas({user_id: deltas})
+
+
+def apply_deltas(deltas_by_user):
+    """{user_id: {field: delta}} 를 사용자별 UpdateOne 으로 한 번에 반영합니다."""
+    operations = [
+        UpdateOne({'_id': user_id}, {'$inc': deltas, '$set': {'updated_at': datetime.datetime.utcnow()}}, upsert=True)
+        for user_id, deltas in deltas_by_user.items() if user_id is not None and deltas
+    ]
+    if not operations:
+        return
+    try:
+        get_mongo_db()[STATS_COLLECTION].bulk_write(operations, ordered=False)
+    except Exception as e:
+        current_app.logger.error(f"Error updating user stats for {list(deltas_by_user)}: {e}", exc_info=True)
+
+
+def record_moods(user_id, entries):
+    """새 감정 기록들(dict)을 기록 수 / 감정 분포 / 최근 감정 목록에 반영합니다."""
+    if not entries:
+        return
+    keys = [key for key in (mood_key(entry) for entry in entries) if key is not None]
+    histogram = Counter(counter_key(key) for key in keys)
+    update = {
+        '$inc': {'mood_count': len(entries), **{f'mood_histogram.{key}': count for key, count in histogram.items()}},
+        '$set': {'updated_at': datetime.datetime.utcnow()},
+    }
+    if keys:
+        update['$push'] = {'recent_moods': {'$each': keys, '$slice': -RECENT_MOODS}}
+    try:
+        get_mongo_db()[STATS_COLLECTION].update_one({'_id': user_id}, update, upsert=True)
+    except Exception as e:
+        current_app.logger.error(f"Error updating mood stats for user {user_id}: {e}", exc_info=True)
+
+
+def post_deletion_deltas(post):
+    """게시글 삭제 시 줄어드는 카운터. 함께 삭제되는 다른 사용자의 댓글도 포함합니다.
+
+    삭제 전에 호출하고, 커밋이 끝난 뒤 apply_deltas() 로 반영합니다.
+    """
+    deltas = {post.user_id: {'post_count': -1}}
+    rows = db.session.query(Comment.user_id, func.count(Comment.id)).filter(Comment.post_id == post.id).group_by(Comment.user_id)
+    for user_id, count in rows:
+        deltas.setdefault(user_id, {})['comment_count'] = -count
+    return deltas
+
+
+def get_stats(user_id):
+    """대시보드용 통계. 문서가 없으면 모두 0 입니다."""
+    doc = get_mongo_db()[STATS_COLLECTION].find_one({'_id': user_id}) or {}
+    stats = {field: doc.get(field, 0) for field in COUNT_FIELDS}
+    stats['mood_histogram'] = doc.get('mood_histogram', {})
+    recent = Counter(doc.get('recent_moods', []))
+    # 횟수가 같으면 키 이름순 (기존 집계 파이프라인과 같은 기준)
+    stats['most_frequent_mood'] = min(recent, key=lambda key: (-recent[key], key)) if recent else None
+    return stats
+
+
+def delete_for_user(user_id):
+    get_mongo_db()[STATS_COLLECTION].delete_one({'_id': user_id})
+
+
+def rebuild_user_stats():
+    """원본 컬렉션에서 모든 사용자의 통계 문서를 다시 계산해 덮어씁니다. 반환값: 갱신된 문서 수"""
+    mongo_db = get_mongo_db()
+    stats = {}
+
+    def user_doc(user_id):
+        return stats.setdefault(user_id, {field: 0 for field in COUNT_FIELDS})
+
+    def count_by_user(collection, match, field):
+        pipeline = [{'$match': match}, {'$group': {'_id': '$user_id', 'count': {'$sum': 1}}}]
+        for row in mongo_db[collection].aggregate(pipeline, allowDiskUse=True):
+            user_doc(row['_id'])[field] = row['count']
+
+    count_by_user('diary_entries', {}, 'diary_count')
+    count_by_user('chat_sessions', {'is_hidden': {'$ne': True}}, 'chat_session_count')
+    count_by_user('chat_history', {'sender': 'user'}, 'chat_message_count')
+    count_by_user('psych_test_results', {}, 'psych_test_count')
+
+    # 감정 기록: 사용자별 최신순으로 감정 키를 모아 분포와 최근 목록을 만듭니다.
+    mood_pipeline = [
+        {'$sort': {'timestamp': -1}},
+        {'$group': {'_id': '$user_id', 'count': {'$sum': 1}, 'keys': {'$push': MOOD_KEY_EXPRESSION}}},
+    ]
+    for row in MoodEntry.aggregate(mood_pipeline):
+        doc = user_doc(row['_id'])
+        keys = [key for key in row['keys'] if key is not None]
+        doc['mood_count'] = row['count']
+        doc['mood_histogram'] = dict(Counter(counter_key(key) for key in keys))
+        doc['recent_moods'] = keys[:RECENT_MOODS][::-1]
+
+    for user_id, count in db.session.query(Post.user_id, func.count(Post.id)).group_by(Post.user_id):
+        user_doc(user_id)['post_count'] = count
+    for user_id, count in db.session.query(Comment.user_id, func.count(Comment.id)).group_by(Comment.user_id):
+        user_doc(user_id)['comment_count'] = count
+
+    now = datetime.datetime.utcnow()
+    collection = mongo_db[STATS_COLLECTION]
+    operations = [ReplaceOne({'_id': user_id}, {**doc, 'updated_at': now}, upsert=True)
+                  for user_id, doc in stats.items() if user_id is not None]
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    collection.delete_many({'_id': {'$nin': list(stats)}})
+    return len(operations)